@@ -0,0 +1,159 @@
+"""
+대시보드 처리 단계별 성능을 측정하는 벤치마크입니다.
+
+가상 실행 데이터(10^4 ~ 10^8 행)를 만들어 암호화한 뒤 복호화, 파싱, 필터링, 구간 집계,
+그래프 생성, 직렬화된 그래프 크기를 단계별로 측정합니다. 결과는 JSON 으로 저장되며,
+기준값(bench_baseline.json)보다 허용 배수 이상 느려진 단계가 있으면 실패(종료 코드 1)합니다.
+
+사용 예:
+    python benchmark.py --rows 10000 100000 1000000 --record   # 기준값 기록
+    python benchmark.py --rows 10000 100000 1000000            # 기준값과 비교
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from downsampling import DistanceTrace
+from figures import bar_figure, line_figure
+from gpg_loader import decrypt_file, run_gpg
+from noise_core import NoiseDataProcessor, StationDataProcessor, stationdata
+from synthetic_runs import write_synthetic_csv
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+BENCH_PASSPHRASE = "benchmark"
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_TOLERANCE = 1.5  # 기준값 대비 허용 배수
+MIN_SLACK_SECONDS = 0.02  # 아주 짧은 단계의 측정 잡음 허용치
+MIN_SPEED = 50
+
+
+def _timed(function, repeat, *args):
+    """
+    함수를 args 로 repeat 번 실행하여 가장 짧은 시간(초)과 마지막 결과를 반환합니다.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def build_figures(station_intervals_df, distance_trace):
+    """
+    대시보드와 같은 막대그래프와 (다운샘플링된) 라인 차트를 만듭니다.
+    """
+    noise_x, noise_y = distance_trace.downsample('dB')
+    speed_x, speed_y = distance_trace.downsample('speed')
+    return bar_figure(station_intervals_df, MIN_SPEED), line_figure(noise_x, noise_y, speed_x, speed_y)
+
+
+def benchmark_rows(n_rows, workdir, repeat):
+    """
+    주어진 행 수의 가상 실행 데이터로 각 단계를 측정합니다.
+    """
+    csv_path = os.path.join(workdir, f"synthetic_{n_rows}.csv")
+    encrypted_path = csv_path + ".gpg"
+    write_synthetic_csv(csv_path, n_rows)
+    run_gpg(["--symmetric", "--cipher-algo", "AES256", "-o", encrypted_path, csv_path], BENCH_PASSPHRASE)
+    os.remove(csv_path)
+
+    stages = {}
+    stages["decrypt"], plaintext = _timed(lambda: decrypt_file(encrypted_path, BENCH_PASSPHRASE), repeat)
+    stages["parse"], df = _timed(lambda data: pd.read_csv(io.BytesIO(data)), repeat, plaintext)
+    del plaintext
+
+    noise_processor = NoiseDataProcessor(df, StationDataProcessor(stationdata))
+    stages["get_filtered_data"], filtered = _timed(lambda: noise_processor.get_filtered_data(MIN_SPEED), repeat)
+    stages["get_station_intervals"], intervals = _timed(lambda: noise_processor.get_station_intervals(filtered), repeat)
+    stages["build_speed_index"], speed_index = _timed(noise_processor.build_speed_index, 1)
+    stages["speed_index_query"], _ = _timed(
+        lambda: noise_processor.get_station_intervals_at_speed(MIN_SPEED, speed_index), repeat
+    )
+    stages["build_distance_trace"], distance_trace = _timed(
+        lambda: DistanceTrace(df['distance'].values, dB=df['dB'].values, speed=df['speed'].values), 1
+    )
+    stages["figure_build"], figures = _timed(lambda: build_figures(intervals, distance_trace), repeat)
+    stages["figure_serialize"], payloads = _timed(lambda: [figure.to_json() for figure in figures], repeat)
+
+    os.remove(encrypted_path)
+    return {
+        "seconds": stages,
+        "figure_bytes": sum(len(payload) for payload in payloads),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    기준값보다 느려지거나 그래프가 커진 단계를 찾아 (행 수, 단계, 측정값, 기준값) 목록으로 반환합니다.
+    """
+    regressions = []
+    for rows, result in results.items():
+        reference = baseline.get("results", {}).get(rows)
+        if reference is None:
+            continue
+        for stage, seconds in result["seconds"].items():
+            limit = reference["seconds"].get(stage)
+            if limit is not None and seconds > limit * tolerance + MIN_SLACK_SECONDS:
+                regressions.append((rows, stage, seconds, limit))
+        if result["figure_bytes"] > reference["figure_bytes"] * tolerance:
+            regressions.append((rows, "figure_bytes", result["figure_bytes"], reference["figure_bytes"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage benchmark for the noise dashboard.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="synthetic run sizes (rows)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per stage (best time is kept)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--record", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown factor before a stage fails")
+    parser.add_argument("--output", help="also write the results JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="noise_bench_") as workdir:
+        for n_rows in args.rows:
+            results[str(n_rows)] = benchmark_rows(n_rows, workdir, args.repeat)
+            stages = results[str(n_rows)]["seconds"]
+            print(f"{n_rows:>12,} rows  " + "  ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in stages.items())
+                  + f"  figure_bytes={results[str(n_rows)]['figure_bytes']:,}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.record:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --record first.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for rows, stage, measured, limit in regressions:
+        print(f"REGRESSION {rows} rows {stage}: {measured:.4g} > {limit:.4g} x {args.tolerance}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
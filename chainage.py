@@ -0,0 +1,244 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from station_registry import StationRegistry
+
+# GPS/좌표 -> 선로 거리(chainage) 변환
+# 원본 좌표를 한 번에 투영하고, 촘촘하게 나눈 선형(alignment) 점들의 공간 인덱스로 가장 가까운 선분을 찾아
+# 선분 위로 수직 투영한 위치의 누적 거리를 구합니다. 점 단위 파이썬 루프가 없습니다.
+# 구한 거리가 stationdata 의 'station distance' 와 같은 체계가 되도록, 좌표가 있는 역(stations.json 의
+# lon/lat 또는 Easting/Northing)으로 시작 거리를 맞추고 역마다 허용 오차 안에 드는지 확인합니다.
+# pyproj / scipy 는 불러오는 데 시간이 걸리므로 좌표 데이터를 처음 처리할 때 불러옵니다. (대시보드 시작 속도)
+WGS84 = "EPSG:4326"
+DEFAULT_PROJECTED_CRS = "EPSG:32748"  # WGS 84 / UTM 48S (자카르타)
+LONLAT_COLUMNS = [("longitude", "latitude"), ("lon", "lat")]
+PROJECTED_COLUMNS = [("Easting", "Northing"), ("easting", "northing")]  # x/y 같은 일반 이름은 좌표로 보지 않음
+COORDINATE_COLUMNS = {name for pair in LONLAT_COLUMNS + PROJECTED_COLUMNS for name in pair}
+
+ALIGNMENT_FILE = os.environ.get("NOISE_ALIGNMENT_FILE", "track_alignment.csv")
+DENSIFY_SPACING = 5.0  # 공간 인덱스용 선형 점 간격 (m)
+MAX_OFFSET = 50.0  # 선로에서 이보다 멀리 떨어진 샘플은 chainage 를 NaN 으로 둡니다 (m)
+CALIBRATION_TOLERANCE = 25.0  # 보정 후 역 위치와 'station distance' 의 허용 차이 (m)
+
+
+@lru_cache(maxsize=None)
+def _transformer(source_crs, target_crs):
+    from pyproj import Transformer
+
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def project_points(x, y, source_crs=WGS84, target_crs=DEFAULT_PROJECTED_CRS):
+    """
+    좌표 배열 전체를 한 번에 투영합니다. (경위도는 x=경도, y=위도)
+    """
+    if source_crs == target_crs:
+        return np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    return _transformer(source_crs, target_crs).transform(
+        np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    )
+
+
+def coordinate_columns(columns):
+    """
+    데이터프레임 컬럼에서 좌표 컬럼 쌍을 찾습니다.
+
+    반환값: (x 컬럼, y 컬럼, 경위도 여부) 또는 None
+    """
+    columns = set(columns)
+    for x_name, y_name in LONLAT_COLUMNS:
+        if x_name in columns and y_name in columns:
+            return x_name, y_name, True
+    for x_name, y_name in PROJECTED_COLUMNS:
+        if x_name in columns and y_name in columns:
+            return x_name, y_name, False
+    return None
+
+
+class TrackAlignment:
+    def __init__(self, x, y, start_chainage=0.0, crs=DEFAULT_PROJECTED_CRS, spacing=DENSIFY_SPACING):
+        """
+        투영 좌표(m)로 된 선로 선형(폴리라인)입니다. 첫 꼭짓점의 chainage 가 start_chainage 입니다.
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.start_chainage = float(start_chainage)
+        self.crs = crs
+        self.spacing = spacing
+        self.anchored = False  # 시작 거리를 chainage 컬럼이나 역 좌표로 정했는지
+
+        # 선분: 시작점, 방향 벡터, 길이, 시작 누적 거리
+        self.segment_dx = np.diff(self.x)
+        self.segment_dy = np.diff(self.y)
+        self.segment_length = np.hypot(self.segment_dx, self.segment_dy)
+        self.segment_chainage = np.concatenate([[0.0], np.cumsum(self.segment_length)[:-1]])
+        self.length = float(self.segment_length.sum())
+
+        # 선분마다 spacing 간격으로 점을 찍어 공간 인덱스를 만듭니다.
+        from scipy.spatial import cKDTree
+
+        per_segment = np.maximum(np.ceil(self.segment_length / spacing).astype(np.int64), 1)
+        self.sample_segment = np.repeat(np.arange(len(per_segment)), per_segment)
+        first = np.repeat(np.cumsum(per_segment) - per_segment, per_segment)
+        fraction = (np.arange(len(self.sample_segment)) - first) / per_segment[self.sample_segment]
+        sample_x = self.x[:-1][self.sample_segment] + fraction * self.segment_dx[self.sample_segment]
+        sample_y = self.y[:-1][self.sample_segment] + fraction * self.segment_dy[self.sample_segment]
+        self.tree = cKDTree(np.column_stack([sample_x, sample_y]))
+
+    @classmethod
+    def from_file(cls, path, crs=DEFAULT_PROJECTED_CRS, spacing=DENSIFY_SPACING):
+        """
+        선형 꼭짓점 CSV(경위도 또는 투영 좌표)를 읽습니다. chainage 컬럼이 있으면 첫 값을 시작 거리로 씁니다.
+        """
+        df = pd.read_csv(path)
+        found = coordinate_columns(df.columns)
+        if found is None:
+            raise ValueError(f"{path}: no coordinate columns (expected lon/lat or Easting/Northing)")
+        x_name, y_name, is_lonlat = found
+        x, y = project_points(df[x_name].values, df[y_name].values, WGS84 if is_lonlat else crs, crs)
+        start_chainage = df['chainage'].iloc[0] if 'chainage' in df.columns else 0.0
+        alignment = cls(x, y, start_chainage=start_chainage, crs=crs, spacing=spacing)
+        alignment.anchored = 'chainage' in df.columns
+        return alignment
+
+    def match(self, x, y, max_offset=MAX_OFFSET):
+        """
+        투영 좌표 샘플을 선형에 맞춰 chainage 와 선로로부터의 거리(offset)를 구합니다.
+
+        반환값: (chainage, offset) - offset 이 max_offset 보다 큰 샘플의 chainage 는 NaN
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        chainage = np.full(len(x), np.nan)
+        offset = np.full(len(x), np.nan)
+        valid = np.isfinite(x) & np.isfinite(y)
+        if not valid.any():
+            return chainage, offset
+        px, py = x[valid], y[valid]
+
+        _, nearest = self.tree.query(np.column_stack([px, py]), workers=-1)
+        nearest_segment = self.sample_segment[nearest]
+
+        # 가장 가까운 점이 속한 선분과 양옆 선분 중 실제로 가장 가까운 선분에 수직 투영
+        last_segment = len(self.segment_length) - 1
+        best_distance = np.full(len(px), np.inf)
+        best_chainage = np.zeros(len(px))
+        for shift in (-1, 0, 1):
+            segment = np.clip(nearest_segment + shift, 0, last_segment)
+            dx, dy = self.segment_dx[segment], self.segment_dy[segment]
+            rel_x, rel_y = px - self.x[segment], py - self.y[segment]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                t = np.clip((rel_x * dx + rel_y * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+            t = np.nan_to_num(t)
+            distance = np.hypot(rel_x - t * dx, rel_y - t * dy)
+            closer = distance < best_distance
+            best_distance[closer] = distance[closer]
+            best_chainage[closer] = (self.segment_chainage[segment] + t * self.segment_length[segment])[closer]
+
+        offset[valid] = best_distance
+        chainage[valid] = np.where(best_distance <= max_offset, best_chainage + self.start_chainage, np.nan)
+        return chainage, offset
+
+    def calibrate(self, station_x, station_y, station_distances, tolerance=CALIBRATION_TOLERANCE):
+        """
+        역 좌표(투영 좌표)를 선형에 맞춘 위치가 'station distance' 와 일치하도록 시작 거리를 맞춥니다.
+        역별 차이의 중앙값을 쓰므로 역 좌표 한두 개의 작은 오차에 강하며, 보정 후에도 tolerance(m)보다
+        어긋나는 역이 있으면 선형과 역 정보가 맞지 않는 것이므로 ValueError 를 냅니다.
+
+        반환값: 역별 보정 후 차이 배열 (station distance - chainage)
+        """
+        station_distances = np.asarray(station_distances, dtype=np.float64)
+        chainage, _ = self.match(station_x, station_y, max_offset=np.inf)
+        shift = float(np.nanmedian(station_distances - chainage))
+        self.start_chainage += shift
+        residuals = station_distances - (chainage + shift)
+        bad = ~(np.abs(residuals) <= tolerance)  # 선형에 맞지 않은 역(NaN)도 실패
+        if bad.any():
+            raise ValueError(
+                f"track alignment disagrees with station distances by more than {tolerance} m at stations "
+                f"{np.flatnonzero(bad).tolist()} (residuals {np.round(residuals[bad], 1).tolist()} m)"
+            )
+        self.anchored = True
+        return residuals
+
+
+def station_coordinates(registry, crs=DEFAULT_PROJECTED_CRS):
+    """
+    좌표가 있는 역(모든 노선, 같은 역은 한 번)의 투영 좌표와 'station distance' 를 반환합니다.
+
+    반환값: (x, y, 거리) 배열 - 좌표가 있는 역이 없으면 길이 0
+    """
+    entries = {}
+    for line in registry.lines.values():
+        for entry in line["stations"]:
+            found = coordinate_columns(entry)
+            if found is not None:
+                entries.setdefault(entry["code"], (entry, found))
+    xs, ys, distances = [], [], []
+    for entry, (x_name, y_name, is_lonlat) in entries.values():
+        x, y = project_points([entry[x_name]], [entry[y_name]], WGS84 if is_lonlat else crs, crs)
+        xs.append(float(x[0]))
+        ys.append(float(y[0]))
+        distances.append(float(entry["distance"]))
+    return np.asarray(xs), np.asarray(ys), np.asarray(distances)
+
+
+def calibrated_alignment(path, registry, tolerance=CALIBRATION_TOLERANCE):
+    """
+    선형 파일을 읽고 역 좌표로 'station distance' 체계에 맞춥니다.
+    역 좌표가 없으면 선형 파일의 chainage 컬럼을 기준으로 쓰며, 둘 다 없으면 ValueError 를 냅니다.
+    """
+    alignment = TrackAlignment.from_file(path)
+    station_x, station_y, station_distances = station_coordinates(registry, alignment.crs)
+    if len(station_distances):
+        alignment.calibrate(station_x, station_y, station_distances, tolerance)
+    if not alignment.anchored:
+        raise ValueError(
+            f"{path}: cannot tie the alignment to station distances; add a 'chainage' column "
+            "or station coordinates (lon/lat or Easting/Northing) to the stations file."
+        )
+    return alignment
+
+
+def add_chainage(df, alignment, source_crs=None, max_offset=MAX_OFFSET):
+    """
+    좌표 컬럼(lon/lat 또는 Easting/Northing)으로 'distance' 컬럼을 만들어 반환합니다.
+    'distance' 컬럼이 이미 있으면 그대로 반환합니다.
+    """
+    if 'distance' in df.columns:
+        return df
+    found = coordinate_columns(df.columns)
+    if found is None:
+        raise ValueError("data has neither a 'distance' column nor coordinate columns")
+    x_name, y_name, is_lonlat = found
+    source_crs = source_crs or (WGS84 if is_lonlat else alignment.crs)
+    x, y = project_points(df[x_name].values, df[y_name].values, source_crs, alignment.crs)
+    chainage, _ = alignment.match(x, y, max_offset=max_offset)
+    df = df.copy()
+    df['distance'] = chainage
+    return df
+
+
+@lru_cache(maxsize=1)
+def load_default_alignment():
+    """
+    기본 선형 파일(NOISE_ALIGNMENT_FILE 환경변수 또는 track_alignment.csv)을 한 번만 읽어 역 정보에 맞춥니다.
+    """
+    if not os.path.exists(ALIGNMENT_FILE):
+        raise FileNotFoundError(
+            f"Data has no 'distance' column and no track alignment was found at {ALIGNMENT_FILE}; "
+            "set NOISE_ALIGNMENT_FILE to a CSV of alignment vertices."
+        )
+    return calibrated_alignment(ALIGNMENT_FILE, StationRegistry.from_file())
+
+
+def ensure_distance(df):
+    """
+    좌표만 있는 실행 데이터에 기본 선형으로 계산한 'distance' 컬럼을 붙입니다. (이미 있으면 그대로)
+    """
+    if 'distance' in df.columns:
+        return df
+    return add_chainage(df, load_default_alignment())
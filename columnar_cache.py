@@ -0,0 +1,219 @@
+import io
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from chainage import ensure_distance
+from data_validation import VALIDATION_VERSION, validate_run
+from gpg_loader import decrypt_file, file_sha256, run_gpg
+
+# 컬럼형 파일 형식 (.ncol)
+#   MAGIC | 헤더 길이 (uint64, little-endian) | JSON 헤더 | 64바이트 정렬된 컬럼 데이터
+# 숫자 컬럼은 float32, 문자열 컬럼(code, station 등)은 정수 코드 + 카테고리 목록으로 저장합니다.
+# 헤더의 attrs(예: 데이터 품질 보고서)는 열 때 DataFrame.attrs 로 복원합니다.
+MAGIC = b"NCOL1\n"
+ALIGNMENT = 64
+
+# 암호화된 컬럼형 파일 저장 위치 (디스크에는 암호화된 상태로만 저장)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".noise_cache")
+
+# 복호화된 컬럼형 파일을 메모리 매핑할 위치 (디스크가 아닌 메모리 기반 tmpfs)
+SHM_DIR = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    f"noise_dashboard_{os.getuid()}"
+)
+
+# 평문 파일은 프로세스마다 따로 만들어 매핑한 직후 지우므로(매핑은 프로세스가 끝날 때까지 유효)
+# 비정상 종료(SIGKILL 등)에도 복호화된 데이터가 공유 메모리에 남지 않습니다. 그 대신 매핑한 페이지는
+# 프로세스끼리 공유하지 않으며, 한 프로세스 안의 세션들은 DatasetRegistry 임대로 같은 데이터프레임을 나눠 씁니다.
+# 이름에 만든 프로세스 번호를 넣어, 매핑 전에 죽은 프로세스가 남긴 파일은 sweep_stale_plain_files() 로 지웁니다.
+# (대시보드/API 서버가 시작할 때 한 번 부릅니다)
+PLAIN_SUFFIX = ".ncol"
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _code_dtype(n_categories):
+    """
+    카테고리 수에 맞는 가장 작은 정수 코드 타입을 고릅니다. (-1 은 NaN)
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# 데이터프레임 -> 컬럼형 bytes
+def to_columnar_bytes(df, attrs=None):
+    """
+    데이터프레임을 컬럼형 bytes로 변환합니다. attrs 는 JSON 으로 헤더에 함께 저장합니다.
+    """
+    columns = []
+    blocks = []
+    offset = 0
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.to_numpy(dtype=np.float32, na_value=np.nan)
+            meta = {"name": str(name), "kind": "float", "dtype": "<f4"}
+        else:
+            categorical = pd.Categorical(series)
+            categories = [str(c) for c in categorical.categories]
+            values = categorical.codes.astype(_code_dtype(len(categories)))
+            meta = {"name": str(name), "kind": "category", "dtype": values.dtype.str, "categories": categories}
+        offset = _aligned(offset)
+        meta["offset"] = offset  # 데이터 영역 시작 기준 오프셋
+        columns.append(meta)
+        blocks.append((offset, np.ascontiguousarray(values).tobytes()))
+        offset += values.nbytes
+
+    header = json.dumps({"rows": len(df), "columns": columns, "attrs": attrs or {}}).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    buffer = bytearray(data_start + offset)
+    buffer[:len(MAGIC)] = MAGIC
+    buffer[len(MAGIC):len(MAGIC) + 8] = struct.pack("<Q", len(header))
+    buffer[len(MAGIC) + 8:len(MAGIC) + 8 + len(header)] = header
+    for block_offset, raw in blocks:
+        buffer[data_start + block_offset:data_start + block_offset + len(raw)] = raw
+    return bytes(buffer)
+
+
+# 컬럼형 파일 -> 메모리 매핑된 데이터프레임
+def open_columnar(path):
+    """
+    컬럼형 파일을 읽기 전용으로 메모리 매핑하여 데이터프레임으로 반환합니다. (복사 없이 파일 페이지를 직접 씀)
+    숫자 컬럼은 float32, 문자열 컬럼은 카테고리(코드 -1 은 NaN)로 돌아옵니다.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar noise file")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    data_start = _aligned(len(MAGIC) + 8 + header_length)
+
+    rows = header["rows"]
+    data = {}
+    for meta in header["columns"]:
+        dtype = np.dtype(meta["dtype"])
+        if rows:
+            values = np.memmap(path, mode="r", dtype=dtype, offset=data_start + meta["offset"], shape=(rows,))
+        else:
+            values = np.empty(0, dtype=dtype)
+        if meta["kind"] == "category":
+            values = pd.Categorical.from_codes(values, categories=meta["categories"])
+        data[meta["name"]] = values
+    df = pd.DataFrame(data, copy=False)
+    df.attrs.update(header.get("attrs", {}))
+    return df
+
+
+# 암호화 저장 / 복호화
+def write_encrypted_columnar(df, encrypted_path, passphrase):
+    """
+    데이터프레임을 컬럼형으로 변환한 뒤 GPG 대칭키로 암호화하여 저장합니다.
+    """
+    _atomic_write(encrypted_path, _encrypt(to_columnar_bytes(df), passphrase))
+
+
+def _encrypt(payload, passphrase):
+    return run_gpg(["--symmetric", "--cipher-algo", "AES256"], passphrase, data=payload)
+
+
+def _atomic_write(path, payload, mode=0o600):
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_stale_plain_files(shm_dir=SHM_DIR):
+    """
+    종료된 프로세스가 남긴 평문 컬럼형 파일을 지웁니다. (프로세스 번호가 없는 예전 형식 파일 포함)
+    서버 프로세스가 시작할 때 한 번 부릅니다. 반환값: 지운 파일 수
+    """
+    if not os.path.isdir(shm_dir):
+        return 0
+    removed = 0
+    for name in os.listdir(shm_dir):
+        if not (name.endswith(PLAIN_SUFFIX) or name.startswith(".tmp_")):
+            continue
+        pid = name[:-len(PLAIN_SUFFIX)].rsplit(".p", 1)[-1] if name.endswith(PLAIN_SUFFIX) else ""
+        if pid.isdigit() and _process_alive(int(pid)):
+            continue
+        try:
+            os.remove(os.path.join(shm_dir, name))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+
+@contextmanager
+def _untimed_stage(name, rows=None):
+    yield {"stage": name, "rows": rows}
+
+
+def load_run_columnar(encrypted_csv, passphrase, content_hash=None, cache_dir=CACHE_DIR, shm_dir=SHM_DIR,
+                      profiler=None):
+    """
+    암호화된 CSV 실행 데이터를 메모리 매핑된 컬럼형 데이터프레임으로 엽니다.
+
+    처음 한 번만 CSV를 복호화/파싱/검증하여 암호화된 컬럼형 파일(<hash>.v<검증 버전>.ncol.gpg)을 만들고,
+    이후에는 이 파일을 메모리 기반 임시 디렉토리에 복호화하여 매핑하고, 매핑한 뒤 바로 평문 파일을 지웁니다.
+    매핑은 이 프로세스 전용이므로, 같은 실행을 여러 번 열지 않도록 호출하는 쪽에서 결과를 공유(임대)합니다.
+    반환되는 데이터는 정리되어(결측/범위 밖/중복 행 제거) 거리 순으로 정렬되어 있고, df.attrs['quality'] 에 품질 보고서가 있습니다.
+    profiler(StageProfiler)를 주면 복호화/파싱/검증/컬럼형 변환/매핑을 각각 한 단계로 기록합니다.
+    """
+    stage = profiler.stage if profiler is not None else _untimed_stage
+    key = f"{content_hash or file_sha256(encrypted_csv)}.v{VALIDATION_VERSION}"
+    encrypted_path = os.path.join(cache_dir, f"{key}.ncol.gpg")
+    plain_path = os.path.join(shm_dir, f"{key}.p{os.getpid()}{PLAIN_SUFFIX}")
+
+    if os.path.exists(encrypted_path):
+        with stage("decrypt_cache"):
+            payload = run_gpg(["--decrypt", encrypted_path], passphrase)
+    else:
+        with stage("decrypt"):
+            plaintext = decrypt_file(encrypted_csv, passphrase)
+        with stage("parse") as record:
+            df = ensure_distance(pd.read_csv(io.BytesIO(plaintext)))
+            record["rows"] = len(df)
+        del plaintext
+        with stage("validate", rows=len(df)):
+            df, quality = validate_run(df)
+        with stage("columnar_encode", rows=len(df)):
+            payload = to_columnar_bytes(df, attrs={"quality": quality})
+            _atomic_write(encrypted_path, _encrypt(payload, passphrase))
+    with stage("map") as record:
+        _atomic_write(plain_path, payload)
+        try:
+            df = open_columnar(plain_path)
+        finally:
+            os.remove(plain_path)
+        record["rows"] = len(df)
+    return df
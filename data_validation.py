@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# 실행 데이터를 받을 때 한 번만 실행하는 검증/정리 단계
+# 결측값, 범위를 벗어난 값, 중복 행을 규칙별로 한 번에 표시해 지우고 거리 순으로 정렬합니다.
+# 앞뒤 샘플과 동떨어진 단일 샘플(글리치 후보)은 세기만 합니다. 짧고 큰 소음(소음 집중 구간)일 수도 있으므로
+# drop_spikes=True 로 요청할 때만 지웁니다. 정리된 컬럼과 품질 보고서는 컬럼형 캐시에 함께 저장되므로 이후 단계는
+# 정렬되고 NaN 이 없는 데이터라고 가정할 수 있습니다.
+VALIDATION_VERSION = 3  # 규칙이 바뀌면 올려서 캐시를 다시 만듭니다. (columnar_cache 파일 이름에 포함)
+DB_RANGE = (20.0, 140.0)  # 측정기에서 나올 수 있는 dB 범위
+SPEED_RANGE = (0.0, 150.0)  # km/h
+SPIKE_DB = 25.0  # 앞뒤 샘플보다 모두 이만큼 크거나 작은 단일 샘플은 글리치 후보로 셈
+REQUIRED_COLUMNS = ['distance', 'speed', 'dB']
+
+# 지우는 규칙 (보고서 순서)
+DROP_RULES = [
+    'missing_distance', 'missing_speed', 'missing_dB',
+    'dB_out_of_range', 'speed_out_of_range', 'duplicate_rows'
+]
+
+
+def _column(df, name):
+    return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _previous(values):
+    return np.concatenate(([np.nan], values[:-1]))
+
+
+def validate_run(df, sort=True, drop_spikes=False):
+    """
+    규칙별로 문제가 있는 행을 한 번에 표시하고 지운 데이터프레임과 품질 보고서를 반환합니다.
+    글리치 후보와 중복 행은 결측/범위 규칙으로 지운 행을 뺀 나머지에서 기록 순서(시간 순) 기준으로 찾고,
+    각 행은 DROP_RULES 순서로 처음 걸린 규칙 하나에만 셉니다. (규칙별 행 수의 합 == 지운 행 수)
+    글리치 후보는 report['dB_spikes'] 에 세기만 하며, drop_spikes=True 이면 함께 지웁니다.
+    거리 역행(비단조)은 세기만 한 뒤 sort=True 이면 거리 순으로 정렬합니다.
+
+    반환값: (정리된 데이터프레임, 보고서 딕셔너리 - JSON 으로 저장 가능)
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in df.columns]
+    if missing:
+        raise ValueError(f"run data is missing required columns: {', '.join(missing)}")
+    distance = _column(df, 'distance')
+    speed = _column(df, 'speed')
+    level = _column(df, 'dB')
+
+    with np.errstate(invalid="ignore"):
+        flags = {
+            'missing_distance': np.isnan(distance),
+            'missing_speed': np.isnan(speed),
+            'missing_dB': np.isnan(level),
+            'dB_out_of_range': (level < DB_RANGE[0]) | (level > DB_RANGE[1]),
+            'speed_out_of_range': (speed < SPEED_RANGE[0]) | (speed > SPEED_RANGE[1]),
+        }
+        # 글리치/중복은 남은 행끼리 비교 (이미 지운 결측/범위 밖 값을 앞뒤 샘플로 쓰지 않음)
+        remaining = np.flatnonzero(~np.logical_or.reduce(list(flags.values()), initial=False))
+        kept_level, kept_distance, kept_speed = level[remaining], distance[remaining], speed[remaining]
+        previous = _previous(kept_level)
+        following = np.concatenate((kept_level[1:], [np.nan]))
+        spike = (
+            ((kept_level - previous > SPIKE_DB) & (kept_level - following > SPIKE_DB))
+            | ((previous - kept_level > SPIKE_DB) & (following - kept_level > SPIKE_DB))
+        )
+        # 움직이는 중(속도 > 0)에 바로 앞 행과 같은 기록은 로거의 중복 기록 (정차 중 반복은 정상)
+        duplicate = (
+            (kept_distance == _previous(kept_distance)) & (kept_speed == _previous(kept_speed))
+            & (kept_level == previous) & (kept_speed > 0)
+        )
+    flags['duplicate_rows'] = np.zeros(len(df), dtype=bool)
+    flags['duplicate_rows'][remaining] = duplicate
+    spikes = np.zeros(len(df), dtype=bool)
+    spikes[remaining] = spike
+
+    drop = np.zeros(len(df), dtype=bool)
+    counts = {}
+    for rule in DROP_RULES:
+        counts[rule] = int(np.count_nonzero(flags[rule] & ~drop))
+        drop |= flags[rule]
+    spike_count = int(np.count_nonzero(spikes & ~drop))
+    if drop_spikes:
+        drop |= spikes
+    keep = np.flatnonzero(~drop)
+    kept_distance = distance[keep]
+    reversals = int(np.count_nonzero(np.diff(kept_distance) < 0))
+
+    if sort:
+        keep = keep[np.argsort(kept_distance, kind="stable")]
+        kept_distance = distance[keep]
+    clean = df.iloc[keep].reset_index(drop=True)
+    sorted_distance = kept_distance if sort else np.sort(kept_distance)
+
+    report = {
+        'version': VALIDATION_VERSION,
+        'rows': int(len(df)),
+        'clean_rows': int(len(clean)),
+        'dropped_rows': int(drop.sum()),
+        'rules': counts,
+        'dB_spikes': spike_count,
+        'spikes_dropped': bool(drop_spikes),
+        'distance_reversals': reversals,
+        'duplicate_distances': int(np.count_nonzero(np.diff(sorted_distance) == 0)),
+        'sorted': bool(sort),
+    }
+    return clean, report
+
+
+def merge_reports(first, second):
+    """
+    청크별 보고서를 합칩니다. (스트리밍; 청크 경계의 글리치/역행은 청크 안에서만 봄)
+    """
+    if first is None:
+        return second
+    merged = dict(first)
+    for name in ('rows', 'clean_rows', 'dropped_rows', 'dB_spikes', 'distance_reversals', 'duplicate_distances'):
+        merged[name] = first[name] + second[name]
+    merged['rules'] = {rule: first['rules'][rule] + second['rules'][rule] for rule in DROP_RULES}
+    merged['spikes_dropped'] = first['spikes_dropped'] and second['spikes_dropped']
+    merged['sorted'] = first['sorted'] and second['sorted']
+    return merged
+
+
+def quality_frame(report):
+    """
+    보고서를 규칙별 표(규칙, 행 수, 비율)로 변환합니다.
+    글리치 후보(drop_spikes 로 지우지 않은 경우), 거리 역행, 중복 거리는 지우지 않고 세기만 합니다.
+    """
+    rows = max(report['rows'], 1)
+    entries = [(rule, report['rules'][rule], 'dropped') for rule in DROP_RULES]
+    entries += [
+        ('dB_spike', report['dB_spikes'], 'dropped' if report['spikes_dropped'] else 'kept'),
+        ('distance_reversals', report['distance_reversals'], 'sorted' if report['sorted'] else 'counted'),
+        ('duplicate_distances', report['duplicate_distances'], 'kept'),
+    ]
+    return pd.DataFrame({
+        'Rule': [rule for rule, _, _ in entries],
+        'Rows': [count for _, count, _ in entries],
+        'Share (%)': [count / rows * 100 for _, count, _ in entries],
+        'Action': [action for _, _, action in entries],
+    })
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# 세션 간에 공유하는 읽기 전용 데이터셋 저장소
+# 같은 실행 데이터를 여러 브라우저 세션이 열어도 메모리에는 한 벌만 둡니다.
+# 세션이 사용 중인(참조 수 > 0) 데이터셋은 내보내지 않고, 예산을 넘으면 가장 오래 안 본 데이터셋부터 내보냅니다.
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get("NOISE_CACHE_BUDGET_MB", "2048"))
+
+
+def estimate_nbytes(value, _seen=None):
+    """
+    데이터셋이 차지하는 메모리를 어림합니다. (numpy 배열/데이터프레임과 그 묶음, 객체 속성을 따라감)
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item, seen) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item, seen) for item in value)
+    if hasattr(value, "__dict__"):
+        return estimate_nbytes(vars(value), seen)
+    return 0
+
+
+class _Entry:
+    def __init__(self, value, nbytes, load_seconds):
+        self.value = value
+        self.nbytes = nbytes
+        self.load_seconds = load_seconds
+        self.refs = 0
+        self.hits = 0
+        self.last_used = time.time()
+
+
+class DatasetLease:
+    def __init__(self, registry, key, value):
+        """
+        세션이 데이터셋을 사용 중임을 나타냅니다. release() 하거나 세션 상태에서 사라지면 참조가 풀립니다.
+        """
+        self.key = key
+        self.value = value
+        self._finalizer = weakref.finalize(self, registry.release, key)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetRegistry:
+    def __init__(self, memory_budget_bytes=DEFAULT_MEMORY_BUDGET_MB * 1024 ** 2):
+        """
+        키별 데이터셋을 한 번만 만들고 참조 수와 최근 사용 순서(LRU)를 관리합니다. 스레드 안전합니다.
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries = OrderedDict()  # 오래 안 본 것부터
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._waiting = {}  # 키 -> 다른 쪽이 만드는 것을 기다리는 요청 수
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def lease(self, key, loader):
+        """
+        데이터셋을 빌립니다. 없으면 loader() 로 만들고, 같은 키를 동시에 요청하면 한 번만 만듭니다.
+        """
+        key_lock = self._key_lock(key)
+        with self._lock:
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+        key_lock.acquire()
+        with self._lock:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    entry.hits += 1
+            if entry is None:
+                started = time.perf_counter()
+                value = loader()
+                entry = _Entry(value, estimate_nbytes(value), time.perf_counter() - started)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = entry
+            with self._lock:
+                entry.refs += 1
+                entry.last_used = time.time()
+                self._entries.move_to_end(key)
+                self._evict()
+        finally:
+            key_lock.release()
+        return DatasetLease(self, key, entry.value)
+
+    def waiting(self, key):
+        """
+        key 데이터셋을 다른 쪽이 만드는 동안 기다리고 있는 요청 수
+        """
+        with self._lock:
+            return self._waiting.get(key, 0)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs = max(entry.refs - 1, 0)
+            self._evict()
+
+    def _evict(self):
+        """
+        예산을 넘으면 사용 중이 아닌 데이터셋을 오래된 순서로 내보냅니다. (잠금 안에서 호출)
+        """
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.memory_budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs == 0:
+                total -= entry.nbytes
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+                self.evictions += 1
+
+    def stats(self):
+        """
+        적중/실패/내보냄 횟수와 메모리 사용량을 반환합니다.
+        """
+        with self._lock:
+            used = sum(entry.nbytes for entry in self._entries.values())
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "in_use": sum(entry.refs > 0 for entry in self._entries.values()),
+                "memory_mb": used / 1024 ** 2,
+                "budget_mb": self.memory_budget_bytes / 1024 ** 2,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def entries_frame(self):
+        """
+        데이터셋별 메모리/참조 수/적중 수를 최근 사용 순으로 반환합니다.
+        """
+        with self._lock:
+            rows = [{
+                "key": " / ".join(map(str, key)) if isinstance(key, tuple) else str(key),
+                "memory_mb": entry.nbytes / 1024 ** 2,
+                "sessions": entry.refs,
+                "hits": entry.hits,
+                "load_seconds": entry.load_seconds,
+                "last_used": pd.Timestamp(entry.last_used, unit="s"),
+            } for key, entry in reversed(self._entries.items())]
+        return pd.DataFrame(rows, columns=["key", "memory_mb", "sessions", "hits", "load_seconds", "last_used"])
@@ -0,0 +1,60 @@
+import numpy as np
+
+# 여러 실행 데이터의 (거리, dB) 샘플을 고정 크기 밀도 이미지로 모읍니다. (서버 쪽 래스터화)
+# 브라우저에는 샘플 대신 픽셀 격자(히트맵) 하나만 보내므로 그리는 비용은 샘플 수가 아니라 픽셀 수에 비례합니다.
+# 거리 순으로 정렬된 데이터에서 보이는 거리 범위만 잘라(searchsorted) bincount 한 번으로 셉니다.
+RASTER_WIDTH = 800  # 거리 방향 픽셀 수
+RASTER_HEIGHT = 200  # dB 방향 픽셀 수
+
+
+def visible_slice(distances, x_range):
+    """
+    정렬된 거리 배열에서 x_range [시작, 끝] 에 해당하는 위치 범위를 반환합니다.
+    """
+    lo = np.searchsorted(distances, x_range[0], side="left")
+    hi = np.searchsorted(distances, x_range[1], side="right")
+    return lo, hi
+
+
+def value_range(traces, x_range):
+    """
+    보이는 거리 범위 안의 값 최소/최대 (이미지 세로축 범위). 값이 없으면 None
+    """
+    lows, highs = [], []
+    for distances, values in traces:
+        lo, hi = visible_slice(distances, x_range)
+        visible = np.asarray(values[lo:hi], dtype=np.float64)
+        if np.isfinite(visible).any():
+            lows.append(np.nanmin(visible))
+            highs.append(np.nanmax(visible))
+    if not lows:
+        return None
+    return min(lows), max(highs)
+
+
+def rasterize(traces, x_range, y_range, width=RASTER_WIDTH, height=RASTER_HEIGHT):
+    """
+    traces([(정렬된 거리, 값), ...])의 샘플 수를 [height, width] 픽셀 격자에 셉니다.
+    실행마다 보이는 범위만 잘라 누적하므로 비용은 보이는 샘플 수에 비례하고 결과 크기는 일정합니다.
+
+    반환값: (픽셀별 샘플 수 [height, width], 거리 경계, 값 경계)
+    """
+    x0, x1 = float(x_range[0]), float(x_range[1])
+    y0, y1 = float(y_range[0]), float(y_range[1])
+    if x1 <= x0:
+        x1 = x0 + 1.0
+    if y1 <= y0:
+        y1 = y0 + 1.0
+    counts = np.zeros(height * width, dtype=np.int64)
+    for distances, values in traces:
+        lo, hi = visible_slice(distances, (x0, x1))
+        x = np.asarray(distances[lo:hi], dtype=np.float64)
+        y = np.asarray(values[lo:hi], dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            keep = (y >= y0) & (y <= y1)  # NaN 은 False
+        columns = np.minimum(((x[keep] - x0) / (x1 - x0) * width).astype(np.int64), width - 1)
+        rows = np.minimum(((y[keep] - y0) / (y1 - y0) * height).astype(np.int64), height - 1)
+        counts += np.bincount(rows * width + columns, minlength=counts.size)
+    x_edges = np.linspace(x0, x1, width + 1)
+    y_edges = np.linspace(y0, y1, height + 1)
+    return counts.reshape(height, width), x_edges, y_edges
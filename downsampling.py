@@ -0,0 +1,84 @@
+import numpy as np
+
+from segment_engine import sort_by_distance
+
+DEFAULT_BUCKETS = 1500  # 화면 가로 픽셀 수 정도
+WEBGL_THRESHOLD = 2000  # 이보다 점이 많으면 WebGL(Scattergl) 트레이스 사용
+
+
+def m4_indices(x, y, n_buckets=DEFAULT_BUCKETS):
+    """
+    x 를 n_buckets 개의 균등 구간으로 나누고 구간별 첫/마지막/최소/최대 점의 위치를 반환합니다. (M4)
+    선 그래프로 그렸을 때 원본과 같은 모양을 유지하며, 소음 피크가 사라지지 않습니다.
+    x 는 정렬되어 있어야 합니다.
+    """
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    x_start, x_end = x[0], x[-1]
+    if x_end > x_start:
+        buckets = np.minimum(((x - x_start) / (x_end - x_start) * n_buckets).astype(np.int64), n_buckets - 1)
+    else:
+        buckets = np.zeros(n, dtype=np.int64)
+
+    # x 가 정렬되어 있으므로 같은 버킷의 점은 연속되어 있음
+    block_starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    block_lengths = np.diff(np.r_[block_starts, n])
+    block_ends = block_starts + block_lengths - 1
+    block_ids = np.repeat(np.arange(len(block_starts)), block_lengths)
+
+    y = np.asarray(y, dtype=np.float64)
+    selected = [block_starts, block_ends]
+    for ufunc in (np.fmin, np.fmax):
+        extreme = ufunc.reduceat(y, block_starts)
+        candidates = np.flatnonzero(y == extreme[block_ids])
+        _, first = np.unique(block_ids[candidates], return_index=True)
+        selected.append(candidates[first])
+    return np.unique(np.concatenate(selected))
+
+
+class DistanceTrace:
+    def __init__(self, distances, **columns):
+        """
+        거리 순으로 정렬된 라인 차트용 데이터입니다. 실행 데이터당 한 번 만들어 재사용합니다.
+        """
+        names = list(columns)
+        sorted_columns = sort_by_distance(distances, *(columns[name] for name in names))
+        self.distances = sorted_columns[0]
+        self.columns = dict(zip(names, sorted_columns[1:]))
+
+    @property
+    def distance_range(self):
+        if len(self.distances) == 0:
+            return 0.0, 0.0
+        return float(self.distances[0]), float(self.distances[-1])
+
+    def window(self, start=None, end=None):
+        """
+        [start, end] 거리 범위에 해당하는 위치 범위를 반환합니다.
+        """
+        lo = 0 if start is None else np.searchsorted(self.distances, start, side="left")
+        hi = len(self.distances) if end is None else np.searchsorted(self.distances, end, side="right")
+        return lo, hi
+
+    def downsample(self, name, start=None, end=None, n_buckets=DEFAULT_BUCKETS):
+        """
+        보이는 거리 범위만 잘라 M4 방식으로 줄인 (거리, 값) 배열을 반환합니다.
+        범위가 좁을수록 같은 점 수로 더 높은 해상도를 보여줍니다.
+        """
+        lo, hi = self.window(start, end)
+        x = self.distances[lo:hi]
+        y = self.columns[name][lo:hi]
+        indices = m4_indices(x, y, n_buckets)
+        return x[indices], y[indices]
+
+
+def scatter_class(n_points):
+    """
+    점 수에 따라 일반 SVG 트레이스 또는 WebGL 트레이스를 고릅니다.
+    plotly 는 불러오는 데 시간이 걸리므로 그래프를 처음 그릴 때 불러옵니다. (DistanceTrace 만 쓰는 로드 단계는 필요 없음)
+    """
+    import plotly.graph_objects as go
+
+    return go.Scattergl if n_points > WEBGL_THRESHOLD else go.Scatter
@@ -0,0 +1,225 @@
+import numpy as np
+import plotly.colors
+import plotly.graph_objects as go
+
+from downsampling import scatter_class
+
+DEFAULT_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+
+# 대시보드 그래프 생성 (스트림릿에 의존하지 않음, 벤치마크와 공용)
+# 숫자 배열은 float32 numpy 배열로 넘깁니다. plotly 는 numpy 배열을 JSON 숫자 목록 대신
+# base64 로 인코딩된 타입 배열({"dtype": "f4", "bdata": ...})로 직렬화하므로 전송량과 직렬화 비용이 줄어듭니다.
+
+
+def compact_array(values):
+    """
+    그래프용 숫자 배열을 float32 numpy 배열로 변환합니다. (NaN 유지)
+    """
+    return np.asarray(values, dtype=np.float32)
+
+
+def bar_figure(station_intervals_df, min_speed):
+    """
+    역 구간별 평균/최대 소음 막대그래프
+    """
+    station_pairs = list(station_intervals_df['Station Pair'])
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=station_pairs,
+        y=compact_array(station_intervals_df['Maximum Noise (dBA)']),
+        name='Maximum Noise (dBA)',
+        marker_color='#1e90ff'
+    ))
+    fig.add_trace(go.Bar(
+        x=station_pairs,
+        y=compact_array(station_intervals_df['Average Noise (dBA)']),
+        name='Average Noise (dBA)',
+        marker_color='#4682b4'
+    ))
+    fig.update_layout(
+        title=f"Average and Maximum Noise Levels at Speed Above {min_speed} km/h",
+        xaxis_title="Station",
+        yaxis_title="Noise Level (dBA)",
+        barmode='overlay'
+    )
+    return fig
+
+
+def compare_figure(comparison_df, labels, min_speed):
+    """
+    실행 데이터별 역 구간 평균 소음 묶음 막대그래프
+    """
+    station_pairs = list(comparison_df['Station Pair'])
+    fig = go.Figure()
+    for label in labels:
+        fig.add_trace(go.Bar(
+            x=station_pairs,
+            y=compact_array(comparison_df[f'{label} Average (dBA)']),
+            name=label
+        ))
+    fig.update_layout(
+        title=f"Average Noise by Run at Speed Above {min_speed} km/h",
+        xaxis_title="Station",
+        yaxis_title="Noise Level (dBA)",
+        barmode='group'
+    )
+    return fig
+
+
+MAX_HIGHLIGHT_SPANS = 200  # 라인 차트에 음영으로 표시할 최대 소음 집중 구간 수
+
+
+def line_figure(noise_x, noise_y, speed_x, speed_y, highlight_spans=None):
+    """
+    거리별 소음/속도 이중 축 라인 차트 (다운샘플링된 배열을 받음)
+    highlight_spans 의 (시작, 끝) 거리 구간은 음영으로 표시합니다. (소음 집중 구간)
+    """
+    fig = go.Figure()
+
+    # Plot Noise Level (dB)
+    fig.add_trace(scatter_class(len(noise_x))(
+        x=compact_array(noise_x),
+        y=compact_array(noise_y),
+        mode='lines',
+        name='Noise Level (dB)',
+        yaxis="y1"
+    ))
+
+    # Plot Speed (km/h)
+    fig.add_trace(scatter_class(len(speed_x))(
+        x=compact_array(speed_x),
+        y=compact_array(speed_y),
+        mode='lines',
+        name='Speed (km/h)',
+        yaxis="y2"
+    ))
+
+    # Update layout with dual y-axes
+    fig.update_layout(
+        title="Noise Levels and Speed Over Distance",
+        xaxis=dict(title="Distance (m)"),
+        yaxis=dict(title="Noise Level (dB)", side="left"),
+        yaxis2=dict(title="Speed (km/h)", overlaying="y", side="right"),
+        height=600
+    )
+    if highlight_spans:
+        fig.update_layout(shapes=[
+            dict(type="rect", xref="x", yref="paper", x0=start, x1=end, y0=0, y1=1,
+                 fillcolor="#ff4500", opacity=0.2, line_width=0, layer="below")
+            for start, end in highlight_spans[:MAX_HIGHLIGHT_SPANS]
+        ])
+    return fig
+
+
+def heatmap_figure(heat_x, heat_y, heat_z, metric_label):
+    """
+    거리 x 속도 히트맵
+    """
+    fig = go.Figure(go.Heatmap(
+        x=compact_array(heat_x),
+        y=compact_array(heat_y),
+        z=compact_array(heat_z),
+        colorscale='Viridis',
+        colorbar=dict(title=metric_label)
+    ))
+    fig.update_layout(
+        title=f"{metric_label} by Distance and Speed",
+        xaxis=dict(title="Distance (m)"),
+        yaxis=dict(title="Speed (km/h)"),
+        height=450
+    )
+    return fig
+
+
+def regression_figure(band_speeds, band_levels, slopes, intercepts, r2, labels, station_pair):
+    """
+    한 역 구간의 속도 구간별 평균 dB(점)와 실행별 회귀선 dB = 절편 + 기울기 * log10(속도)(선)을 겹쳐 그립니다.
+    band_levels 는 [실행, 속도 구간] 배열이고 slopes / intercepts / r2 는 실행별 값입니다.
+    """
+    band_speeds = np.asarray(band_speeds, dtype=np.float64)
+    fig = go.Figure()
+    for run, label in enumerate(labels):
+        has_data = np.isfinite(band_levels[run])
+        color = DEFAULT_COLORS[run % len(DEFAULT_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=compact_array(band_speeds[has_data]),
+            y=compact_array(band_levels[run][has_data]),
+            mode='markers',
+            marker=dict(color=color, size=7),
+            name=f'{label} (band mean)',
+            legendgroup=label
+        ))
+        if has_data.any() and np.isfinite(slopes[run]):
+            fit_speeds = np.geomspace(max(band_speeds[has_data].min(), 1.0), band_speeds[has_data].max(), 50)
+            fig.add_trace(go.Scatter(
+                x=compact_array(fit_speeds),
+                y=compact_array(intercepts[run] + slopes[run] * np.log10(fit_speeds)),
+                mode='lines',
+                line=dict(color=color),
+                name=f'{label}: {slopes[run]:.1f} dB/decade, R² {r2[run]:.2f}',
+                legendgroup=label
+            ))
+    fig.update_layout(
+        title=f"Noise vs Speed: {station_pair}",
+        xaxis=dict(title="Speed (km/h)", type="log"),
+        yaxis=dict(title="Noise Level (dBA)"),
+        height=450
+    )
+    return fig
+
+
+def density_figure(counts, x_edges, y_edges, station_distances, station_codes, n_runs):
+    """
+    거리 x dB 밀도 이미지(픽셀별 샘플 수)를 히트맵으로 그리고 역 위치를 세로선으로 겹쳐 그립니다.
+    색은 샘플 수의 로그를 1~255 단계로 나눈 uint8 값(빈 픽셀은 0, 투명)이라 픽셀당 1바이트로 전송됩니다.
+    """
+    with np.errstate(divide="ignore"):
+        log_counts = np.where(counts > 0, np.log10(counts), -1.0)
+    max_decade = max(int(np.ceil(log_counts.max())), 1)
+    levels = np.where(counts > 0, 1 + np.round(log_counts / max_decade * 254), 0).astype(np.uint8)
+    viridis = plotly.colors.sequential.Viridis
+    colorscale = [[0.0, 'rgba(0,0,0,0)'], [1 / 255, viridis[0]]] + [
+        [1 / 255 + (1 - 1 / 255) * (i + 1) / (len(viridis) - 1), color] for i, color in enumerate(viridis[1:])
+    ]
+    fig = go.Figure(go.Heatmap(
+        x=compact_array((x_edges[:-1] + x_edges[1:]) / 2),
+        y=compact_array((y_edges[:-1] + y_edges[1:]) / 2),
+        z=levels,
+        zmin=0,
+        zmax=255,
+        colorscale=colorscale,
+        colorbar=dict(
+            title="Samples",
+            tickvals=[1 + decade / max_decade * 254 for decade in range(max_decade + 1)],
+            ticktext=[f"{10 ** decade:,}" for decade in range(max_decade + 1)]
+        ),
+        hovertemplate="Distance %{x:.0f} m<br>Noise %{y:.1f} dB<extra></extra>"
+    ))
+    # 보이는 범위 안의 역 위치 (역 구간 경계; 본선과 지선이 함께 쓰는 역은 한 번만)
+    visible = [
+        (distance, code) for distance, code in dict.fromkeys(zip(station_distances, station_codes))
+        if x_edges[0] <= distance <= x_edges[-1]
+    ]
+    fig.update_layout(
+        title=f"Noise Density over Distance ({n_runs} run{'s' if n_runs != 1 else ''})",
+        xaxis=dict(title="Distance (m)"),
+        yaxis=dict(title="Noise Level (dB)"),
+        height=450,
+        shapes=[
+            dict(type="line", xref="x", yref="paper", x0=distance, x1=distance, y0=0, y1=1,
+                 line=dict(color="white", width=1, dash="dot"))
+            for distance, _ in visible
+        ],
+        annotations=[
+            dict(x=distance, y=1, xref="x", yref="paper", text=code, showarrow=False, yanchor="bottom")
+            for distance, code in visible
+        ]
+    )
+    return fig
+
+
+def payload_bytes(fig):
+    """
+    브라우저로 보내는 그래프 JSON 크기(바이트)
+    """
+    return len(fig.to_json(validate=False))
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import os
+import subprocess
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pandas as pd
+
+GPG_BINARY = "gpg"
+
+
+# 파일 해시 계산
+@lru_cache(maxsize=64)
+def _sha256_of(path, size, mtime_ns):
+    """
+    파일 내용의 SHA-256 해시를 계산합니다. (size, mtime) 이 바뀌면 다시 계산합니다.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    """
+    암호화된 파일의 내용 해시를 반환합니다. 캐시 키로 사용합니다.
+    """
+    stat = os.stat(path)
+    return _sha256_of(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+# GPG 실행
+def _passphrase_pipe(passphrase):
+    """
+    비밀번호를 담은 파이프를 만들고 읽기 쪽 파일 디스크립터를 반환합니다.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        os.write(write_fd, passphrase.encode("utf-8") + b"\n")
+    finally:
+        os.close(write_fd)
+    return read_fd
+
+
+def _gpg_command(passphrase_fd, args):
+    return [GPG_BINARY, "--batch", "--yes", "--quiet", "--passphrase-fd", str(passphrase_fd), *args]
+
+
+def run_gpg(args, passphrase, data=None):
+    """
+    셸을 거치지 않고 gpg를 실행하고 표준 출력을 bytes로 반환합니다.
+    비밀번호는 별도의 파이프로 전달되므로 명령줄이나 디스크에 남지 않습니다.
+    """
+    read_fd = _passphrase_pipe(passphrase)
+    try:
+        result = subprocess.run(
+            _gpg_command(read_fd, args),
+            input=data,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            pass_fds=(read_fd,),
+            check=True
+        )
+    finally:
+        os.close(read_fd)
+    return result.stdout
+
+
+@contextmanager
+def open_decrypted_stream(encrypted_file, passphrase):
+    """
+    암호화된 파일을 복호화하면서 평문을 스트림(파일 객체)으로 읽습니다.
+    평문 전체를 메모리에 올리지 않으므로 아주 큰 파일도 조금씩 처리할 수 있습니다.
+    """
+    read_fd = _passphrase_pipe(passphrase)
+    command = _gpg_command(read_fd, ["--decrypt", encrypted_file])
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, pass_fds=(read_fd,))
+    finally:
+        os.close(read_fd)
+
+    try:
+        yield process.stdout
+    except BaseException as exc:
+        # 읽기 중 오류가 나면 gpg 쪽 오류(비밀번호 오류 등)를 우선 보고합니다.
+        returncode, stderr = _close_process(process)
+        if returncode > 0:
+            raise subprocess.CalledProcessError(returncode, command, stderr=stderr) from exc
+        raise
+    returncode, stderr = _close_process(process)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
+
+def _close_process(process):
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.stderr.close()
+    return process.wait(), stderr
+
+
+def decrypt_file(encrypted_file, passphrase):
+    """
+    암호화된 파일을 복호화하여 평문 bytes를 반환합니다. 평문 파일은 만들지 않습니다.
+    """
+    return run_gpg(["--decrypt", encrypted_file], passphrase)
+
+
+def read_encrypted_csv(encrypted_file, passphrase, **read_csv_kwargs):
+    """
+    암호화된 CSV 파일을 메모리에서 복호화하여 데이터프레임으로 읽습니다.
+    """
+    plaintext = decrypt_file(encrypted_file, passphrase)
+    return pd.read_csv(io.BytesIO(plaintext), **read_csv_kwargs)
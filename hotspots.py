@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from segment_engine import segment_members
+from speed_cube import to_energy, to_level
+
+# 거리 순 dB 시계열에서 짧고 큰 소음 구간(레일 파상마모, 불량 이음매 등)을 찾습니다.
+# 샘플을 1 m 거리 칸에 모은 뒤 누적합(cumsum)으로 이동 창 Leq 와 넓은 창의 기준 레벨을 한 번에 계산하고,
+# 조건을 넘는 연속 칸을 구간으로 묶습니다. 여러 실행 데이터는 [실행, 거리 칸] 격자 하나로 함께 처리합니다.
+# 샘플 간격이 칸보다 넓어 빈 칸이 생겨도 이동 창 안에 샘플이 있으면 구간이 끊기지 않으며,
+# 구간의 시작/끝은 샘플이 있는 칸으로 맞춥니다.
+BUCKET_WIDTH = 1.0  # 거리 칸 폭 (m)
+WINDOW_LENGTH = 20.0  # 이동 창 길이 (m)
+BASELINE_LENGTH = 500.0  # 기준 레벨(주변 평균) 창 길이 (m)
+EXCESS_DB = 6.0  # 기준 레벨보다 이만큼 크면 표시 (dB)
+MIN_SPAN_LENGTH = 5.0  # 이보다 짧은 구간은 무시 (m)
+
+HOTSPOT_COLUMNS = [
+    'Start Distance (m)', 'End Distance (m)', 'Length (m)', 'Peak (dBA)', 'Peak Distance (m)',
+    'Window Leq (dBA)', 'Baseline (dBA)', 'Excess (dB)'
+]
+
+
+def trace_levels(trace, name='dB'):
+    """
+    라인 차트 데이터에서 (거리, 값) 배열을 꺼냅니다.
+    DistanceTrace 는 원본 샘플, 스트리밍 요약(TraceAccumulator)은 거리 버킷별 최대값을 씁니다.
+    """
+    if hasattr(trace, 'columns'):
+        return trace.distances, trace.columns[name]
+    return trace.bucket_centers, trace.maximum[name]
+
+
+def _rolling_sum(grid, n_buckets):
+    """
+    각 칸을 중심으로 한 n_buckets 칸 합을 [실행, 칸] 격자의 행마다 누적합으로 계산합니다.
+    """
+    half = n_buckets // 2
+    cumulative = np.zeros((grid.shape[0], grid.shape[1] + 1))
+    np.cumsum(grid, axis=1, out=cumulative[:, 1:])
+    positions = np.arange(grid.shape[1])
+    lo = np.clip(positions - half, 0, grid.shape[1])
+    hi = np.clip(positions - half + n_buckets, 0, grid.shape[1])
+    return cumulative[:, hi] - cumulative[:, lo]
+
+
+def _rolling_leq(energy, counts, n_buckets):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return to_level(_rolling_sum(energy, n_buckets) / _rolling_sum(counts, n_buckets))
+
+
+def detect_hotspots(distances, levels, run_ids=None, n_runs=1, threshold=None, excess=EXCESS_DB,
+                    window=WINDOW_LENGTH, baseline_window=BASELINE_LENGTH, bucket_width=BUCKET_WIDTH,
+                    min_length=MIN_SPAN_LENGTH):
+    """
+    이동 창 Leq 가 threshold(dBA) 이상이거나 주변 기준 레벨보다 excess(dB) 이상 큰 연속 구간을 찾습니다.
+    threshold / excess 중 None 인 조건은 쓰지 않습니다.
+
+    반환값: 구간별 데이터프레임 (run_ids 가 있으면 'Run' 컬럼에 실행 번호)
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.float64)
+    run_ids = np.zeros(len(distances), dtype=np.int64) if run_ids is None else np.asarray(run_ids, dtype=np.int64)
+    valid = np.isfinite(distances) & np.isfinite(levels)
+    distances, levels, run_ids = distances[valid], levels[valid], run_ids[valid]
+    columns = ['Run'] + HOTSPOT_COLUMNS
+    if len(distances) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # [실행, 거리 칸] 격자: 에너지 합, 샘플 수, 최대값 (양 끝에 빈 칸을 하나씩 두어 구간이 실행 경계를 넘지 않게 함)
+    first_bucket = int(np.floor(distances.min() / bucket_width))
+    buckets = np.floor(distances / bucket_width).astype(np.int64) - first_bucket + 1
+    width = int(buckets.max()) + 2
+    cells = run_ids * width + buckets
+    size = n_runs * width
+    energy = np.bincount(cells, weights=to_energy(levels), minlength=size).reshape(n_runs, width)
+    counts = np.bincount(cells, minlength=size).reshape(n_runs, width).astype(np.float64)
+    peak = np.full(size, np.nan)
+    np.fmax.at(peak, cells, levels)
+    peak = peak.reshape(n_runs, width)
+
+    window_leq = _rolling_leq(energy, counts, max(int(round(window / bucket_width)), 1))
+    baseline_leq = _rolling_leq(energy, counts, max(int(round(baseline_window / bucket_width)), 1))
+    flagged = np.zeros((n_runs, width), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if threshold is not None:
+            flagged |= window_leq >= threshold
+        if excess is not None:
+            flagged |= window_leq - baseline_leq >= excess
+    flagged[:, [0, -1]] = False  # 창에 샘플이 없는 칸(NaN)은 위 비교에서 이미 False
+
+    # 연속된 표시 칸을 구간 [start, end) 로 묶기
+    edges = np.diff(flagged.astype(np.int8), axis=1)
+    span_rows, span_starts = np.nonzero(edges == 1)
+    _, span_ends = np.nonzero(edges == -1)
+    span_starts += 1
+    span_ends += 1
+
+    # 구간을 샘플이 있는 첫 칸 ~ 마지막 칸으로 줄이기 (샘플이 없는 구간은 버림)
+    occupied = np.flatnonzero(counts.reshape(-1) > 0)
+    lo = span_rows * width + span_starts
+    hi = span_rows * width + span_ends
+    first_occupied = occupied[np.minimum(np.searchsorted(occupied, lo), len(occupied) - 1)]
+    last_occupied = occupied[np.maximum(np.searchsorted(occupied, hi) - 1, 0)]
+    has_samples = (first_occupied >= lo) & (first_occupied < hi)
+    span_starts = first_occupied - span_rows * width
+    span_ends = last_occupied - span_rows * width + 1
+    keep = has_samples & ((span_ends - span_starts) * bucket_width >= min_length)
+    span_rows, span_starts, span_ends = span_rows[keep], span_starts[keep], span_ends[keep]
+    if len(span_rows) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # 구간별 최대값과 그 위치 (구간 칸을 펼쳐서 한 번에 계산)
+    lo = span_rows * width + span_starts
+    hi = span_rows * width + span_ends
+    span_ids, members = segment_members(lo, hi)
+    member_peak = peak.reshape(-1)[members]
+    with np.errstate(invalid="ignore"):
+        member_excess = (window_leq - baseline_leq).reshape(-1)[members]
+    span_peak = np.full(len(lo), -np.inf)
+    np.fmax.at(span_peak, span_ids, member_peak)
+    span_excess = np.full(len(lo), -np.inf)
+    np.fmax.at(span_excess, span_ids, member_excess)
+    span_window = np.full(len(lo), -np.inf)
+    np.fmax.at(span_window, span_ids, window_leq.reshape(-1)[members])
+    is_peak = member_peak == span_peak[span_ids]
+    _, first_peak = np.unique(span_ids[is_peak], return_index=True)
+    peak_cell = members[is_peak][first_peak]
+    peak_bucket = peak_cell % width
+
+    def to_distance(bucket):
+        return (bucket - 1 + first_bucket) * bucket_width
+
+    start_distance = to_distance(span_starts)
+    end_distance = to_distance(span_ends)
+    return pd.DataFrame({
+        'Run': span_rows,
+        'Start Distance (m)': start_distance,
+        'End Distance (m)': end_distance,
+        'Length (m)': end_distance - start_distance,
+        'Peak (dBA)': span_peak,
+        'Peak Distance (m)': to_distance(peak_bucket) + bucket_width / 2,
+        'Window Leq (dBA)': span_window,
+        'Baseline (dBA)': baseline_leq.reshape(-1)[peak_cell],
+        'Excess (dB)': span_excess,
+    })
+
+
+def detect_run_hotspots(traces, station_processor=None, **options):
+    """
+    여러 실행 데이터({이름: (거리, dB)})의 소음 집중 구간을 한 번에 찾습니다.
+    station_processor 가 있으면 최대값 위치의 역 구간 이름을 'Station Pair' 컬럼에 넣습니다.
+    """
+    names = list(traces)
+    lengths = [len(traces[name][0]) for name in names]
+    distances = np.concatenate([np.asarray(traces[name][0], dtype=np.float64) for name in names])
+    levels = np.concatenate([np.asarray(traces[name][1], dtype=np.float64) for name in names])
+    run_ids = np.repeat(np.arange(len(names)), lengths)
+    hotspots = detect_hotspots(distances, levels, run_ids=run_ids, n_runs=len(names), **options)
+    hotspots['Run'] = np.asarray(names, dtype=object)[hotspots['Run'].to_numpy(dtype=np.int64)]
+    if station_processor is not None:
+        segments = station_processor.locate(hotspots['Peak Distance (m)'].to_numpy(dtype=np.float64))
+        labels = np.asarray(list(station_processor.station_pairs) + [None], dtype=object)
+        hotspots.insert(1, 'Station Pair', labels[segments])
+    return hotspots.sort_values(['Run', 'Start Distance (m)'], ignore_index=True)
@@ -0,0 +1,191 @@
+import io
+import os
+import socket
+
+import numpy as np
+import pandas as pd
+
+from segment_engine import locate_segments
+from streaming_ingest import NOISE_COLUMNS, SegmentSpeedAccumulator
+
+LIVE_BUFFER_ROWS = 200_000  # 링 버퍼에 보관하는 최근 샘플 수
+LIVE_REFRESH_SECONDS = 2
+DEFAULT_LIVE_PORT = 9750
+
+
+# 최근 샘플 링 버퍼
+class RingBuffer:
+    def __init__(self, capacity, columns=NOISE_COLUMNS):
+        """
+        최근 capacity 개 샘플만 고정 크기 numpy 배열에 보관합니다. 메모리 사용량은 일정합니다.
+        """
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.data = {name: np.full(capacity, np.nan, dtype=np.float32) for name in self.columns}
+        self.total = 0  # 지금까지 들어온 전체 샘플 수
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, chunk):
+        """
+        새 샘플(데이터프레임)을 추가합니다. 버퍼보다 크면 마지막 capacity 개만 남습니다.
+        """
+        n_rows = len(chunk)
+        if n_rows == 0:
+            return
+        skip = max(n_rows - self.capacity, 0)
+        positions = (self.total + skip + np.arange(n_rows - skip)) % self.capacity
+        for name in self.columns:
+            self.data[name][positions] = chunk[name].to_numpy(dtype=np.float32)[skip:]
+        self.total += n_rows
+
+    def view(self):
+        """
+        버퍼 내용을 들어온 순서대로 반환합니다.
+        """
+        size = len(self)
+        start = (self.total - size) % self.capacity
+        order = (start + np.arange(size)) % self.capacity
+        return {name: values[order] for name, values in self.data.items()}
+
+
+# 입력 소스
+class CsvTailSource:
+    def __init__(self, path):
+        """
+        계속 커지는 CSV 파일의 새로 추가된 완전한 줄만 읽습니다. (tail -f)
+        파일이 줄어들거나(잘림) 다른 파일로 바뀌면(로그 교체) 처음부터 헤더와 함께 다시 읽습니다.
+        """
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.header = None
+        self.pending = b""
+
+    def _restart(self):
+        self.offset = 0
+        self.header = None
+        self.pending = b""
+
+    def poll(self):
+        if not os.path.exists(self.path):
+            return _empty_frame()
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._restart()
+                self.inode = stat.st_ino
+            f.seek(self.offset)
+            data = f.read()
+            self.offset = f.tell()
+        return self._parse(data)
+
+    def _parse(self, data):
+        data = self.pending + data
+        last_newline = data.rfind(b"\n")
+        if last_newline < 0:
+            self.pending = data
+            return _empty_frame()
+        complete, self.pending = data[:last_newline + 1], data[last_newline + 1:]
+        if self.header is None:
+            header_line, complete = complete.split(b"\n", 1)
+            self.header = [name.strip() for name in header_line.decode("utf-8").split(",")]
+        if not complete.strip():
+            return _empty_frame()
+        chunk = pd.read_csv(io.BytesIO(complete), header=None, names=self.header)
+        return chunk[NOISE_COLUMNS]
+
+    def close(self):
+        pass
+
+
+class SocketSource(CsvTailSource):
+    def __init__(self, host, port):
+        """
+        로컬 소켓으로 들어오는 CSV 줄(distance,dB,speed)을 읽습니다. 연결마다 첫 줄은 헤더입니다.
+        """
+        super().__init__(path=None)
+        self.address = (host, port)
+        self.connection = None
+
+    def poll(self):
+        if self.connection is None:
+            try:
+                self.connection = socket.create_connection(self.address, timeout=1)
+            except OSError:
+                return _empty_frame()
+            self.connection.setblocking(False)
+            # 새 연결은 헤더부터 다시 보내므로 이전 연결의 헤더와 끊긴 줄은 버립니다.
+            self._restart()
+        chunks = []
+        while True:
+            try:
+                data = self.connection.recv(1 << 20)
+            except BlockingIOError:
+                break
+            if not data:  # 상대가 연결을 닫음
+                self.close()
+                break
+            chunks.append(data)
+        return self._parse(b"".join(chunks))
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def open_source(spec):
+    """
+    'host:port' 또는 'tcp://host:port' 는 소켓, 그 외에는 CSV 파일 경로로 해석합니다.
+    """
+    address = spec[len("tcp://"):] if spec.startswith("tcp://") else spec
+    host, _, port = address.rpartition(":")
+    if port.isdigit() and not os.path.exists(spec):
+        return SocketSource(host or "127.0.0.1", int(port))
+    return CsvTailSource(spec)
+
+
+def _empty_frame():
+    return pd.DataFrame({name: pd.Series(dtype=np.float32) for name in NOISE_COLUMNS})
+
+
+# 실시간 세션
+class LiveSession:
+    def __init__(self, source, station_btw_distance, capacity=LIVE_BUFFER_ROWS):
+        """
+        입력 소스에서 새 샘플을 가져와 링 버퍼와 구간별 누적 통계를 점진적으로 갱신합니다.
+        """
+        self.source = source
+        self.station_btw_distance = station_btw_distance
+        self.buffer = RingBuffer(capacity)
+        self.segments = SegmentSpeedAccumulator(station_btw_distance)
+        self.last_batch_rows = 0
+
+    def poll(self):
+        """
+        새로 들어온 샘플만 처리합니다. 반환값: 새 샘플 수
+        """
+        chunk = self.source.poll()
+        self.last_batch_rows = len(chunk)
+        if len(chunk):
+            self.buffer.append(chunk)
+            self.segments.update(chunk['distance'].values, chunk['speed'].values, chunk['dB'].values)
+        return len(chunk)
+
+    def close(self):
+        """
+        입력 소스(소켓 연결)를 닫습니다. 세션을 바꾸거나 실시간 모드를 끌 때 부릅니다.
+        """
+        self.source.close()
+
+    def current_segment(self):
+        """
+        가장 최근 샘플이 속한 역 구간 번호를 반환합니다. (구간 밖이면 None)
+        """
+        if len(self.buffer) == 0:
+            return None
+        distance = self.buffer.data['distance'][(self.buffer.total - 1) % self.buffer.capacity]
+        segment = int(locate_segments([distance], self.station_btw_distance)[0])
+        return segment if segment >= 0 else None
@@ -7,25 +7,14 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
-import subprocess
-
-
-
-stationdata = {
-    "station": [
-        "Depo", "Lebakbulus", "Fatmawati", "Cipeteraya", "Haji Nawi", "Blok A",
-        "Blok M", "ASEAN", "Senayan", "Istora", "Bendunganhilir",
-        "Setiabudi", "Dukuh Atas", "Bundaran HI"
-    ],
-    "code": [
-        "DPO", "LBB", "FTW", "CPR", "HJN", "BLA", "BLM", "ASN", "SNY", "IST",
-        "BNH", "SET", "DKA", "BHI"
-    ],
-    "station distance": [
-        0, 329, 2347, 4158, 5456, 6672, 7843, 8570, 10089, 10903,
-        12218, 13001, 13917, 14983
-    ]
-}
+
+from gpg_loader import file_sha256, read_encrypted_csv
+from station_registry import StationRegistry
+
+
+
+# 역 정보: 본선 + 차량기지 지선(Depo, DPO 0 m) - stations.json
+stationdata = StationRegistry.from_file().stations("NS", include_spurs=True)
 
 station_df = pd.DataFrame(stationdata)
 
@@ -46,6 +35,15 @@ csv_file_paths = {
 # Streamlit Secrets에서 비밀번호 가져오기
 gpg_password = st.secrets["general"]["GPG_PASSWORD"]
 
+
+@st.cache_data(show_spinner="Decrypting data...")
+def load_noise_data(content_hash, encrypted_file, _passphrase):
+    """
+    암호화된 CSV 파일을 복호화하여 읽습니다. 파일 내용 해시가 같으면 재실행/세션 간에 재사용합니다.
+    """
+    return read_encrypted_csv(encrypted_file, _passphrase)
+
+
 # Sidebar
 with st.sidebar:
     st.header("Noise Monitoring Dashboard")
@@ -56,16 +54,9 @@ with st.sidebar:
     )
     selected_csv_url = csv_file_paths[selected_csv_name]  # Get the corresponding file URL
 
-    # 암호화된 파일을 다운로드 후 GPG 복호화 실행
+    # 암호화된 파일을 메모리에서 복호화 (파일 내용 해시 기준으로 캐시)
     encrypted_file = selected_csv_name
-    decrypted_file = f"decrypted_{selected_csv_name.replace('.gpg', '.csv')}"  # 복호화된 파일 이름 설정
-
-    # GPG 복호화 명령 실행
-    command = f"echo {gpg_password} | gpg --batch --yes --passphrase-fd 0 -o {decrypted_file} -d {encrypted_file}"
-    subprocess.run(command, shell=True, check=True)
-
-    # 복호화된 CSV 파일 읽기
-    df = pd.read_csv(decrypted_file)
+    df = load_noise_data(file_sha256(encrypted_file), encrypted_file, gpg_password)
 
 
 # 데이터 준비 클래스 정의
@@ -78,6 +69,7 @@ class StationDataProcessor:
         self.codes = self.data_frame['code'].values
         self.stations = self.data_frame['station'].values
         self.station_distances = self.data_frame['station distance'].values
+        self.lines = self.data_frame['line'].values if 'line' in self.data_frame.columns else [None] * len(self.codes)
 
         self.station_pairs = []  # 역 쌍 리스트
         self.station_btw_distance = []  # 역 거리 리스트
@@ -90,6 +82,8 @@ class StationDataProcessor:
         for i in range(len(self.codes) - 1):
             if pd.isna(self.codes[i]) or pd.isna(self.codes[i + 1]) or pd.isna(self.station_distances[i]) or pd.isna(self.station_distances[i + 1]):
                 continue
+            if self.lines[i] != self.lines[i + 1]:  # 다른 노선의 역은 이웃해 있어도 구간이 아님
+                continue
             pair = f"{self.codes[i]} - {self.codes[i + 1]}"
             distance_pair = (self.station_distances[i], self.station_distances[i + 1])
             self.station_pairs.append(pair)
@@ -0,0 +1,353 @@
+"""
+역 구간 통계, 소음 집중 구간, 다운샘플링한 라인 차트 데이터를 JSON 으로 제공하는 로컬 읽기 전용 HTTP API 입니다.
+스트림릿 스크립트를 실행하지 않고 대시보드와 같은 컬럼형 캐시/속도 인덱스/라인 차트 데이터로 응답합니다.
+응답마다 ETag(파일 내용 해시 + 역 정보 + 요청 인자)를 붙이며, If-None-Match 가 같으면 데이터를 읽지 않고 304 를 돌려줍니다.
+
+사용 예:
+    GPG_PASSWORD=... python noise_api.py ./recordings --port 8750
+    curl 'http://127.0.0.1:8750/runs'
+    curl 'http://127.0.0.1:8750/runs/19_M1_S25_9002/segments?min_speed=50&direction=southbound'
+    curl 'http://127.0.0.1:8750/runs/19_M1_S25_9002/hotspots?excess=6&threshold=80'
+    curl 'http://127.0.0.1:8750/runs/19_M1_S25_9002/trace?column=dB&start=5000&end=9000&buckets=500'
+    curl 'http://127.0.0.1:8750/runs/19_M1_S25_9002/quality'
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from columnar_cache import load_run_columnar, sweep_stale_plain_files
+from data_validation import VALIDATION_VERSION
+from dataset_registry import DatasetRegistry
+from downsampling import DEFAULT_BUCKETS, DistanceTrace
+from gpg_loader import file_sha256
+from hotspots import BASELINE_LENGTH, EXCESS_DB, MIN_SPAN_LENGTH, WINDOW_LENGTH, detect_run_hotspots, trace_levels
+from noise_core import NoiseDataProcessor, StationDataProcessor, station_registry
+from run_comparison import run_label
+from station_registry import STATIONS_FILE
+from streaming_ingest import MAX_SPEED_BIN, should_stream, stream_run
+
+DEFAULT_API_PORT = 8750
+API_VERSION = "1"  # 응답 형식이 바뀌면 올려서 예전 ETag 를 무효화합니다.
+RESPONSE_CACHE_ENTRIES = 512  # 인코딩한 응답 본문을 보관할 개수
+MAX_TRACE_BUCKETS = 20_000
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_value(value):
+    """
+    numpy 값과 NaN 을 JSON 에 맞게 바꿉니다. (NaN/inf -> null)
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def to_records(frame):
+    """
+    데이터프레임을 JSON 행 목록으로 변환합니다.
+    """
+    columns = list(frame.columns)
+    return [
+        {column: _json_value(value) for column, value in zip(columns, row)}
+        for row in frame.itertuples(index=False, name=None)
+    ]
+
+
+def _array(values):
+    return [_json_value(value) for value in np.asarray(values, dtype=np.float64)]
+
+
+def load_api_dataset(encrypted_file, passphrase, content_hash, streaming, station_processor):
+    """
+    API 응답에 필요한 속도 인덱스와 라인 차트 데이터를 만듭니다. (대시보드의 load_run_dataset 과 같은 캐시 사용)
+    """
+    station_btw_distance = station_processor.station_btw_distance
+    if streaming:
+        streamed_run = stream_run(encrypted_file, passphrase, station_btw_distance)
+        return {"speed_index": streamed_run.segments, "distance_trace": streamed_run.trace,
+                "quality": streamed_run.quality}
+    df = load_run_columnar(encrypted_file, passphrase, content_hash=content_hash)
+    return {
+        "speed_index": NoiseDataProcessor(df, station_processor).build_speed_index(),
+        "distance_trace": DistanceTrace(df['distance'].values, dB=df['dB'].values, speed=df['speed'].values),
+        "quality": df.attrs.get("quality"),
+    }
+
+
+class NoiseApi:
+    def __init__(self, input_dir, passphrase, registry=None):
+        """
+        input_dir 의 *.csv.gpg 실행 데이터에 대한 요청을 처리합니다. (HTTP 와 무관하며 스레드 안전)
+        """
+        self.input_dir = input_dir
+        self.passphrase = passphrase
+        self.registry = registry or DatasetRegistry()
+        self._responses = OrderedDict()  # ETag -> 인코딩한 본문 (LRU)
+        self._lock = threading.Lock()
+
+    def runs(self):
+        """
+        실행 라벨 -> 파일 경로 (요청마다 디렉터리를 다시 읽어 새 파일을 반영)
+        """
+        files = sorted(glob.glob(os.path.join(self.input_dir, "*.csv.gpg")))
+        return {run_label(name): name for name in files}
+
+    def _run_file(self, run):
+        encrypted_file = self.runs().get(run)
+        if encrypted_file is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"unknown run {run!r}")
+        return encrypted_file
+
+    @staticmethod
+    def _station_layout(params):
+        """
+        요청 인자에서 (노선, 방향, 지선 포함 여부)를 읽습니다. 없으면 대시보드 기본값을 씁니다.
+        """
+        line_id = params.get("line", station_registry.default_line)
+        if line_id not in station_registry.lines:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown line {line_id!r}")
+        directions = station_registry.directions(line_id)
+        direction = params.get("direction", next(iter(directions)))
+        if direction not in directions:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown direction {direction!r} for line {line_id!r}")
+        include_spurs = params.get("spurs", "0").lower() in ("1", "true", "yes")
+        return line_id, direction, include_spurs
+
+    @staticmethod
+    def _float(params, name, default=None):
+        value = params.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            number = float(value)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a number") from None
+        if not np.isfinite(number):  # 'nan', 'inf' 는 float() 가 받아 주지만 의미 있는 인자가 아님
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a finite number")
+        return number
+
+    @staticmethod
+    def path_parts(path):
+        """
+        요청 경로를 디코딩한 구성 요소 튜플로 정규화합니다. ('/runs/', '//runs', '/%72uns' 는 모두 ('runs',))
+        ETag 와 라우팅이 같은 값을 쓰므로 같은 자원의 다른 표기는 같은 ETag/캐시 항목이 됩니다.
+        """
+        return tuple(unquote(part) for part in path.split("/") if part)
+
+    def etag(self, route, params):
+        """
+        응답을 결정하는 입력(파일 내용 해시, 역 정보 파일, 경로, 인자)으로 ETag 를 만듭니다.
+        route 는 path_parts() 로 정규화한 경로입니다.
+        결과를 계산하지 않고 만들 수 있으므로 변경되지 않은 요청은 비용 없이 304 로 답합니다.
+        """
+        parts = [API_VERSION, str(VALIDATION_VERSION), json.dumps(route), json.dumps(sorted(params.items()))]
+        stations_stat = os.stat(STATIONS_FILE)
+        parts.append(f"{stations_stat.st_size}:{stations_stat.st_mtime_ns}")
+        if route and route[0] == "runs":
+            runs = self.runs()
+            if len(route) == 1:
+                parts += [file_sha256(name) for name in runs.values()]
+            else:
+                parts.append(file_sha256(self._run_file(route[1])))
+        return '"' + hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32] + '"'
+
+    def _lease_run(self, run, station_layout):
+        encrypted_file = self._run_file(run)
+        content_hash = file_sha256(encrypted_file)
+        streaming = should_stream(encrypted_file)
+        station_processor = StationDataProcessor.from_registry(station_registry, *station_layout)
+        lease = self.registry.lease(
+            ("api", content_hash, streaming) + station_layout,
+            lambda: load_api_dataset(encrypted_file, self.passphrase, content_hash, streaming, station_processor)
+        )
+        return lease, station_processor
+
+    def segments(self, run, params):
+        # 스트리밍 요약은 1 km/h 칸 단위이므로 대시보드와 같이 정수 최소 속도만 받습니다.
+        min_speed = self._float(params, "min_speed", 50.0)
+        if min_speed != int(min_speed) or not 0 <= min_speed <= MAX_SPEED_BIN:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"min_speed must be a whole number between 0 and {MAX_SPEED_BIN}")
+        min_speed = int(min_speed)
+        station_layout = self._station_layout(params)
+        lease, station_processor = self._lease_run(run, station_layout)
+        try:
+            noise_processor = NoiseDataProcessor(None, station_processor)
+            table = noise_processor.get_segment_table(min_speed, lease.value["speed_index"])
+        finally:
+            lease.release()
+        return {"run": run, "line": station_layout[0], "direction": station_layout[1],
+                "min_speed": min_speed, "segments": to_records(table)}
+
+    def hotspots(self, run, params):
+        station_layout = self._station_layout(params)
+        options = {
+            "threshold": self._float(params, "threshold"),
+            "excess": self._float(params, "excess", EXCESS_DB),
+            "window": self._float(params, "window", WINDOW_LENGTH),
+            "baseline_window": self._float(params, "baseline_window", BASELINE_LENGTH),
+            "min_length": self._float(params, "min_length", MIN_SPAN_LENGTH),
+        }
+        if options["excess"] is not None and options["excess"] <= 0:
+            options["excess"] = None
+        lease, station_processor = self._lease_run(run, station_layout)
+        try:
+            table = detect_run_hotspots(
+                {run: trace_levels(lease.value["distance_trace"])}, station_processor, **options
+            )
+        finally:
+            lease.release()
+        return {"run": run, "options": options, "hotspots": to_records(table)}
+
+    def trace(self, run, params):
+        column = params.get("column", "dB")
+        if column not in ("dB", "speed"):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "column must be 'dB' or 'speed'")
+        start = self._float(params, "start")
+        end = self._float(params, "end")
+        buckets = int(np.clip(self._float(params, "buckets", DEFAULT_BUCKETS), 1, MAX_TRACE_BUCKETS))
+        lease, _ = self._lease_run(run, self._station_layout(params))
+        try:
+            distances, values = lease.value["distance_trace"].downsample(column, start, end, n_buckets=buckets)
+        finally:
+            lease.release()
+        return {"run": run, "column": column, "distance": _array(distances), "values": _array(values)}
+
+    def quality(self, run, params):
+        lease, _ = self._lease_run(run, self._station_layout(params))
+        try:
+            report = lease.value["quality"]
+        finally:
+            lease.release()
+        return {"run": run, "quality": report}
+
+    def route(self, route, params):
+        """
+        경로(path_parts() 로 정규화한 튜플)에 맞는 처리 함수를 호출해 JSON 으로 보낼 객체를 반환합니다.
+        """
+        if route == ("runs",):
+            return {"runs": [
+                {"run": run, "file": os.path.basename(name), "content_hash": file_sha256(name),
+                 "streaming": should_stream(name)}
+                for run, name in self.runs().items()
+            ]}
+        if route == ("stations",):
+            line_id, direction, include_spurs = self._station_layout(params)
+            station_processor = StationDataProcessor.from_registry(station_registry, line_id, direction, include_spurs)
+            return {"line": line_id, "direction": direction,
+                    "stations": station_registry.stations(line_id, include_spurs),
+                    "station_pairs": list(station_processor.station_pairs)}
+        handlers = {"segments": self.segments, "hotspots": self.hotspots, "trace": self.trace, "quality": self.quality}
+        if len(route) == 3 and route[0] == "runs" and route[2] in handlers:
+            return handlers[route[2]](route[1], params)
+        raise ApiError(HTTPStatus.NOT_FOUND, f"no such endpoint {'/' + '/'.join(route)!r}")
+
+    def respond(self, path, params, if_none_match=None):
+        """
+        반환값: (상태 코드, ETag, 본문 바이트) - If-None-Match 가 맞으면 본문 없이 304
+        같은 ETag 의 본문은 다시 계산하지 않고 보관한 것을 씁니다.
+        """
+        route = self.path_parts(path)
+        etag = self.etag(route, params)
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")] + ['*']:
+            return HTTPStatus.NOT_MODIFIED, etag, b""
+        with self._lock:
+            body = self._responses.get(etag)
+            if body is not None:
+                self._responses.move_to_end(etag)
+        if body is None:
+            body = json.dumps(self.route(route, params), allow_nan=False).encode()
+            with self._lock:
+                self._responses[etag] = body
+                while len(self._responses) > RESPONSE_CACHE_ENTRIES:
+                    self._responses.popitem(last=False)
+        return HTTPStatus.OK, etag, body
+
+
+class NoiseApiHandler(BaseHTTPRequestHandler):
+    api = None  # make_server() 가 설정
+
+    def _send(self, status, body=b"", etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")  # 매번 If-None-Match 로 확인
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD" and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            status, etag, body = self.api.respond(url.path, params, self.headers.get("If-None-Match"))
+        except ApiError as exc:
+            self._send(exc.status, json.dumps({"error": str(exc)}).encode())
+            return
+        except Exception as exc:
+            self.log_error("request %s failed: %r", self.path, exc)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps({"error": str(exc)}).encode())
+            return
+        self._send(status, body, etag)
+
+    do_HEAD = do_GET
+
+
+def make_server(api, host="127.0.0.1", port=DEFAULT_API_PORT):
+    """
+    요청마다 스레드 하나로 처리하는 HTTP 서버를 만듭니다. (복호화/numpy 연산은 GIL 을 놓음)
+    """
+    handler = type("BoundNoiseApiHandler", (NoiseApiHandler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve segment statistics, hotspots and traces as read-only JSON.")
+    parser.add_argument("input_dir", nargs="?", default=".", help="directory containing *.csv.gpg recordings")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (local only by default)")
+    parser.add_argument("--port", type=int, default=DEFAULT_API_PORT)
+    parser.add_argument("--passphrase-env", default="GPG_PASSWORD",
+                        help="environment variable holding the GPG passphrase")
+    return parser, parser.parse_args(argv)
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    passphrase = os.environ.get(args.passphrase_env)
+    if not passphrase:
+        parser.error(f"environment variable {args.passphrase_env} is not set")
+    sweep_stale_plain_files()
+    server = make_server(NoiseApi(args.input_dir, passphrase), args.host, args.port)
+    print(f"Serving {args.input_dir} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+암호화된 소음 실행 데이터(*.csv.gpg)를 브라우저 없이 일괄 처리하는 명령줄 도구입니다.
+각 파일을 프로세스 풀에서 복호화/파싱/집계하여 역 구간별 통계표를 Parquet 파일로 저장합니다.
+--hotspots 를 주면 소음 집중 구간 표(<run>_hotspots.parquet)도 함께 저장합니다.
+--regression 을 주면 실행별 회귀 통계량(<run>_regression.npz)을 저장해 두고, 입력 폴더의 모든 실행의 통계량을 모아
+모든 실행 x 역 구간의 속도-소음 회귀를 한 번에 풀어 speed_regression.parquet (실행별 + 전체 합산 'All runs' 행)으로
+저장합니다. --skip-existing 으로 건너뛴 실행도 저장된 통계량으로 포함됩니다.
+실행 데이터는 처리 전에 한 번 검증/정리하며, 규칙별로 지운 행 수를 quality_report.parquet (실행마다 한 행)으로 저장합니다.
+단일 샘플 dB 튐(글리치 후보)은 소음 집중 구간일 수도 있으므로 세기만 하고, --drop-spikes 를 주면 지웁니다.
+
+사용 예:
+    GPG_PASSWORD=... python noise_batch.py ./recordings --output ./segment_tables --min-speed 0 50 --workers 8
+    GPG_PASSWORD=... python noise_batch.py ./recordings --hotspots --hotspot-excess 6
+    GPG_PASSWORD=... python noise_batch.py ./recordings --regression
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from chainage import ensure_distance
+from data_validation import DROP_RULES, VALIDATION_VERSION, validate_run
+from gpg_loader import read_encrypted_csv
+from hotspots import EXCESS_DB, detect_run_hotspots
+from noise_core import NoiseDataProcessor, StationDataProcessor, stationdata
+from run_comparison import run_label
+from speed_regression import SpeedRegression
+
+
+def process_run(encrypted_file, passphrase, min_speeds, hotspot_options=None, regression=False, drop_spikes=False):
+    """
+    실행 데이터 하나를 처리하여 최소 속도별 역 구간 통계표를 반환합니다. (작업자 프로세스에서 실행)
+    hotspot_options 가 있으면 소음 집중 구간 표도, regression=True 이면 회귀 통계량(작은 배열)도 함께 반환합니다.
+    drop_spikes=True 이면 검증 단계에서 글리치 후보(단일 샘플 dB 튐)도 지웁니다.
+
+    반환값: (구간 통계표, 소음 집중 구간 표 또는 None, SpeedRegression 또는 None, 품질 보고서)
+    """
+    df, quality = validate_run(ensure_distance(read_encrypted_csv(encrypted_file, passphrase)), drop_spikes=drop_spikes)
+    station_processor = StationDataProcessor(stationdata)
+    noise_processor = NoiseDataProcessor(df, station_processor)
+    speed_index = noise_processor.build_speed_index()
+    table = pd.concat(
+        [noise_processor.get_segment_table(min_speed, speed_index) for min_speed in min_speeds],
+        ignore_index=True
+    )
+    table.insert(0, 'Run', run_label(encrypted_file))
+    hotspots = None
+    if hotspot_options is not None:
+        hotspots = detect_run_hotspots(
+            {run_label(encrypted_file): (df['distance'].values, df['dB'].values)}, station_processor, **hotspot_options
+        )
+    speed_regression = None
+    if regression:
+        speed_regression = SpeedRegression.from_runs(
+            {run_label(encrypted_file): (df['distance'].values, df['speed'].values, df['dB'].values)},
+            station_processor.station_btw_distance
+        )
+    return table, hotspots, speed_regression, quality
+
+
+def quality_row(run, report):
+    """
+    품질 보고서를 표의 한 행(딕셔너리)으로 펼칩니다.
+    """
+    row = {'Run': run, 'Rows': report['rows'], 'Clean Rows': report['clean_rows'],
+           'Dropped Rows': report['dropped_rows']}
+    row.update({rule: report['rules'][rule] for rule in DROP_RULES})
+    row['dB_spikes'] = report['dB_spikes']
+    row['distance_reversals'] = report['distance_reversals']
+    row['duplicate_distances'] = report['duplicate_distances']
+    return row
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-process encrypted noise recordings into segment tables.")
+    parser.add_argument("input_dir", help="directory containing *.csv.gpg recordings")
+    parser.add_argument("--output", default="segment_tables", help="directory for the Parquet segment tables")
+    parser.add_argument("--min-speed", type=float, nargs="+", default=[0, 50],
+                        help="minimum speed thresholds (km/h) to aggregate at")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--passphrase-env", default="GPG_PASSWORD",
+                        help="environment variable holding the GPG passphrase")
+    parser.add_argument("--hotspots", action="store_true", help="also write a hotspot table per recording")
+    parser.add_argument("--hotspot-excess", type=float, default=EXCESS_DB,
+                        help="flag spans this many dB above the local baseline")
+    parser.add_argument("--hotspot-threshold", type=float, help="also flag spans above this absolute level (dBA)")
+    parser.add_argument("--regression", action="store_true",
+                        help="fit dB against log10(speed) per station pair across all recordings")
+    parser.add_argument("--drop-spikes", action="store_true",
+                        help="also drop single-sample dB spikes during validation (counted but kept by default)")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="skip recordings whose table and requested optional outputs already exist")
+    return parser, parser.parse_args(argv)
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    passphrase = os.environ.get(args.passphrase_env)
+    if not passphrase:
+        parser.error(f"environment variable {args.passphrase_env} is not set")
+
+    all_files = sorted(glob.glob(os.path.join(args.input_dir, "*.csv.gpg")))
+    os.makedirs(args.output, exist_ok=True)
+
+    def output_path(encrypted_file):
+        return os.path.join(args.output, f"{run_label(encrypted_file)}_segments.parquet")
+
+    def hotspot_path(encrypted_file):
+        return os.path.join(args.output, f"{run_label(encrypted_file)}_hotspots.parquet")
+
+    def run_regression_path(encrypted_file):
+        return os.path.join(args.output, f"{run_label(encrypted_file)}_regression.npz")
+
+    def quality_path(encrypted_file):
+        return os.path.join(args.output, f"{run_label(encrypted_file)}_quality.json")
+
+    def saved_quality(encrypted_file):
+        """
+        저장된 품질 보고서 (없거나 다른 검증 버전이면 None)
+        """
+        if not os.path.exists(quality_path(encrypted_file)):
+            return None
+        with open(quality_path(encrypted_file)) as f:
+            report = json.load(f)
+        return report if report.get('version') == VALIDATION_VERSION else None
+
+    def is_done(encrypted_file):
+        """
+        이번에 요청한 실행별 결과 파일이 모두 같은 검증 설정으로 있으면 True (--skip-existing)
+        """
+        report = saved_quality(encrypted_file)
+        if report is None or report['spikes_dropped'] != args.drop_spikes:
+            return False
+        outputs = [output_path(encrypted_file)]
+        if args.hotspots:
+            outputs.append(hotspot_path(encrypted_file))
+        if args.regression:
+            outputs.append(run_regression_path(encrypted_file))
+        return all(os.path.exists(path) for path in outputs)
+
+    encrypted_files = [name for name in all_files if not is_done(name)] if args.skip_existing else all_files
+    if not encrypted_files:
+        print("No recordings to process.")
+
+    hotspot_options = None
+    if args.hotspots:
+        hotspot_options = {"excess": args.hotspot_excess, "threshold": args.hotspot_threshold}
+
+    started = time.perf_counter()
+    failures = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(
+                process_run, name, passphrase, args.min_speed, hotspot_options, args.regression, args.drop_spikes
+            ): name
+            for name in encrypted_files
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                table, hotspots, speed_regression, quality = future.result()
+            except Exception as exc:
+                failures.append(name)
+                detail = getattr(exc, "stderr", None) or b""
+                print(f"FAILED {name}: {exc} {detail.decode(errors='replace').strip()}", file=sys.stderr)
+                continue
+            table.to_parquet(output_path(name), index=False)
+            print(f"{name}: {len(table)} rows -> {output_path(name)} "
+                  f"({quality['dropped_rows']}/{quality['rows']} samples dropped by validation)")
+            with open(quality_path(name), "w") as f:
+                json.dump(quality, f)
+            if hotspots is not None:
+                hotspots.to_parquet(hotspot_path(name), index=False)
+                print(f"{name}: {len(hotspots)} hotspots -> {hotspot_path(name)}")
+            if speed_regression is not None:
+                speed_regression.save(run_regression_path(name))
+
+    # 품질 표와 회귀는 입력 폴더의 모든 실행(이번에 건너뛴 것 포함)의 저장된 결과로 만듭니다.
+    quality_rows = [
+        quality_row(run_label(name), report)
+        for name, report in ((name, saved_quality(name)) for name in all_files) if report is not None
+    ]
+    if quality_rows:
+        report_path = os.path.join(args.output, "quality_report.parquet")
+        pd.DataFrame(quality_rows).to_parquet(report_path, index=False)
+        print(f"Data quality for {len(quality_rows)} recordings -> {report_path}")
+
+    # 저장된 통계량을 이어 붙여 모든 실행 x 역 구간을 한 번에 풉니다.
+    if args.regression:
+        station_processor = StationDataProcessor(stationdata)
+        regressions = []
+        for name in all_files:
+            if not os.path.exists(run_regression_path(name)):
+                continue
+            saved = SpeedRegression.load(run_regression_path(name))
+            if np.array_equal(saved.station_btw_distance, np.asarray(station_processor.station_btw_distance)):
+                regressions.append(saved)
+            else:
+                print(f"SKIPPED {run_regression_path(name)}: saved for a different station layout", file=sys.stderr)
+        if regressions:
+            station_pairs = station_processor.station_pairs
+            combined = SpeedRegression.concat(regressions)
+            regression_table = pd.concat(
+                [combined.to_frame(station_pairs), combined.pooled().to_frame(station_pairs)], ignore_index=True
+            )
+            regression_path = os.path.join(args.output, "speed_regression.parquet")
+            regression_table.to_parquet(regression_path, index=False)
+            print(f"Speed regression for {combined.n_runs} recordings -> {regression_path}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Processed {len(encrypted_files) - len(failures)}/{len(encrypted_files)} recordings in {elapsed:.1f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from noise_sketch import noise_descriptors
+from segment_engine import SpeedThresholdIndex, segment_statistics
+from station_registry import DESCENDING, SegmentIntervalIndex, StationRegistry
+
+# 스트림릿에 의존하지 않는 분석 코어입니다. 대시보드와 배치 CLI 가 함께 사용합니다.
+
+# 역 정보는 stations.json (노선/방향/지선) 에서 읽습니다. stationdata 는 기본 노선의 역 목록입니다.
+station_registry = StationRegistry.from_file()
+stationdata = station_registry.stations(station_registry.default_line)
+
+
+# 데이터 준비 클래스 정의
+class StationDataProcessor:
+    def __init__(self, data, direction=None):
+        """
+        역 데이터를 처리하는 클래스입니다.
+        direction 이 'descending' 이면 역 쌍을 거리 감소 방향(예: BHI - DKA)의 순서와 이름으로 만듭니다.
+        'line' 컬럼이 있으면 같은 노선의 이웃한 역끼리만 역 쌍을 만들고, 노선 순서(본선 먼저)대로 구간 번호를 매깁니다.
+        """
+        self.direction = direction
+        self.data_frame = pd.DataFrame(data)
+        self.codes = self.data_frame['code'].values
+        self.stations = self.data_frame['station'].values
+        self.station_distances = self.data_frame['station distance'].values
+        self.lines = self.data_frame['line'].values if 'line' in self.data_frame.columns else np.full(len(self.codes), None)
+
+        self.station_pairs = []  # 역 쌍 리스트
+        self.station_btw_distance = []  # 역 거리 리스트
+        self.segment_lines = []  # 구간별 노선 id
+        self.create_station_pairs()
+        self._interval_indexes = None
+
+    def create_station_pairs(self):
+        """
+        역 쌍을 생성합니다.
+        """
+        line_pairs = {}
+        for i in range(len(self.codes) - 1):
+            if pd.isna(self.codes[i]) or pd.isna(self.codes[i + 1]) or pd.isna(self.station_distances[i]) or pd.isna(self.station_distances[i + 1]):
+                continue
+            if self.lines[i] != self.lines[i + 1]:  # 다른 노선의 역은 이웃해 있어도 구간이 아님
+                continue
+            pair = f"{self.codes[i]} - {self.codes[i + 1]}"
+            distance_pair = (self.station_distances[i], self.station_distances[i + 1])
+            line_pairs.setdefault(self.lines[i], []).append((pair, distance_pair))
+        for line_id, pairs in line_pairs.items():
+            if self.direction == DESCENDING:
+                # 구간 거리는 (작은 값, 큰 값) 그대로 두고 노선 안의 순서와 이름만 진행 방향에 맞춥니다.
+                pairs = [(" - ".join(reversed(pair.split(" - "))), distance_pair) for pair, distance_pair in reversed(pairs)]
+            self.station_pairs += [pair for pair, _ in pairs]
+            self.station_btw_distance += [distance_pair for _, distance_pair in pairs]
+            self.segment_lines += [line_id] * len(pairs)
+
+    def locate(self, distances):
+        """
+        각 거리가 속한 구간 번호를 노선별 구간 인덱스로 찾습니다. (구간 밖이나 NaN 은 -1)
+        본선과 지선의 거리 범위가 겹치면 노선 순서대로(본선 먼저) 먼저 찾은 노선의 구간으로 정합니다.
+        """
+        if self._interval_indexes is None:
+            ids = np.arange(len(self.segment_lines))
+            line_ids = np.asarray(self.segment_lines, dtype=object)
+            bounds = np.asarray(self.station_btw_distance, dtype=np.float64).reshape(-1, 2)
+            self._interval_indexes = [
+                SegmentIntervalIndex(bounds[line_ids == line_id, 0], bounds[line_ids == line_id, 1], ids[line_ids == line_id])
+                for line_id in dict.fromkeys(self.segment_lines)
+            ]
+        distances = np.asarray(distances, dtype=np.float64)
+        located = np.full(distances.shape, -1, dtype=np.int64)
+        for index in self._interval_indexes:
+            missing = located < 0
+            located[missing] = index.locate(distances[missing])
+        return located
+
+    @classmethod
+    def from_registry(cls, registry, line_id=None, direction=None, include_spurs=False):
+        """
+        역 정보 저장소의 노선/방향/지선 설정으로 만듭니다.
+        direction 은 노선의 방향 이름(예: 'southbound') 또는 'ascending'/'descending' 입니다.
+        """
+        line_id = line_id or registry.default_line
+        order = registry.directions(line_id).get(direction, direction)
+        return cls(registry.stations(line_id, include_spurs), direction=order)
+
+
+class NoiseDataProcessor:
+    def __init__(self, data, station_processor):
+        """
+        소음 데이터를 처리하는 클래스입니다.
+        """
+        self.data_frame = data  # CSV에서 읽은 데이터 프레임
+        self.station_processor = station_processor  # StationDataProcessor 인스턴스
+        self.station_pairs = station_processor.station_pairs
+        self.station_btw_distance = station_processor.station_btw_distance
+
+    def get_filtered_data(self, min_speed):
+        """
+        속도 기준으로 데이터를 필터링합니다.
+        """
+        filtered_data = self.data_frame[self.data_frame['speed'] >= min_speed]
+        return filtered_data
+
+    def get_station_intervals(self, filtered_data):
+        """
+        역 구간별 평균 소음과 최대 소음을 계산합니다.
+        모든 구간을 한 번의 그룹 연산으로 계산하며, 데이터가 없는 구간은 0으로 채웁니다.
+        """
+        stats = segment_statistics(filtered_data['distance'].values, filtered_data['dB'].values, self.station_btw_distance)
+        return self.to_intervals_frame(stats)
+
+    def build_speed_index(self):
+        """
+        최소 속도 변경에 바로 응답할 수 있도록 구간별 속도 인덱스를 만듭니다.
+        """
+        return SpeedThresholdIndex(
+            self.data_frame['distance'].values,
+            self.data_frame['speed'].values,
+            self.data_frame['dB'].values,
+            self.station_btw_distance
+        )
+
+    def get_station_intervals_at_speed(self, min_speed, speed_index):
+        """
+        속도 인덱스를 이용해 최소 속도 이상인 데이터의 역 구간별 소음을 계산합니다.
+        get_filtered_data + get_station_intervals 와 같은 결과를 데이터 복사 없이 반환합니다.
+        """
+        return self.to_intervals_frame(speed_index.query(min_speed))
+
+    def get_noise_descriptors_at_speed(self, min_speed, speed_index):
+        """
+        최소 속도 이상인 데이터의 역 구간별 에너지 평균 소음(Leq)과 L10/L50/L90 을 계산합니다.
+        """
+        return self.descriptors_frame(speed_index.query(min_speed, levels=True))
+
+    def get_segment_table(self, min_speed, speed_index):
+        """
+        최소 속도 이상인 데이터의 역 구간별 전체 통계표를 만듭니다. (배치 처리/외부 제공용)
+        """
+        stats = speed_index.query(min_speed, levels=True)
+        descriptors = noise_descriptors(stats['level_histogram'], stats['energy'])
+        empty = stats['count'] == 0
+        starts, ends = zip(*self.station_btw_distance) if self.station_btw_distance else ((), ())
+        return pd.DataFrame({
+            'Min Speed (km/h)': min_speed,
+            'Station Pair': self.station_pairs,
+            'Start Distance (m)': np.asarray(starts, dtype=np.float64),
+            'End Distance (m)': np.asarray(ends, dtype=np.float64),
+            'Samples': stats['count'],
+            'Average Noise (dBA)': np.where(empty, 0, stats['mean']),
+            'Maximum Noise (dBA)': np.where(empty, 0, stats['max']),
+            'Leq (dBA)': descriptors['leq'],
+            'L10 (dBA)': descriptors['L10'],
+            'L50 (dBA)': descriptors['L50'],
+            'L90 (dBA)': descriptors['L90']
+        })
+
+    def descriptors_frame(self, stats):
+        """
+        구간 통계(levels=True 로 조회)를 Leq/L10/L50/L90 표로 변환합니다.
+        """
+        descriptors = noise_descriptors(stats['level_histogram'], stats['energy'])
+        return pd.DataFrame({
+            'Station Pair': self.station_pairs,
+            'Leq (dBA)': descriptors['leq'],
+            'L10 (dBA)': descriptors['L10'],
+            'L50 (dBA)': descriptors['L50'],
+            'L90 (dBA)': descriptors['L90']
+        })
+
+    def to_intervals_frame(self, stats):
+        """
+        구간 통계를 막대그래프용 데이터프레임으로 변환합니다. (데이터가 없는 구간은 0)
+        """
+        empty = stats['count'] == 0
+        return pd.DataFrame({
+            'Station Pair': self.station_pairs,
+            'Average Noise (dBA)': np.where(empty, 0, stats['mean']),
+            'Maximum Noise (dBA)': np.where(empty, 0, stats['max'])
+        })
@@ -0,0 +1,73 @@
+import numpy as np
+
+from speed_cube import to_energy, to_level
+
+# 소음 레벨 히스토그램 (병합 가능한 분위수 스케치)
+# 0.1 dB 폭의 고정 구간을 쓰므로 정렬 없이 한 번의 bincount 로 만들 수 있고,
+# 청크/실행 간에는 히스토그램을 더하기만 하면 정확히 합쳐집니다. 분위수 오차는 구간 폭의 절반 이하입니다.
+LEVEL_MIN = 0.0
+LEVEL_MAX = 150.0
+LEVEL_BIN_WIDTH = 0.1
+N_LEVEL_BINS = int(round((LEVEL_MAX - LEVEL_MIN) / LEVEL_BIN_WIDTH))
+
+# 통계적 소음 지표: L_n 은 측정 시간의 n% 동안 초과된 레벨
+EXCEEDANCE_LEVELS = (10, 50, 90)
+
+
+def level_bins(levels):
+    """
+    dB 값을 히스토그램 구간 번호로 변환합니다. 범위 밖 값은 양 끝 구간에 넣습니다.
+    """
+    bins = np.floor((np.asarray(levels, dtype=np.float64) - LEVEL_MIN) / LEVEL_BIN_WIDTH)
+    return np.clip(bins, 0, N_LEVEL_BINS - 1).astype(np.int64)
+
+
+def level_histograms(group_ids, levels, n_groups):
+    """
+    그룹(구간)별 dB 히스토그램과 에너지 합을 계산합니다. NaN 값은 제외합니다.
+
+    반환값: (히스토그램[그룹, 구간], 에너지 합[그룹])
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    valid = ~np.isnan(levels)
+    group_ids = np.asarray(group_ids)[valid]
+    levels = levels[valid]
+    cells = group_ids * N_LEVEL_BINS + level_bins(levels)
+    histogram = np.bincount(cells, minlength=n_groups * N_LEVEL_BINS).reshape(n_groups, N_LEVEL_BINS)
+    energy = np.bincount(group_ids, weights=to_energy(levels), minlength=n_groups)
+    return histogram, energy
+
+
+def histogram_quantiles(histogram, quantiles):
+    """
+    히스토그램에서 분위수를 계산합니다. (구간 중심값, 빈 그룹은 NaN)
+
+    반환값: [그룹, 분위수] 배열
+    """
+    histogram = np.atleast_2d(histogram)
+    quantiles = np.atleast_1d(np.asarray(quantiles, dtype=np.float64))
+    cumulative = np.cumsum(histogram, axis=1)
+    totals = cumulative[:, -1]
+    # q 분위수: 누적 개수가 q * 전체 이상이 되는 첫 구간
+    targets = np.maximum(np.ceil(quantiles[None, :] * totals[:, None]), 1)
+    positions = (cumulative[:, None, :] < targets[:, :, None]).sum(axis=2)
+    values = LEVEL_MIN + (np.minimum(positions, N_LEVEL_BINS - 1) + 0.5) * LEVEL_BIN_WIDTH
+    return np.where(totals[:, None] > 0, values, np.nan)
+
+
+def noise_descriptors(histogram, energy):
+    """
+    히스토그램과 에너지 합으로 Leq 와 L10/L50/L90 을 계산합니다.
+
+    반환값: {'leq': 배열, 'L10': 배열, 'L50': 배열, 'L90': 배열}
+    """
+    histogram = np.atleast_2d(histogram)
+    counts = histogram.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        leq = to_level(np.where(counts > 0, np.asarray(energy) / np.maximum(counts, 1), np.nan))
+    # L_n 은 (100 - n) 백분위수
+    levels = histogram_quantiles(histogram, [1 - n / 100 for n in EXCEEDANCE_LEVELS])
+    descriptors = {"leq": leq}
+    for column, n in enumerate(EXCEEDANCE_LEVELS):
+        descriptors[f"L{n}"] = levels[:, column]
+    return descriptors
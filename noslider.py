@@ -5,7 +5,8 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
-import subprocess
+
+from gpg_loader import file_sha256, read_encrypted_csv
 
 # Page configuration
 st.set_page_config(
@@ -24,6 +25,15 @@ csv_file_paths = {
 # Streamlit Secrets에서 비밀번호 가져오기
 gpg_password = st.secrets["general"]["GPG_PASSWORD"]
 
+
+@st.cache_data(show_spinner="Decrypting data...")
+def load_noise_data(content_hash, encrypted_file, _passphrase):
+    """
+    암호화된 CSV 파일을 복호화하여 읽습니다. 파일 내용 해시가 같으면 재실행/세션 간에 재사용합니다.
+    """
+    return read_encrypted_csv(encrypted_file, _passphrase)
+
+
 # Sidebar
 with st.sidebar:
     st.header("Noise Monitoring Dashboard")
@@ -34,16 +44,9 @@ with st.sidebar:
     )
     selected_csv_url = csv_file_paths[selected_csv_name]  # Get the corresponding file URL
 
-    # 암호화된 파일을 다운로드 후 GPG 복호화 실행
+    # 암호화된 파일을 메모리에서 복호화 (파일 내용 해시 기준으로 캐시)
     encrypted_file = selected_csv_name
-    decrypted_file = f"decrypted_{selected_csv_name.replace('.gpg', '.csv')}"  # 복호화된 파일 이름 설정
-
-    # GPG 복호화 명령 실행
-    command = f"echo {gpg_password} | gpg --batch --yes --passphrase-fd 0 -o {decrypted_file} -d {encrypted_file}"
-    subprocess.run(command, shell=True, check=True)
-
-    # 복호화된 CSV 파일 읽기
-    df = pd.read_csv(decrypted_file)
+    df = load_noise_data(file_sha256(encrypted_file), encrypted_file, gpg_password)
 
 
 # 데이터 준비 클래스 정의
@@ -0,0 +1,164 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 선택하지 않은 실행 데이터를 백그라운드에서 미리 복호화/인덱싱해 데이터셋 저장소(DatasetRegistry)에 넣어 둡니다.
+# 작업자 수를 제한하고, 사용자가 보고 있는 실행 데이터를 불러오는 동안(foreground)에는 새 작업을 시작하지 않습니다.
+# 이미 실행 중인 작업도 단계 사이(복호화 -> 파싱 -> 인덱스)의 checkpoint() 에서 멈추거나 취소됩니다.
+# 미리 불러온 데이터셋은 빌리지 않은 상태(참조 0)로 두므로 메모리 예산이 모자라면 먼저 내보내집니다.
+PREFETCH_WORKERS = int(os.environ.get("NOISE_PREFETCH_WORKERS", "1"))
+PREFETCH_HEADROOM = 0.8  # 저장소 사용량이 예산의 이 비율을 넘으면 미리 불러오지 않음
+CHECKPOINT_POLL_SECONDS = 0.05  # 멈춘 작업이 foreground 가 자신을 기다리는지 다시 확인하는 간격
+
+
+class PrefetchCancelled(Exception):
+    """
+    실행 중인 작업이 취소되어 남은 단계를 건너뜀 (checkpoint 에서 발생)
+    """
+
+
+class Prefetcher:
+    def __init__(self, registry, max_workers=PREFETCH_WORKERS, headroom=PREFETCH_HEADROOM):
+        """
+        프로세스당 하나를 만들어 모든 세션이 함께 씁니다. 스레드 안전합니다.
+        """
+        self.registry = registry
+        self.headroom = headroom
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Condition()
+        self._jobs = {}  # 작업 이름 -> Future (대기 중이거나 실행 중)
+        self._groups = {}  # 작업 이름 -> 예약한 그룹 (세션)
+        self._cancelled = set()
+        self._foreground = 0
+        self._local = threading.local()  # 작업자 스레드별 실행 중인 작업 이름과 만들고 있는 데이터셋 키
+        self.completed = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    @contextmanager
+    def foreground(self):
+        """
+        사용자가 기다리는 로드 구간입니다. 이 안에 있는 동안 백그라운드 작업은 새로 시작하지 않고,
+        실행 중인 작업은 다음 checkpoint 에서 기다립니다.
+        """
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                self._lock.notify_all()
+
+    def schedule(self, jobs, group=None):
+        """
+        jobs({작업 이름: 함수}, 우선순위 순)를 예약합니다. 이미 예약된 이름은 다시 넣지 않고,
+        같은 group(세션)이 예약했지만 이번 목록에서 빠진 작업은 취소합니다. (예: 역 정보 선택이 바뀐 경우)
+        """
+        with self._lock:
+            for name in list(self._jobs):
+                if name not in jobs and self._groups.get(name) == group:
+                    self._cancel(name)
+            for name, job in jobs.items():
+                if name in self._jobs:
+                    continue
+                self._cancelled.discard(name)
+                future = self._pool.submit(self._run, name, job)
+                self._jobs[name] = future
+                self._groups[name] = group
+                future.add_done_callback(lambda _, name=name: self._finish(name))
+
+    def _cancel(self, name):
+        """
+        시작 전인 작업은 취소하고, foreground 를 기다리거나 실행 중인 작업은 다음 checkpoint 에서 멈추도록 표시합니다.
+        (잠금 안에서 호출)
+        """
+        self._groups.pop(name, None)
+        if self._jobs.pop(name).cancel():
+            self.cancelled += 1
+        else:
+            self._cancelled.add(name)
+        self._lock.notify_all()
+
+    def cancel_all(self):
+        with self._lock:
+            for name in list(self._jobs):
+                self._cancel(name)
+
+    def _finish(self, name):
+        with self._lock:
+            future = self._jobs.get(name)
+            if future is not None and future.done():
+                del self._jobs[name]
+                self._groups.pop(name, None)
+
+    def _run(self, name, job):
+        with self._lock:
+            while self._foreground and name not in self._cancelled:
+                self._lock.wait()
+            if name in self._cancelled:
+                self._cancelled.discard(name)
+                self.cancelled += 1
+                return
+        self._local.name = name
+        try:
+            job()
+        except PrefetchCancelled:
+            with self._lock:
+                self.cancelled += 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            self._local.name = None
+            with self._lock:
+                self._cancelled.discard(name)
+
+    def checkpoint(self):
+        """
+        작업 함수가 단계 사이에서 호출합니다. (작업자 스레드 밖에서는 아무것도 하지 않음)
+        foreground 로드가 있는 동안 기다리고, 작업이 취소되었으면 PrefetchCancelled 로 남은 단계를 건너뜁니다.
+        만들고 있는 데이터셋을 다른 요청(foreground)이 기다리고 있으면 서로 기다리지 않도록 멈추지 않고 계속합니다.
+        """
+        name = getattr(self._local, "name", None)
+        if name is None:
+            return
+        key = getattr(self._local, "key", None)
+        with self._lock:
+            while key is None or not self.registry.waiting(key):
+                if name in self._cancelled:
+                    raise PrefetchCancelled(name)
+                if not self._foreground:
+                    return
+                self._lock.wait(CHECKPOINT_POLL_SECONDS)
+
+    def warm(self, key, loader):
+        """
+        저장소에 key 가 없고 메모리 여유가 있으면 loader() 로 만들어 넣습니다. (작업 함수 안에서 호출)
+        loader 는 단계 사이에서 checkpoint() 를 호출해야 foreground 로드에 자리를 비켜 줄 수 있습니다.
+        """
+        stats = self.registry.stats()
+        if key in self.registry or stats["memory_mb"] > stats["budget_mb"] * self.headroom:
+            with self._lock:
+                self.skipped += 1
+            return
+        self._local.key = key
+        try:
+            self.registry.lease(key, loader).release()
+        finally:
+            self._local.key = None
+        with self._lock:
+            self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._jobs),
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+            }
@@ -0,0 +1,97 @@
+"""
+저장된 실행 데이터(*.csv.gpg)를 실시간 측정기처럼 다시 내보내는 재생 도구입니다.
+대시보드의 실시간 모드(live_feed.py)를 열차 없이 시험할 때 사용합니다.
+
+사용 예:
+    GPG_PASSWORD=... python replay_feed.py recording.csv.gpg --file live.csv --rate 2000
+    GPG_PASSWORD=... python replay_feed.py recording.csv.gpg --port 9750 --rate 2000
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+from gpg_loader import read_encrypted_csv
+from live_feed import DEFAULT_LIVE_PORT
+from streaming_ingest import NOISE_COLUMNS
+
+DEFAULT_RATE = 1000  # 초당 샘플 수
+TICK_SECONDS = 0.2
+
+
+def _batches(df, rate, speedup):
+    """
+    TICK_SECONDS 마다 내보낼 CSV 텍스트 묶음을 만듭니다.
+    """
+    rows_per_tick = max(int(rate * speedup * TICK_SECONDS), 1)
+    for start in range(0, len(df), rows_per_tick):
+        yield df.iloc[start:start + rows_per_tick].to_csv(header=False, index=False)
+
+
+def _paced(batches):
+    next_tick = time.monotonic()
+    for batch in batches:
+        yield batch
+        next_tick += TICK_SECONDS
+        time.sleep(max(next_tick - time.monotonic(), 0))
+
+
+def replay_to_file(df, path, rate, speedup=1.0):
+    """
+    CSV 파일을 새로 만들고 샘플을 조금씩 덧붙입니다. (측정기 로그 파일 흉내)
+    """
+    with open(path, "w") as f:
+        f.write(",".join(NOISE_COLUMNS) + "\n")
+        f.flush()
+        for batch in _paced(_batches(df, rate, speedup)):
+            f.write(batch)
+            f.flush()
+
+
+def replay_to_socket(df, host, port, rate, speedup=1.0):
+    """
+    로컬 소켓으로 접속한 클라이언트 하나에게 헤더와 샘플 줄을 보냅니다.
+    """
+    with socket.create_server((host, port)) as server:
+        print(f"Waiting for a client on {host}:{port}")
+        connection, address = server.accept()
+        with connection:
+            print(f"Streaming to {address[0]}:{address[1]}")
+            connection.sendall((",".join(NOISE_COLUMNS) + "\n").encode("utf-8"))
+            for batch in _paced(_batches(df, rate, speedup)):
+                connection.sendall(batch.encode("utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded run as a live logger feed.")
+    parser.add_argument("recording", help="encrypted recording (*.csv.gpg)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--file", help="append samples to this growing CSV file")
+    target.add_argument("--port", type=int, default=DEFAULT_LIVE_PORT, help="serve samples on this local TCP port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="samples per second")
+    parser.add_argument("--speedup", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--passphrase-env", default="GPG_PASSWORD",
+                        help="environment variable holding the GPG passphrase")
+    args = parser.parse_args(argv)
+
+    passphrase = os.environ.get(args.passphrase_env)
+    if not passphrase:
+        print(f"Set the passphrase in ${args.passphrase_env}.", file=sys.stderr)
+        return 2
+
+    df = read_encrypted_csv(args.recording, passphrase, usecols=NOISE_COLUMNS)[NOISE_COLUMNS]
+    print(f"Replaying {len(df):,} samples at {args.rate * args.speedup:,.0f} samples/s")
+    try:
+        if args.file:
+            replay_to_file(df, args.file, args.rate, args.speedup)
+        else:
+            replay_to_socket(df, args.host, args.port, args.rate, args.speedup)
+    except (KeyboardInterrupt, BrokenPipeError, ConnectionResetError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
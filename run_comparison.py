@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_run_columnar
+from gpg_loader import file_sha256
+from segment_engine import SpeedThresholdIndex
+from streaming_ingest import should_stream, stream_run
+
+
+def run_label(file_name):
+    """
+    파일 이름에서 실행 데이터 라벨을 만듭니다. (예: '19_M1_S25_9002.csv.gpg' -> '19_M1_S25_9002')
+    """
+    return os.path.basename(file_name).replace(".csv.gpg", "")
+
+
+def _load_and_index(encrypted_file, passphrase, station_btw_distance):
+    if should_stream(encrypted_file):
+        # 큰 실행은 원본 행 없이 읽으면서 구간 통계/회귀 통계량만 누적 (메모리 제한)
+        streamed_run = stream_run(encrypted_file, passphrase, station_btw_distance)
+        return {"df": None, "speed_index": streamed_run.segments, "trace": streamed_run.trace,
+                "regression": streamed_run.regression}
+    df = load_run_columnar(encrypted_file, passphrase, content_hash=file_sha256(encrypted_file))
+    index = SpeedThresholdIndex(df['distance'].values, df['speed'].values, df['dB'].values, station_btw_distance)
+    return {"df": df, "speed_index": index, "trace": None, "regression": None}
+
+
+def load_runs_parallel(encrypted_files, passphrase, station_btw_distance, max_workers=None):
+    """
+    여러 실행 데이터를 작업자 풀에서 동시에 복호화/로드하고 속도 인덱스를 만듭니다.
+    gpg 복호화와 numpy 연산은 GIL을 놓기 때문에 전체 시간은 가장 느린 실행 데이터에 맞춰집니다.
+    스트리밍 기준보다 큰 파일은 전체를 올리지 않고 stream_run 의 누적기(구간 통계, 회귀 통계량)만 만듭니다.
+
+    반환값: {파일 이름: {'df': 데이터프레임 또는 None(스트리밍), 'speed_index': 속도 인덱스,
+             'trace': 스트리밍한 실행의 라인 차트 요약 또는 None,
+             'regression': 스트리밍한 실행의 SpeedRegression 또는 None}} (입력 순서 유지)
+    """
+    encrypted_files = list(encrypted_files)
+    if not encrypted_files:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(encrypted_files)) as pool:
+        futures = {
+            name: pool.submit(_load_and_index, name, passphrase, station_btw_distance)
+            for name in encrypted_files
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def compare_runs(speed_indexes, station_pairs, min_speed):
+    """
+    같은 역 구간에 대해 실행 데이터별 평균/최대 소음과 이전 실행 대비 변화량을 계산합니다.
+
+    speed_indexes: {파일 이름: SpeedThresholdIndex} (비교 순서대로)
+    반환값: 역 구간별 한 행, 실행별 'Average'/'Maximum' 컬럼과 연속된 두 실행 간 'Δ' 컬럼
+    """
+    comparison = pd.DataFrame({'Station Pair': station_pairs})
+    previous = None
+    for name, index in speed_indexes.items():
+        label = run_label(name)
+        stats = index.query(min_speed)
+        # 데이터가 없는 구간은 변화량 계산에서 빠지도록 NaN 으로 둡니다.
+        comparison[f'{label} Average (dBA)'] = np.where(stats['count'] > 0, stats['mean'], np.nan)
+        comparison[f'{label} Maximum (dBA)'] = np.where(stats['count'] > 0, stats['max'], np.nan)
+        if previous is not None:
+            comparison[f'Δ Average ({label} - {previous})'] = (
+                comparison[f'{label} Average (dBA)'] - comparison[f'{previous} Average (dBA)']
+            )
+            comparison[f'Δ Maximum ({label} - {previous})'] = (
+                comparison[f'{label} Maximum (dBA)'] - comparison[f'{previous} Maximum (dBA)']
+            )
+        previous = label
+    return comparison
@@ -0,0 +1,208 @@
+import numpy as np
+
+from noise_sketch import level_histograms
+
+
+# 역 구간 경계
+def segment_bounds(station_btw_distance):
+    """
+    (시작 거리, 끝 거리) 목록을 시작/끝 거리 배열로 변환합니다.
+    """
+    bounds = np.asarray(station_btw_distance, dtype=np.float64).reshape(-1, 2)
+    return bounds[:, 0], bounds[:, 1]
+
+
+def sort_by_distance(distances, *columns):
+    """
+    거리가 NaN 인 샘플을 제외하고 거리 순으로 정렬합니다. (같은 거리는 원래 순서 유지)
+    수집 단계에서 정리된 데이터(거리 순, NaN 없음)는 한 번의 비교로 확인하고 정렬/복사 없이 그대로 반환합니다.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    if len(distances) == 0 or (not np.isnan(distances[0]) and np.all(distances[1:] >= distances[:-1])):
+        return (distances,) + tuple(np.asarray(column) for column in columns)
+    keep = np.flatnonzero(~np.isnan(distances))
+    order = keep[np.argsort(distances[keep], kind="stable")]
+    return (distances[order],) + tuple(np.asarray(column)[order] for column in columns)
+
+
+def keep_where(mask, *arrays):
+    """
+    mask 가 True 인 원소만 남깁니다.
+    수집 단계에서 정리된 데이터처럼 모두 True 이면 복사 없이 그대로 반환합니다.
+    """
+    if mask.all():
+        return arrays
+    return tuple(array[mask] for array in arrays)
+
+
+def segment_slices(sorted_distances, starts, ends):
+    """
+    정렬된 거리 배열에서 각 구간 [시작, 끝] (양 끝 포함) 에 해당하는 위치 범위 [lo, hi) 를 찾습니다.
+    """
+    lo = np.searchsorted(sorted_distances, starts, side="left")
+    hi = np.searchsorted(sorted_distances, ends, side="right")
+    return lo, np.maximum(hi, lo)  # 시작 > 끝 인 구간은 비어 있음
+
+
+def segment_members(lo, hi):
+    """
+    구간별 위치 범위를 (구간 번호, 위치) 쌍으로 펼칩니다.
+    경계 위의 샘플은 인접한 두 구간 모두에 속하므로 두 번 나타납니다.
+    """
+    counts = hi - lo
+    segment_ids = np.repeat(np.arange(len(counts)), counts)
+    block_starts = np.cumsum(counts) - counts
+    positions = np.arange(counts.sum()) - np.repeat(block_starts - lo, counts)
+    return segment_ids, positions
+
+
+def locate_segments(distances, station_btw_distance):
+    """
+    각 거리가 속한 구간 번호를 반환합니다. (구간 밖이나 NaN 은 -1)
+    segment_statistics 와 같은 규칙(구간 [시작, 끝] 양 끝 포함)으로 배정하며, 경계 위의 샘플처럼
+    여러 구간에 속하면 그중 번호가 가장 작은 구간을 반환합니다.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    starts, ends = segment_bounds(station_btw_distance)
+    order = np.argsort(distances, kind="stable")  # NaN 은 맨 뒤로 가며 어떤 구간에도 들지 않음
+    lo, hi = segment_slices(distances[order], starts, ends)
+    segment_ids, positions = segment_members(lo, hi)
+    first = np.full(len(distances), len(starts), dtype=np.int64)
+    np.minimum.at(first, order[positions], segment_ids)
+    return np.where(first < len(starts), first, -1)
+
+
+def _block_reduce(ufunc, values, counts, empty_value=np.nan):
+    """
+    구간 순서로 연속 배치된 값에 대해 구간별 ufunc 축약을 계산합니다.
+    """
+    result = np.full(len(counts), empty_value, dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        block_starts = (np.cumsum(counts) - counts)[nonempty]
+        result[nonempty] = ufunc.reduceat(values, block_starts)
+    return result
+
+
+# 구간 통계
+def segment_statistics(distances, values, station_btw_distance):
+    """
+    모든 샘플을 한 번의 정렬/탐색으로 구간에 배정하고, 구간별 통계를 한 번에 계산합니다.
+
+    반환값: count (샘플 수), valid_count (NaN 이 아닌 값 수), sum, mean, min, max 배열과
+    분위수/Leq 계산용 level_histogram (구간 x dB 구간), energy (에너지 합) 딕셔너리.
+    값이 모두 NaN 이거나 샘플이 없는 구간의 mean/min/max 는 NaN 입니다.
+    """
+    starts, ends = segment_bounds(station_btw_distance)
+    sorted_distances, sorted_values = sort_by_distance(distances, values)
+    sorted_values = sorted_values.astype(np.float64, copy=False)
+
+    lo, hi = segment_slices(sorted_distances, starts, ends)
+    segment_ids, positions = segment_members(lo, hi)
+    member_values = sorted_values[positions]
+
+    n_segments = len(starts)
+    counts = hi - lo
+    valid_ids, valid_values = keep_where(~np.isnan(member_values), segment_ids, member_values)
+    valid_count = np.bincount(valid_ids, minlength=n_segments)
+    total = np.bincount(valid_ids, weights=valid_values, minlength=n_segments)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid_count > 0, total / valid_count, np.nan)
+    level_histogram, energy = level_histograms(segment_ids, member_values, n_segments)
+
+    return {
+        "count": counts,
+        "valid_count": valid_count,
+        "sum": total,
+        "mean": mean,
+        "min": _block_reduce(np.fmin, member_values, counts),
+        "max": _block_reduce(np.fmax, member_values, counts),
+        "level_histogram": level_histogram,
+        "energy": energy,
+    }
+
+
+# 속도 기준 인덱스
+class SpeedThresholdIndex:
+    def __init__(self, distances, speeds, values, station_btw_distance):
+        """
+        구간별 샘플을 속도 순으로 정렬하고 누적합/접미 최대값을 미리 계산해 두는 인덱스입니다.
+        한 번 만들어 두면 임의의 최소 속도에 대한 구간 통계를 구간당 이진 탐색 한 번으로 계산합니다.
+        """
+        starts, ends = segment_bounds(station_btw_distance)
+        self.n_segments = len(starts)
+        sorted_distances, sorted_speeds, sorted_values = sort_by_distance(distances, speeds, values)
+        lo, hi = segment_slices(sorted_distances, starts, ends)
+        segment_ids, positions = segment_members(lo, hi)
+        member_speeds = sorted_speeds[positions].astype(np.float64)
+        member_values = sorted_values[positions].astype(np.float64)
+
+        # 속도가 NaN 인 샘플은 어떤 최소 속도 조건도 통과하지 못하므로 제외
+        segment_ids, member_speeds, member_values = keep_where(
+            ~np.isnan(member_speeds), segment_ids, member_speeds, member_values
+        )
+
+        # (구간, 속도 순위) 로 정렬: 정수 키이므로 비교가 정확함
+        self.unique_speeds = np.unique(member_speeds)
+        self.key_stride = len(self.unique_speeds) + 1
+        speed_ranks = np.searchsorted(self.unique_speeds, member_speeds)
+        order = np.lexsort((speed_ranks, segment_ids))
+        self.keys = segment_ids[order].astype(np.int64) * self.key_stride + speed_ranks[order]
+        member_values = member_values[order]
+        self.values = member_values
+
+        counts = np.bincount(segment_ids, minlength=self.n_segments)
+        self.block_ends = np.cumsum(counts)
+        self.block_starts = self.block_ends - counts
+
+        valid = ~np.isnan(member_values)
+        valid_values = member_values if valid.all() else np.where(valid, member_values, 0.0)
+        self.valid_cumsum = np.concatenate(([0], np.cumsum(valid)))
+        self.value_cumsum = np.concatenate(([0.0], np.cumsum(valid_values)))
+
+        # 구간별 접미 최대/최소값 (해당 위치부터 구간 끝까지)
+        self.suffix_max = np.empty_like(member_values)
+        self.suffix_min = np.empty_like(member_values)
+        for start, end in zip(self.block_starts, self.block_ends):
+            block = member_values[start:end][::-1]
+            self.suffix_max[start:end] = np.fmax.accumulate(block)[::-1]
+            self.suffix_min[start:end] = np.fmin.accumulate(block)[::-1]
+
+    def query(self, min_speed, levels=False):
+        """
+        속도 >= min_speed 인 샘플에 대한 구간별 통계를 반환합니다. (segment_statistics 와 같은 형식)
+        levels=True 이면 선택된 샘플만으로 level_histogram / energy 도 계산합니다.
+        """
+        first_rank = np.searchsorted(self.unique_speeds, min_speed, side="left")
+        query_keys = np.arange(self.n_segments, dtype=np.int64) * self.key_stride + first_rank
+        start = np.clip(np.searchsorted(self.keys, query_keys, side="left"), self.block_starts, self.block_ends)
+        end = self.block_ends
+
+        counts = end - start
+        valid_count = self.valid_cumsum[end] - self.valid_cumsum[start]
+        total = self.value_cumsum[end] - self.value_cumsum[start]
+        nonempty = counts > 0
+        first = np.minimum(start, max(len(self.keys) - 1, 0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(valid_count > 0, total / valid_count, np.nan)
+        if len(self.keys):
+            maximum = np.where(nonempty, self.suffix_max[first], np.nan)
+            minimum = np.where(nonempty, self.suffix_min[first], np.nan)
+        else:
+            maximum = minimum = np.full(self.n_segments, np.nan)
+
+        stats = {
+            "count": counts,
+            "valid_count": valid_count,
+            "sum": total,
+            "mean": mean,
+            "min": minimum,
+            "max": maximum,
+        }
+        if levels:
+            # 구간별로 선택된 범위 [start, end) 는 연속이므로 정렬 없이 한 번에 집계
+            segment_ids, positions = segment_members(start, end)
+            stats["level_histogram"], stats["energy"] = level_histograms(
+                segment_ids, self.values[positions], self.n_segments
+            )
+        return stats
@@ -0,0 +1,170 @@
+import numpy as np
+
+DISTANCE_BIN_WIDTH = 10.0  # m
+SPEED_BAND_WIDTH = 5.0  # km/h
+MAX_SPEED = 150.0  # 이보다 빠른 샘플은 마지막 속도 구간에 모음
+
+
+def to_energy(levels):
+    """
+    dB 값을 에너지(10^(L/10))로 변환합니다.
+    """
+    return np.power(10.0, np.asarray(levels, dtype=np.float64) / 10.0)
+
+
+def to_level(energy):
+    """
+    에너지를 dB 값으로 변환합니다. 0 이하는 NaN 입니다.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(energy > 0, 10.0 * np.log10(energy), np.nan)
+
+
+class AggregationCube:
+    def __init__(self, distance_start, distance_end, distance_width=DISTANCE_BIN_WIDTH,
+                 speed_width=SPEED_BAND_WIDTH, max_speed=MAX_SPEED):
+        """
+        거리 구간 x 속도 구간별로 샘플 수, 에너지 합, 최대 dB 를 미리 집계해 두는 2차원 배열입니다.
+        한 번 만들면 히트맵과 임의의 구간 합산을 원본 행을 다시 읽지 않고 계산할 수 있습니다.
+        """
+        self.distance_width = float(distance_width)
+        self.speed_width = float(speed_width)
+        self.distance_start = np.floor(distance_start / self.distance_width) * self.distance_width
+        n_distance = max(int(np.ceil((distance_end - self.distance_start) / self.distance_width)), 1)
+        n_speed = int(np.ceil(max_speed / self.speed_width))
+        shape = (n_distance, n_speed)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.valid_count = np.zeros(shape, dtype=np.int64)
+        self.energy = np.zeros(shape, dtype=np.float64)
+        self.maximum = np.full(shape, np.nan)
+
+    @classmethod
+    def for_stations(cls, station_btw_distance, **kwargs):
+        """
+        역 구간 전체 범위를 덮는 빈 큐브를 만듭니다. (스트리밍 누적용)
+        """
+        bounds = np.asarray(station_btw_distance, dtype=np.float64)
+        return cls(np.nanmin(bounds), np.nanmax(bounds), **kwargs)
+
+    @classmethod
+    def from_arrays(cls, distances, speeds, values, station_btw_distance, **kwargs):
+        """
+        데이터와 역 구간 범위를 모두 덮는 큐브를 만들고 데이터를 집계합니다.
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        extent = np.concatenate((np.asarray(station_btw_distance, dtype=np.float64).ravel(), distances))
+        cube = cls(np.nanmin(extent), np.nanmax(extent), **kwargs)
+        cube.update(distances, speeds, values)
+        return cube
+
+    @property
+    def shape(self):
+        return self.count.shape
+
+    @property
+    def distance_edges(self):
+        return self.distance_start + np.arange(self.shape[0] + 1) * self.distance_width
+
+    @property
+    def speed_edges(self):
+        return np.arange(self.shape[1] + 1) * self.speed_width
+
+    def update(self, distances, speeds, values):
+        """
+        샘플을 누적합니다. 범위 밖 거리, NaN 거리/속도, 음수 속도는 제외합니다.
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        speeds = np.asarray(speeds, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        distance_bins = np.floor((distances - self.distance_start) / self.distance_width)
+        speed_bins = np.minimum(np.floor(speeds / self.speed_width), self.shape[1] - 1)
+        keep = (distance_bins >= 0) & (distance_bins < self.shape[0]) & (speed_bins >= 0)  # NaN 은 False
+        cells = distance_bins[keep].astype(np.int64) * self.shape[1] + speed_bins[keep].astype(np.int64)
+        values = values[keep]
+
+        size = self.count.size
+        valid = ~np.isnan(values)
+        self.count += np.bincount(cells, minlength=size).reshape(self.shape)
+        self.valid_count += np.bincount(cells[valid], minlength=size).reshape(self.shape)
+        self.energy += np.bincount(cells[valid], weights=to_energy(values[valid]), minlength=size).reshape(self.shape)
+        np.fmax.at(self.maximum.reshape(-1), cells, values)
+
+    def merge(self, other):
+        """
+        같은 격자로 만든 다른 큐브를 합칩니다.
+        """
+        if self.shape != other.shape or self.distance_start != other.distance_start:
+            raise ValueError("cubes must share the same grid")
+        self.count += other.count
+        self.valid_count += other.valid_count
+        self.energy += other.energy
+        np.fmax(self.maximum, other.maximum, out=self.maximum)
+        return self
+
+    def _speed_slice(self, min_speed):
+        """
+        속도 구간 경계에 맞춰 min_speed 이상인 속도 구간 범위를 반환합니다.
+        """
+        return slice(int(np.clip(np.ceil(min_speed / self.speed_width), 0, self.shape[1])), None)
+
+    def rollup(self, distance_edges, min_speed=0):
+        """
+        임의의 거리 경계(distance_edges)로 거리 구간을 다시 묶어 그룹별 통계를 계산합니다.
+        각 거리 구간은 중심점이 속한 그룹에 배정됩니다.
+
+        반환값: count, leq (에너지 평균 dB), max 배열 딕셔너리 (그룹 수 = len(distance_edges) - 1)
+        """
+        distance_edges = np.asarray(distance_edges, dtype=np.float64)
+        n_groups = len(distance_edges) - 1
+        speeds = self._speed_slice(min_speed)
+        count = self.count[:, speeds].sum(axis=1)
+        valid_count = self.valid_count[:, speeds].sum(axis=1)
+        energy = self.energy[:, speeds].sum(axis=1)
+        if self.shape[1] > (speeds.start or 0):
+            maximum = np.fmax.reduce(self.maximum[:, speeds], axis=1)
+        else:
+            maximum = np.full(self.shape[0], np.nan)
+
+        centers = self.distance_edges[:-1] + self.distance_width / 2
+        groups = np.searchsorted(distance_edges, centers, side="right") - 1
+        inside = (groups >= 0) & (groups < n_groups)
+        groups = groups[inside]
+
+        group_count = np.bincount(groups, weights=count[inside], minlength=n_groups).astype(np.int64)
+        group_valid = np.bincount(groups, weights=valid_count[inside], minlength=n_groups)
+        group_energy = np.bincount(groups, weights=energy[inside], minlength=n_groups)
+        group_max = np.full(n_groups, np.nan)
+        np.fmax.at(group_max, groups, maximum[inside])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            leq = to_level(np.where(group_valid > 0, group_energy / group_valid, np.nan))
+        return {"count": group_count, "leq": leq, "max": group_max}
+
+    def segment_rollup(self, station_btw_distance, min_speed=0):
+        """
+        역 구간별로 다시 묶은 통계를 계산합니다. (거리 구간 해상도 기준의 근사값)
+        """
+        results = [self.rollup([start, end], min_speed) for start, end in station_btw_distance]
+        return {key: np.concatenate([result[key] for result in results]) for key in ("count", "leq", "max")}
+
+    def heatmap(self, metric="leq", distance_range=None):
+        """
+        히트맵용 (거리 중심, 속도 중심, 값 행렬[속도, 거리]) 을 반환합니다.
+        metric: 'leq' (에너지 평균 dB), 'max' (최대 dB), 'count' (샘플 수)
+        """
+        if metric == "leq":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = to_level(np.where(self.valid_count > 0, self.energy / np.maximum(self.valid_count, 1), np.nan))
+        elif metric == "max":
+            z = self.maximum
+        elif metric == "count":
+            z = np.where(self.count > 0, self.count, np.nan)
+        else:
+            raise ValueError(f"unknown metric: {metric}")
+
+        distance_centers = self.distance_edges[:-1] + self.distance_width / 2
+        speed_centers = self.speed_edges[:-1] + self.speed_width / 2
+        if distance_range is not None:
+            lo = np.searchsorted(distance_centers, distance_range[0], side="left")
+            hi = np.searchsorted(distance_centers, distance_range[1], side="right")
+            distance_centers, z = distance_centers[lo:hi], z[lo:hi]
+        return distance_centers, speed_centers, z.T
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+from segment_engine import segment_bounds, segment_members, segment_slices, sort_by_distance
+from speed_cube import MAX_SPEED, SPEED_BAND_WIDTH
+
+# 역 구간별 속도-소음 회귀: dB = 절편 + 기울기 * log10(속도)
+# 구간마다 모델을 따로 맞추지 않고, [실행, 구간] 격자의 충분통계량(n, Σx, Σy, Σx², Σxy, Σy²)을
+# bincount 로 한 번에 누적한 뒤 모든 칸의 기울기/절편/R² 를 닫힌 식으로 함께 계산합니다.
+# 통계량은 실행/청크 단위로 더하거나 이어 붙일 수 있으므로 배치 처리에서 수백 개 실행도 합쳐서 풉니다.
+REFERENCE_SPEED = 50.0  # x 를 log10(속도 / 50 km/h) 로 이동 (수치 안정)
+REFERENCE_LEVEL = 80.0  # y 를 dB - 80 으로 이동 (수치 안정)
+MIN_FIT_SPEED = 5.0  # 이보다 느린 샘플(정차/출발)은 제외 (km/h)
+MIN_FIT_SAMPLES = 20  # 샘플이 이보다 적은 칸은 결과를 NaN 으로 둠
+
+REGRESSION_COLUMNS = [
+    'Samples', 'Slope (dB/decade)', 'Intercept (dBA)', 'R²', f'Level at {REFERENCE_SPEED:.0f} km/h (dBA)'
+]
+
+
+class SpeedRegression:
+    def __init__(self, station_btw_distance, n_runs=1, labels=None,
+                 band_width=SPEED_BAND_WIDTH, max_speed=MAX_SPEED):
+        """
+        실행 n_runs 개 x 역 구간별 회귀 통계량입니다. 그래프용으로 속도 구간별 평균 dB 도 함께 누적합니다.
+        """
+        self.station_btw_distance = station_btw_distance
+        self.starts, self.ends = segment_bounds(station_btw_distance)
+        self.n_segments = len(self.starts)
+        self.n_runs = n_runs
+        self.labels = list(labels) if labels is not None else [str(run) for run in range(n_runs)]
+        self.band_width = float(band_width)
+        self.n_bands = int(np.ceil(max_speed / self.band_width))
+        shape = (n_runs, self.n_segments)
+        self.sums = np.zeros((6,) + shape)  # n, Σx, Σy, Σx², Σxy, Σy² (이동한 x, y 기준)
+        self.band_count = np.zeros(shape + (self.n_bands,), dtype=np.int64)
+        self.band_sum = np.zeros(shape + (self.n_bands,))
+
+    @classmethod
+    def from_runs(cls, runs, station_btw_distance):
+        """
+        여러 실행 데이터({이름: (거리, 속도, dB)})를 이어 붙여 한 번에 누적합니다.
+        """
+        names = list(runs)
+        regression = cls(station_btw_distance, n_runs=len(names), labels=names)
+        if names:
+            lengths = [len(runs[name][0]) for name in names]
+            regression.update(
+                *(np.concatenate([np.asarray(runs[name][k], dtype=np.float64) for name in names]) for k in range(3)),
+                run_ids=np.repeat(np.arange(len(names)), lengths)
+            )
+        return regression
+
+    @classmethod
+    def concat(cls, regressions):
+        """
+        같은 역 구간으로 만든 실행별 통계량을 실행 축으로 이어 붙입니다. (배치 처리 결과 합치기)
+        """
+        regressions = list(regressions)
+        first = regressions[0]
+        combined = cls(first.station_btw_distance, n_runs=sum(r.n_runs for r in regressions),
+                       labels=[label for r in regressions for label in r.labels],
+                       band_width=first.band_width, max_speed=first.n_bands * first.band_width)
+        combined.sums = np.concatenate([r.sums for r in regressions], axis=1)
+        combined.band_count = np.concatenate([r.band_count for r in regressions], axis=0)
+        combined.band_sum = np.concatenate([r.band_sum for r in regressions], axis=0)
+        return combined
+
+    def update(self, distances, speeds, values, run_ids=None):
+        """
+        샘플 묶음을 누적합니다. run_ids 가 없으면 모두 첫 번째 실행으로 봅니다. (순서 무관, 청크 단위 가능)
+        """
+        if run_ids is None:
+            run_ids = np.zeros(len(distances), dtype=np.int64)
+        sorted_distances, speeds, values, run_ids = sort_by_distance(distances, speeds, values, run_ids)
+        lo, hi = segment_slices(sorted_distances, self.starts, self.ends)
+        segment_ids, positions = segment_members(lo, hi)
+        speeds = speeds[positions].astype(np.float64)
+        values = values[positions].astype(np.float64)
+        runs = run_ids[positions].astype(np.int64)
+        with np.errstate(invalid="ignore"):
+            keep = (speeds >= MIN_FIT_SPEED) & np.isfinite(values)
+        speeds, values, cells = speeds[keep], values[keep], (runs * self.n_segments + segment_ids)[keep]
+
+        x = np.log10(speeds / REFERENCE_SPEED)
+        y = values - REFERENCE_LEVEL
+        size = self.n_runs * self.n_segments
+        for k, weights in enumerate((None, x, y, x * x, x * y, y * y)):
+            self.sums[k] += np.bincount(cells, weights=weights, minlength=size).reshape(self.n_runs, self.n_segments)
+
+        bands = np.minimum((speeds / self.band_width).astype(np.int64), self.n_bands - 1)
+        band_cells = cells * self.n_bands + bands
+        band_size = size * self.n_bands
+        self.band_count += np.bincount(band_cells, minlength=band_size).reshape(self.band_count.shape)
+        self.band_sum += np.bincount(band_cells, weights=values, minlength=band_size).reshape(self.band_sum.shape)
+
+    def save(self, path):
+        """
+        통계량을 .npz 파일로 저장합니다. (배치 처리에서 실행별로 보관해 두었다가 나중에 다시 합치기)
+        """
+        np.savez(
+            path, station_btw_distance=np.asarray(self.station_btw_distance, dtype=np.float64),
+            labels=np.asarray(self.labels, dtype=str), band_width=self.band_width,
+            sums=self.sums, band_count=self.band_count, band_sum=self.band_sum
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        save() 로 저장한 통계량을 읽습니다.
+        """
+        with np.load(path) as saved:
+            band_width = float(saved["band_width"])
+            regression = cls(saved["station_btw_distance"].tolist(), n_runs=len(saved["labels"]),
+                             labels=saved["labels"].tolist(), band_width=band_width,
+                             max_speed=saved["band_count"].shape[-1] * band_width)
+            regression.sums = saved["sums"]
+            regression.band_count = saved["band_count"]
+            regression.band_sum = saved["band_sum"]
+        return regression
+
+    def merge(self, other):
+        """
+        같은 모양(실행 수, 구간)의 다른 통계량을 더합니다. (청크 간 병합)
+        """
+        self.sums += other.sums
+        self.band_count += other.band_count
+        self.band_sum += other.band_sum
+        return self
+
+    def pooled(self, label='All runs'):
+        """
+        모든 실행을 합친 통계량 (실행 1개)
+        """
+        pooled = SpeedRegression(self.station_btw_distance, n_runs=1, labels=[label],
+                                 band_width=self.band_width, max_speed=self.n_bands * self.band_width)
+        pooled.sums = self.sums.sum(axis=1, keepdims=True)
+        pooled.band_count = self.band_count.sum(axis=0, keepdims=True)
+        pooled.band_sum = self.band_sum.sum(axis=0, keepdims=True)
+        return pooled
+
+    def fit(self):
+        """
+        모든 [실행, 구간] 칸의 최소제곱 해를 한 번에 계산합니다.
+
+        반환값: samples, slope (dB / 속도 10배), intercept (1 km/h 에서의 dB), r2, reference_level 배열 딕셔너리
+        """
+        n, sx, sy, sxx, sxy, syy = self.sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sxx_c = sxx - sx * sx / n  # 편차 제곱합
+            sxy_c = sxy - sx * sy / n
+            syy_c = syy - sy * sy / n
+            enough = (n >= MIN_FIT_SAMPLES) & (sxx_c > 0)
+            slope = np.where(enough, sxy_c / sxx_c, np.nan)
+            mean_x = sx / n
+            mean_y = sy / n + REFERENCE_LEVEL
+            reference_level = mean_y - slope * mean_x  # 기준 속도에서의 dB
+            intercept = reference_level - slope * np.log10(REFERENCE_SPEED)
+            r2 = np.where(enough & (syy_c > 0), sxy_c * sxy_c / (sxx_c * syy_c), np.nan)
+        return {
+            "samples": n.astype(np.int64),
+            "slope": slope,
+            "intercept": intercept,
+            "r2": np.clip(r2, 0.0, 1.0),
+            "reference_level": reference_level,
+        }
+
+    def band_means(self):
+        """
+        속도 구간 중심(km/h)과 [실행, 구간, 속도 구간]별 평균 dB (샘플이 없으면 NaN)
+        """
+        centers = (np.arange(self.n_bands) + 0.5) * self.band_width
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return centers, np.where(self.band_count > 0, self.band_sum / self.band_count, np.nan)
+
+    def to_frame(self, station_pairs, fit=None):
+        """
+        실행 x 역 구간별 결과표 (실행 순서, 구간 순서)
+        """
+        fit = fit or self.fit()
+        return pd.DataFrame({
+            'Run': np.repeat(np.asarray(self.labels, dtype=object), self.n_segments),
+            'Station Pair': np.tile(np.asarray(list(station_pairs), dtype=object), self.n_runs),
+            REGRESSION_COLUMNS[0]: fit["samples"].ravel(),
+            REGRESSION_COLUMNS[1]: fit["slope"].ravel(),
+            REGRESSION_COLUMNS[2]: fit["intercept"].ravel(),
+            REGRESSION_COLUMNS[3]: fit["r2"].ravel(),
+            REGRESSION_COLUMNS[4]: fit["reference_level"].ravel(),
+        })
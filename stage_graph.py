@@ -0,0 +1,63 @@
+import time
+
+# 대시보드 처리 단계의 의존 관계 그래프 (load -> index -> filter -> aggregate -> figure)
+# 단계마다 입력값과 앞 단계의 버전이 지난번과 같으면 다시 계산하지 않고 저장해 둔 결과를 씁니다.
+# 세션마다 하나를 session_state 에 두며, 단계별 실행/생략 횟수를 디버그 패널에 보여 줍니다.
+
+
+class StageGraph:
+    def __init__(self):
+        self.stages = {}  # 단계 이름 -> 상태 (정의된 순서 유지)
+        self.passes = 0
+
+    def begin(self):
+        """
+        새 재실행(또는 fragment 재실행)을 시작합니다. 이번에 실행/생략한 단계 표시를 지웁니다.
+        """
+        self.passes += 1
+        for state in self.stages.values():
+            state["last"] = None
+
+    def run(self, name, compute, inputs=(), after=()):
+        """
+        name 단계를 계산합니다. inputs(해시 가능한 값)와 after 단계들의 버전이 지난번과 같으면
+        compute() 를 부르지 않고 지난 결과를 반환합니다. 다시 계산하면 버전이 올라가 뒤 단계도 다시 계산됩니다.
+        """
+        key = (inputs, tuple((upstream, self.stages[upstream]["version"]) for upstream in after))
+        state = self.stages.get(name)
+        if state is None:
+            state = self.stages[name] = {
+                "after": tuple(after), "key": None, "value": None, "version": 0,
+                "runs": 0, "skips": 0, "seconds": 0.0, "last": None
+            }
+        if state["version"] and state["key"] == key:
+            state["skips"] += 1
+            state["last"] = "skipped"
+            return state["value"]
+
+        started = time.perf_counter()
+        state["value"] = compute()
+        state["seconds"] = time.perf_counter() - started
+        state["key"] = key
+        state["version"] += 1
+        state["runs"] += 1
+        state["last"] = "ran"
+        return state["value"]
+
+    def to_frame(self):
+        """
+        단계별 의존 관계와 실행/생략 횟수를 표 형태로 반환합니다.
+        """
+        import pandas as pd
+
+        return pd.DataFrame([
+            {
+                "stage": name,
+                "after": ", ".join(state["after"]),
+                "last": state["last"] or "-",
+                "runs": state["runs"],
+                "skips": state["skips"],
+                "last_run_ms": state["seconds"] * 1000,
+            }
+            for name, state in self.stages.items()
+        ])
@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+_reruns = 0  # 이 프로세스에서 지금까지 시작된 재실행 수 (첫 재실행 = 콜드 스타트)
+
+# tracemalloc 은 프로세스 전체에 하나이므로, 메모리를 측정 중인 profiler 수를 세어
+# 마지막 profiler 가 멈출 때만 끕니다. (한 세션의 stop() 이 다른 세션의 측정을 끊지 않도록)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False  # 우리가 켠 경우에만 끔 (다른 코드가 켠 tracemalloc 은 그대로 둠)
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class StageProfiler:
+    def __init__(self, track_memory=False, count_rerun=True, checkpoint=None):
+        """
+        재실행(rerun) 중 각 처리 단계의 실행 시간, 최대 메모리, 행 수를 기록합니다.
+        track_memory=True 이면 tracemalloc 으로 단계별 최대 메모리 사용량도 측정합니다. (느려지므로 디버그용)
+        tracemalloc 은 프로세스 전체 기준이므로 여러 세션이 동시에 실행되면 메모리 값은 근사치입니다.
+        (측정 중인 profiler 가 하나라도 있으면 계속 켜 둡니다)
+        count_rerun=False 이면 재실행으로 세지 않습니다. (백그라운드 작업용)
+        checkpoint 를 주면 단계를 시작하기 전마다 호출합니다. (백그라운드 작업의 일시정지/취소 지점)
+        """
+        global _reruns
+        self.track_memory = track_memory
+        self.checkpoint = checkpoint
+        self.records = []
+        self.started = time.perf_counter()
+        self.cold_start = count_rerun and _reruns == 0
+        if count_rerun:
+            _reruns += 1
+        self._tracing_handle = None
+        if track_memory:
+            _acquire_tracing()
+            # stop() 을 부르지 못하고 버려진 경우(예외로 재실행 중단)에도 반납
+            self._tracing_handle = weakref.finalize(self, _release_tracing)
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        with 블록 하나를 한 단계로 기록합니다. 블록 안에서 record['rows'] 를 채울 수 있습니다.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint()
+        record = {"stage": name, "rows": rows}
+        tracing = self.tracing
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            record["offset_seconds"] = started - self.started
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                record["peak_memory_mb"] = max(peak - memory_before, 0) / 1024 ** 2
+            self.records.append(record)
+
+    def mark(self, name):
+        """
+        시점 하나를 기록합니다. (예: 'first_paint' - 페이지 뼈대를 그린 시점)
+        """
+        self.records.append({"stage": name, "seconds": 0.0, "offset_seconds": time.perf_counter() - self.started})
+
+    def mark_offset(self, name):
+        """
+        기록된 시점의 재실행 시작 기준 경과 시간(초)을 반환합니다. 없으면 None
+        """
+        for record in self.records:
+            if record["stage"] == name:
+                return record["offset_seconds"]
+        return None
+
+    def stop(self):
+        """
+        메모리 측정을 끝냅니다. (여러 번 불러도 한 번만 반납)
+        """
+        if self._tracing_handle is not None:
+            self._tracing_handle()
+
+    @property
+    def tracing(self):
+        """
+        이 profiler 가 아직 메모리를 측정 중인지 여부
+        """
+        return self._tracing_handle is not None and self._tracing_handle.alive
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def to_frame(self):
+        """
+        기록을 표 형태로 반환합니다.
+        """
+        import pandas as pd
+
+        columns = ["stage", "seconds", "rows", "offset_seconds"]
+        if self.track_memory:
+            columns.insert(2, "peak_memory_mb")
+        return pd.DataFrame(self.records).reindex(columns=columns)
+
+    def to_json_lines(self, **context):
+        """
+        기록을 오프라인 분석용 JSON Lines 로 변환합니다. context 는 모든 줄에 함께 기록됩니다.
+        """
+        return "\n".join(json.dumps({**context, **record}, default=str) for record in self.records) + "\n"
@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+
+# 노선/방향/지선(차량기지 등)을 포함한 역 정보 저장소
+# 역 목록은 stations.json 에서 읽습니다. 역 구간은 노선마다 따로 (노선, 시작, 끝) 구간으로 만들고
+# 노선별 구간 인덱스에서 이진 탐색(searchsorted)으로 찾으므로, 지선과 본선의 거리 범위가 겹쳐도 서로 섞이지 않습니다.
+STATIONS_FILE = os.environ.get(
+    "NOISE_STATIONS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stations.json")
+)
+ASCENDING = "ascending"
+DESCENDING = "descending"
+
+
+class SegmentIntervalIndex:
+    def __init__(self, starts, ends, ids=None):
+        """
+        한 노선의 역 구간 [시작, 끝] (양 끝 포함) 목록입니다. 같은 노선의 구간은 서로 겹치지 않습니다.
+        ids 는 구간별로 돌려줄 번호입니다. (기본: 0, 1, ...)
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.ids = np.arange(len(self.starts)) if ids is None else np.asarray(ids, dtype=np.int64)
+        order = np.argsort(self.starts, kind="stable")
+        self.sorted_starts = self.starts[order]
+        self.sorted_ends = self.ends[order]
+        self.sorted_ids = self.ids[order]
+
+    def locate(self, distances):
+        """
+        각 거리가 속한 구간 번호를 반환합니다. (구간 밖이나 NaN 은 -1)
+        역 위치(두 구간의 경계)의 샘플은 번호가 작은 구간으로 찾습니다. (segment_engine.locate_segments 와 같은 규칙)
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        located = np.full(distances.shape, -1, dtype=np.int64)
+        if len(self.sorted_starts) == 0:
+            return located
+        last = len(self.sorted_starts) - 1
+        position = np.searchsorted(self.sorted_starts, distances, side="right") - 1
+        for candidate in (position, position - 1):  # 경계의 샘플은 앞 구간의 끝이기도 함
+            clipped = np.clip(candidate, 0, last)
+            inside = (candidate >= 0) & (distances >= self.sorted_starts[clipped]) & (distances <= self.sorted_ends[clipped])
+            ids = self.sorted_ids[clipped]
+            better = inside & ((located < 0) | (ids < located))
+            located[better] = ids[better]
+        return located
+
+
+class StationRegistry:
+    def __init__(self, data):
+        """
+        노선 목록(stations.json 형식)을 보관합니다.
+        kind 가 'spur' 인 노선(차량기지 인입선 등)은 parent 노선과 같은 거리 체계를 쓰며, 필요하면 함께 씁니다.
+        """
+        self.default_line = data.get("default_line")
+        self.lines = {line["id"]: line for line in data["lines"]}
+
+    @classmethod
+    def from_file(cls, path=STATIONS_FILE):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def main_lines(self):
+        """
+        선택 가능한 본선 노선 id 목록 (지선 제외)
+        """
+        return [line_id for line_id, line in self.lines.items() if line.get("kind", "main") != "spur"]
+
+    def spurs(self, line_id):
+        return [spur_id for spur_id, line in self.lines.items() if line.get("parent") == line_id]
+
+    def directions(self, line_id):
+        """
+        방향 이름 -> 'ascending'(거리 증가) / 'descending'(거리 감소)
+        """
+        return self.lines[line_id].get("directions", {ASCENDING: ASCENDING})
+
+    def stations(self, line_id, include_spurs=False):
+        """
+        노선의 역 목록을 stationdata 형식({'station', 'code', 'station distance', 'line'})으로 반환합니다.
+        include_spurs=True 이면 본선 뒤에 지선(예: 차량기지 DPO)의 역을 노선별로 붙입니다.
+        노선마다 거리 순이며, 역 구간은 같은 노선의 이웃한 역끼리만 만듭니다. (지선 역이 본선 구간을 나누지 않음)
+        """
+        line_ids = [line_id] + (self.spurs(line_id) if include_spurs else [])
+        entries = []
+        for member_id in line_ids:
+            stations = sorted(self.lines[member_id]["stations"], key=lambda entry: entry["distance"])
+            entries += [(member_id, entry) for entry in stations]
+        return {
+            "station": [entry["station"] for _, entry in entries],
+            "code": [entry["code"] for _, entry in entries],
+            "station distance": [entry["distance"] for _, entry in entries],
+            "line": [member_id for member_id, _ in entries],
+        }
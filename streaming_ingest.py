@@ -0,0 +1,250 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from chainage import COORDINATE_COLUMNS, ensure_distance
+from data_validation import merge_reports, validate_run
+from downsampling import DEFAULT_BUCKETS, m4_indices
+from gpg_loader import open_decrypted_stream
+from noise_sketch import N_LEVEL_BINS, level_bins
+from segment_engine import keep_where, segment_bounds, segment_members, segment_slices, sort_by_distance
+from speed_cube import AggregationCube, to_energy
+from speed_regression import SpeedRegression
+
+NOISE_COLUMNS = ['distance', 'dB', 'speed']
+CHUNK_ROWS = 1_000_000
+MAX_SPEED_BIN = 100  # 최소 속도 입력의 최대값 (km/h); 이보다 빠른 샘플은 마지막 칸에 모음
+TRACE_BUCKET_WIDTH = 1.0  # 라인 차트 요약 버킷 폭 (m)
+
+# 이 크기보다 큰 암호화 파일은 전체를 메모리에 올리지 않고 스트리밍으로 처리
+STREAMING_THRESHOLD_BYTES = 64 * 1024 ** 2
+
+
+def should_stream(encrypted_file, threshold_bytes=STREAMING_THRESHOLD_BYTES):
+    """
+    파일 크기를 보고 스트리밍 처리가 필요한지 판단합니다.
+    """
+    return os.path.getsize(encrypted_file) > threshold_bytes
+
+
+# 구간 x 속도 누적 통계
+class SegmentSpeedAccumulator:
+    def __init__(self, station_btw_distance, max_speed_bin=MAX_SPEED_BIN):
+        """
+        역 구간 x 1 km/h 속도 칸별로 샘플 수/합/최대/최소와 dB 히스토그램/에너지 합을 누적합니다.
+        정수 최소 속도 조건(speed >= m)은 floor(speed) >= m 과 같으므로 결과가 정확합니다.
+        SpeedThresholdIndex 와 같은 query() 형식을 제공합니다.
+        """
+        self.station_btw_distance = station_btw_distance
+        self.starts, self.ends = segment_bounds(station_btw_distance)
+        self.n_segments = len(self.starts)
+        self.n_bins = max_speed_bin + 1
+        shape = (self.n_segments, self.n_bins)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.valid_count = np.zeros(shape, dtype=np.int64)
+        self.total = np.zeros(shape, dtype=np.float64)
+        self.maximum = np.full(shape, np.nan)
+        self.minimum = np.full(shape, np.nan)
+        self.energy = np.zeros(shape, dtype=np.float64)
+        self.level_histogram = np.zeros(shape + (N_LEVEL_BINS,), dtype=np.int32)
+
+    def update(self, distances, speeds, values):
+        """
+        샘플 묶음(청크)을 누적합니다. 샘플 순서는 상관없습니다.
+        """
+        sorted_distances, sorted_speeds, sorted_values = sort_by_distance(distances, speeds, values)
+        lo, hi = segment_slices(sorted_distances, self.starts, self.ends)
+        segment_ids, positions = segment_members(lo, hi)
+        member_speeds = sorted_speeds[positions].astype(np.float64)
+        member_values = sorted_values[positions].astype(np.float64)
+
+        # NaN/음수 속도는 어떤 최소 속도(>= 0) 조건도 통과하지 못하므로 제외
+        with np.errstate(invalid="ignore"):
+            has_speed = member_speeds >= 0
+        segment_ids, member_speeds, member_values = keep_where(has_speed, segment_ids, member_speeds, member_values)
+        speed_bins = np.minimum(np.floor(member_speeds), self.n_bins - 1).astype(np.int64)
+        cells = segment_ids * self.n_bins + speed_bins
+
+        size = self.count.size
+        valid_cells, valid_values = keep_where(~np.isnan(member_values), cells, member_values)
+        self.count += np.bincount(cells, minlength=size).reshape(self.count.shape)
+        self.valid_count += np.bincount(valid_cells, minlength=size).reshape(self.count.shape)
+        self.total += np.bincount(valid_cells, weights=valid_values, minlength=size).reshape(self.count.shape)
+        np.fmax.at(self.maximum.reshape(-1), cells, member_values)
+        np.fmin.at(self.minimum.reshape(-1), cells, member_values)
+
+        # 분위수 스케치와 에너지 합 (같은 패스에서 누적)
+        self.energy += np.bincount(valid_cells, weights=to_energy(valid_values), minlength=size).reshape(self.count.shape)
+        level_cells = valid_cells * N_LEVEL_BINS + level_bins(valid_values)
+        self.level_histogram += np.bincount(level_cells, minlength=self.level_histogram.size).reshape(
+            self.level_histogram.shape
+        ).astype(np.int32)
+
+    def merge(self, other):
+        """
+        같은 구간으로 만든 다른 누적 통계를 합칩니다. (청크/실행 간 병합)
+        """
+        self.count += other.count
+        self.valid_count += other.valid_count
+        self.total += other.total
+        np.fmax(self.maximum, other.maximum, out=self.maximum)
+        np.fmin(self.minimum, other.minimum, out=self.minimum)
+        self.energy += other.energy
+        self.level_histogram += other.level_histogram
+        return self
+
+    def query(self, min_speed, levels=False):
+        """
+        속도 >= min_speed 인 샘플에 대한 구간별 통계를 반환합니다.
+        levels=True 이면 level_histogram / energy 도 함께 반환합니다.
+        1 km/h 칸으로 누적하므로 0 ~ max_speed_bin 사이의 정수 최소 속도만 정확하게 답할 수 있습니다.
+        (그 밖의 값은 ValueError; 원본 행을 보관하지 않으므로 정확한 재검색도 불가능)
+        """
+        if min_speed != int(min_speed) or not 0 <= min_speed < self.n_bins:
+            raise ValueError(f"min_speed must be a whole number between 0 and {self.n_bins - 1} km/h, got {min_speed}")
+        first_bin = int(min_speed)
+        counts = self.count[:, first_bin:].sum(axis=1)
+        valid_count = self.valid_count[:, first_bin:].sum(axis=1)
+        total = self.total[:, first_bin:].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(valid_count > 0, total / valid_count, np.nan)
+        if first_bin < self.n_bins:
+            maximum = np.fmax.reduce(self.maximum[:, first_bin:], axis=1)
+            minimum = np.fmin.reduce(self.minimum[:, first_bin:], axis=1)
+        else:
+            maximum = minimum = np.full(self.n_segments, np.nan)
+        stats = {
+            "count": counts,
+            "valid_count": valid_count,
+            "sum": total,
+            "mean": mean,
+            "min": minimum,
+            "max": maximum,
+        }
+        if levels:
+            stats["level_histogram"] = self.level_histogram[:, first_bin:].sum(axis=1, dtype=np.int64)
+            stats["energy"] = self.energy[:, first_bin:].sum(axis=1)
+        return stats
+
+
+# 라인 차트용 거리 버킷 요약
+class TraceAccumulator:
+    def __init__(self, names, bucket_width=TRACE_BUCKET_WIDTH):
+        """
+        거리 버킷별 최소/최대값만 누적해 두는 라인 차트용 요약입니다.
+        메모리 사용량은 샘플 수가 아니라 거리 범위 / bucket_width 에 비례합니다.
+        DistanceTrace 와 같은 distance_range / downsample() 형식을 제공합니다.
+        """
+        self.names = list(names)
+        self.bucket_width = bucket_width
+        self.first_bucket = None
+        self.minimum = {name: np.empty(0) for name in self.names}
+        self.maximum = {name: np.empty(0) for name in self.names}
+
+    def _grow(self, first_bucket, last_bucket):
+        """
+        버킷 범위를 [first_bucket, last_bucket] 까지 넓힙니다.
+        """
+        if self.first_bucket is None:
+            self.first_bucket = first_bucket
+            size = last_bucket - first_bucket + 1
+            for name in self.names:
+                self.minimum[name] = np.full(size, np.nan)
+                self.maximum[name] = np.full(size, np.nan)
+            return
+        current_last = self.first_bucket + len(self.minimum[self.names[0]]) - 1
+        pad_before = max(self.first_bucket - first_bucket, 0)
+        pad_after = max(last_bucket - current_last, 0)
+        if pad_before or pad_after:
+            for name in self.names:
+                self.minimum[name] = np.pad(self.minimum[name], (pad_before, pad_after), constant_values=np.nan)
+                self.maximum[name] = np.pad(self.maximum[name], (pad_before, pad_after), constant_values=np.nan)
+            self.first_bucket -= pad_before
+
+    def update(self, distances, **columns):
+        distances = np.asarray(distances, dtype=np.float64)
+        finite = ~np.isnan(distances)
+        if not finite.any():
+            return
+        buckets = np.floor(distances[finite] / self.bucket_width).astype(np.int64)
+        self._grow(int(buckets.min()), int(buckets.max()))
+        cells = buckets - self.first_bucket
+        for name in self.names:
+            values = np.asarray(columns[name], dtype=np.float64)[finite]
+            np.fmin.at(self.minimum[name], cells, values)
+            np.fmax.at(self.maximum[name], cells, values)
+
+    @property
+    def bucket_centers(self):
+        if self.first_bucket is None:
+            return np.empty(0)
+        size = len(self.minimum[self.names[0]])
+        return (np.arange(size) + self.first_bucket + 0.5) * self.bucket_width
+
+    @property
+    def distance_range(self):
+        centers = self.bucket_centers
+        if len(centers) == 0:
+            return 0.0, 0.0
+        return float(centers[0]), float(centers[-1])
+
+    def downsample(self, name, start=None, end=None, n_buckets=DEFAULT_BUCKETS):
+        """
+        [start, end] 범위 버킷의 최소/최대 포락선을 (거리, 값) 배열로 반환합니다.
+        """
+        centers = self.bucket_centers
+        lo = 0 if start is None else np.searchsorted(centers, start, side="left")
+        hi = len(centers) if end is None else np.searchsorted(centers, end, side="right")
+        x = np.repeat(centers[lo:hi], 2)
+        y = np.column_stack((self.minimum[name][lo:hi], self.maximum[name][lo:hi])).reshape(-1)
+        filled = ~np.isnan(y)
+        x, y = x[filled], y[filled]
+        indices = m4_indices(x, y, n_buckets)
+        return x[indices], y[indices]
+
+
+class StreamedRun:
+    def __init__(self, station_btw_distance, bucket_width=TRACE_BUCKET_WIDTH):
+        """
+        스트리밍으로 읽은 실행 데이터의 요약입니다. 원본 행은 보관하지 않습니다.
+        """
+        self.rows = 0
+        self.segments = SegmentSpeedAccumulator(station_btw_distance)
+        self.trace = TraceAccumulator(['dB', 'speed'], bucket_width=bucket_width)
+        self.cube = AggregationCube.for_stations(station_btw_distance)
+        self.regression = SpeedRegression(station_btw_distance)
+        self.quality = None  # 청크별 검증 보고서를 합친 것
+
+    def update(self, chunk):
+        distances = chunk['distance'].values
+        speeds = chunk['speed'].values
+        values = chunk['dB'].values
+        self.rows += len(chunk)
+        self.segments.update(distances, speeds, values)
+        self.trace.update(distances, dB=values, speed=speeds)
+        self.cube.update(distances, speeds, values)
+        self.regression.update(distances, speeds, values)
+
+
+def stream_run(encrypted_file, passphrase, station_btw_distance, chunk_rows=CHUNK_ROWS, checkpoint=None):
+    """
+    암호화된 CSV를 복호화하면서 청크 단위로 읽어 구간 통계와 라인 차트 요약만 누적합니다.
+    메모리 사용량은 청크 크기와 요약 크기로 제한됩니다.
+    청크마다 검증/정리하므로 청크 경계에 걸친 글리치 후보는 세지 못합니다. (누적기는 순서와 무관하므로 정렬하지 않음)
+    checkpoint 를 주면 청크를 처리하기 전마다 호출합니다. (백그라운드 미리 불러오기의 일시정지/취소 지점)
+    """
+    run = StreamedRun(station_btw_distance)
+    with open_decrypted_stream(encrypted_file, passphrase) as stream:
+        # distance 대신 좌표만 있는 파일은 청크마다 선형에 맞춰 distance 를 계산합니다.
+        reader = pd.read_csv(
+            stream, usecols=lambda name: name in NOISE_COLUMNS or name in COORDINATE_COLUMNS,
+            dtype={name: np.float32 for name in NOISE_COLUMNS}, chunksize=chunk_rows
+        )
+        for chunk in reader:
+            if checkpoint is not None:
+                checkpoint()
+            chunk, quality = validate_run(ensure_distance(chunk), sort=False)
+            run.quality = merge_reports(run.quality, quality)
+            run.update(chunk)
+    return run
@@ -1,29 +1,8 @@
 ###########최종완성본###########
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
 import streamlit as st
-import subprocess
-
-
-
-stationdata = {
-    "station": [
-        "Lebakbulus", "Fatmawati", "Cipeteraya", "Haji Nawi", "Blok A",
-        "Blok M", "ASEAN", "Senayan", "Istora", "Bendunganhilir",
-        "Setiabudi", "Dukuh Atas", "Bundaran HI"
-    ],
-    "code": [
-        "LBB", "FTW", "CPR", "HJN", "BLA", "BLM", "ASN", "SNY", "IST",
-        "BNH", "SET", "DKA", "BHI"
-    ],
-    "station distance": [
-        329, 2347, 4158, 5456, 6672, 7843, 8570, 10089, 10903,
-        12218, 13001, 13917, 14983
-    ]
-}
 
-station_df = pd.DataFrame(stationdata)
+from stage_graph import StageGraph
+from stage_profiler import StageProfiler
 
 # Page configuration
 st.set_page_config(
@@ -33,6 +12,36 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 단계별 실행 시간/메모리 기록 (디버그 모드에서만 메모리 측정)
+profiler = StageProfiler(track_memory=st.session_state.get("debug_timings", False))
+# 단계 의존 그래프 (세션별): 입력이 바뀐 단계와 그 뒤 단계만 다시 계산합니다.
+stage_graph = st.session_state.setdefault("stage_graph", StageGraph())
+stage_graph.begin()
+script_finished = False  # 스크립트 끝에서 True - fragment 만 재실행될 때는 True 인 상태로 남아 있음
+
+# 페이지 뼈대를 먼저 그립니다. 무거운 모듈 로딩과 복호화는 그 다음에 합니다.
+st.title("Noise Monitoring Dashboard")
+with st.sidebar:
+    st.header("Noise Monitoring Dashboard")
+profiler.mark("first_paint")
+
+# 첫 화면(로드/인덱스)에 꼭 필요한 모듈만 여기서 불러옵니다.
+# 그래프(plotly), 소음 집중 구간, 회귀, 밀도 이미지, 실행 비교, 실시간 모듈은 그 구역을 그릴 때 불러옵니다.
+with profiler.stage("import"):
+    import pandas as pd
+    import numpy as np
+
+    from columnar_cache import load_run_columnar, sweep_stale_plain_files
+    from dataset_registry import DatasetRegistry
+    from downsampling import DistanceTrace
+    from gpg_loader import file_sha256
+    from noise_core import NoiseDataProcessor, StationDataProcessor, station_registry, stationdata
+    from prefetch import Prefetcher
+    from speed_cube import AggregationCube
+    from streaming_ingest import should_stream, stream_run
+
+station_df = pd.DataFrame(stationdata)
+
 # GitHub에서 CSV 파일을 읽기 위한 URL 설정
 csv_file_paths = {
 
@@ -44,170 +53,678 @@ csv_file_paths = {
 # Streamlit Secrets에서 비밀번호 가져오기
 gpg_password = st.secrets["general"]["GPG_PASSWORD"]
 
+
+@st.cache_resource
+def get_dataset_registry():
+    """
+    모든 세션이 함께 쓰는 데이터셋 저장소 (프로세스당 하나)
+    서버 프로세스가 시작할 때 한 번, 죽은 프로세스가 남긴 평문 컬럼형 파일도 지웁니다.
+    """
+    sweep_stale_plain_files()
+    return DatasetRegistry()
+
+
+dataset_registry = get_dataset_registry()
+
+
+@st.cache_resource
+def get_prefetcher():
+    """
+    선택하지 않은 실행 데이터를 미리 불러오는 백그라운드 작업자 (프로세스당 하나, 세션 공용)
+    """
+    return Prefetcher(dataset_registry)
+
+
+prefetcher = get_prefetcher()
+
+
+def lease_dataset(slot, key, loader):
+    """
+    이 세션이 slot('run', 'compare') 에 빌린 데이터셋을 key 로 바꿉니다. 키가 같으면 빌린 것을 그대로 씁니다.
+    이전 데이터셋은 반납하여 다른 세션이 쓰지 않으면 예산에 따라 내보낼 수 있게 합니다.
+    """
+    state_key = f"dataset_lease_{slot}"
+    lease = st.session_state.get(state_key)
+    if lease is None or lease.key != key:
+        if lease is not None:
+            lease.release()
+        lease = dataset_registry.lease(key, loader)
+        st.session_state[state_key] = lease
+    return lease.value
+
+
+def run_dataset_key(content_hash, streaming, station_layout):
+    """
+    실행 데이터셋 키. 원본 행이 있으면 역 정보와 무관하게 실행마다 한 벌만 두고,
+    스트리밍 요약은 읽으면서 역 구간별로 누적하므로 역 정보 설정마다 따로 둡니다.
+    """
+    return ("run", content_hash, streaming) + (station_layout if streaming else ())
+
+
+def load_run_dataset(encrypted_file, content_hash, streaming, station_processor, run_profiler=None):
+    """
+    실행 데이터 하나의 역 정보와 무관한 부분(데이터프레임, 라인 차트 데이터, 품질 보고서)을 만듭니다.
+    데이터프레임은 파일 내용 해시 기준의 메모리 매핑된 읽기 전용 컬럼형 데이터입니다.
+    아주 큰 파일은 전체를 메모리에 올리지 않고 스트리밍으로 요약만 만들며, 이때는 구간 요약도 함께 들어 있습니다.
+    run_profiler 를 주지 않으면 이번 재실행의 profiler 에 기록합니다. (백그라운드 미리 불러오기는 따로 기록)
+    """
+    run_profiler = run_profiler or profiler
+    if streaming:
+        with run_profiler.stage("stream") as stage:
+            streamed_run = stream_run(
+                encrypted_file, gpg_password, station_processor.station_btw_distance,
+                checkpoint=run_profiler.checkpoint
+            )
+            stage['rows'] = streamed_run.rows
+        return {
+            "df": None,
+            "speed_index": streamed_run.segments,
+            "distance_trace": streamed_run.trace,
+            "aggregation_cube": streamed_run.cube,
+            "regression": streamed_run.regression,
+            "quality": streamed_run.quality
+        }
+
+    df = load_run_columnar(encrypted_file, gpg_password, content_hash=content_hash, profiler=run_profiler)
+    with run_profiler.stage("distance_trace", rows=len(df)):
+        distance_trace = DistanceTrace(df['distance'].values, dB=df['dB'].values, speed=df['speed'].values)
+    return {
+        "df": df,
+        "distance_trace": distance_trace,
+        "quality": df.attrs.get("quality")  # 수집 단계 검증 보고서 (컬럼형 캐시 헤더에 저장됨)
+    }
+
+
+def build_layout_dataset(df, station_processor, run_profiler=None):
+    """
+    실행 데이터의 역 구간별 속도 인덱스와 집계 큐브를 만듭니다. (노선/방향/지선을 바꾸면 이것만 다시 만듦)
+    """
+    run_profiler = run_profiler or profiler
+    with run_profiler.stage("index", rows=len(df)):
+        speed_index = NoiseDataProcessor(df, station_processor).build_speed_index()
+    with run_profiler.stage("aggregation_cube", rows=len(df)):
+        aggregation_cube = AggregationCube.from_arrays(
+            df['distance'].values, df['speed'].values, df['dB'].values, station_processor.station_btw_distance
+        )
+    return {
+        "speed_index": speed_index,
+        "aggregation_cube": aggregation_cube,
+        "regression": None  # 원본 행이 있으면 펼쳤을 때 계산
+    }
+
+
 # Sidebar
 with st.sidebar:
-    st.header("Noise Monitoring Dashboard")
-
     # Use a selectbox to display the file options more clearly
     selected_csv_name = st.sidebar.selectbox(
         'Select CSV file:', ['18_M1_S25_9002.csv.gpg', '19_M1_S25_9002.csv.gpg', '20_Northing.1.csv.gpg']
     )
     selected_csv_url = csv_file_paths[selected_csv_name]  # Get the corresponding file URL
 
-    # 암호화된 파일을 다운로드 후 GPG 복호화 실행
-    encrypted_file = selected_csv_name
-    decrypted_file = f"decrypted_{selected_csv_name.replace('.gpg', '.csv')}"  # 복호화된 파일 이름 설정
+    # 노선/방향/차량기지 지선 선택 (stations.json)
+    line_id = st.selectbox(
+        'Line:', station_registry.main_lines,
+        format_func=lambda line_id: station_registry.lines[line_id]['name'], key="line_id"
+    )
+    direction = st.radio('Direction:', list(station_registry.directions(line_id)), horizontal=True, key="direction")
+    include_spurs = st.toggle(
+        "Include depot spur", key="include_spurs", disabled=not station_registry.spurs(line_id),
+        help="Add depot/branch spur segments (e.g. DPO - LBB) to the station pairs."
+    )
+    station_layout = (line_id, direction, include_spurs)
+    station_processor = StationDataProcessor.from_registry(station_registry, *station_layout)  # 역 정보 처리
 
-    # GPG 복호화 명령 실행
-    command = f"echo {gpg_password} | gpg --batch --yes --passphrase-fd 0 -o {decrypted_file} -d {encrypted_file}"
-    subprocess.run(command, shell=True, check=True)
+    # 암호화된 파일을 복호화하여 세션 간 공유 저장소에 보관 (파일 내용 해시 기준)
+    encrypted_file = selected_csv_name
+    with profiler.stage("hash"):
+        content_hash = file_sha256(encrypted_file)
+    streaming = should_stream(encrypted_file)
+    with profiler.stage("load"), prefetcher.foreground(), st.spinner("Loading data..."):
+        run_key = run_dataset_key(content_hash, streaming, station_layout)
+        run_dataset = stage_graph.run(
+            "load",
+            lambda: lease_dataset(
+                "run", run_key, lambda: load_run_dataset(encrypted_file, content_hash, streaming, station_processor)
+            ),
+            inputs=run_key
+        )
+    df = run_dataset["df"]
+    # 역 구간별 인덱스: 방향/노선/지선만 바꾸면 실행 데이터는 그대로 두고 이것만 다시 만듭니다.
+    with profiler.stage("layout"), prefetcher.foreground():
+        layout_dataset = stage_graph.run(
+            "index",
+            lambda: run_dataset if df is None else lease_dataset(
+                "layout", ("layout", content_hash) + station_layout,
+                lambda: build_layout_dataset(df, station_processor)
+            ),
+            inputs=station_layout, after=("load",)
+        )
+
+    # 여러 실행 데이터 비교 모드
+    compare_mode = st.toggle("Compare runs", key="compare_mode", help="Compare station-pair noise across several runs.")
+    if compare_mode:
+        compare_files = st.multiselect('Runs to compare:', list(csv_file_paths), default=list(csv_file_paths))
+    else:
+        compare_files = []
+
+    # 실시간 모드: 커지는 CSV 파일 또는 로컬 소켓에서 측정값을 받아 표시
+    live_mode = st.toggle("Live mode", key="live_mode", help="Follow an on-train logger feed (growing CSV or local socket).")
+    if live_mode:
+        from live_feed import DEFAULT_LIVE_PORT
+        live_source = st.text_input(
+            'Live source (CSV path or host:port):', value=f"127.0.0.1:{DEFAULT_LIVE_PORT}", key="live_source"
+        )
+
+    # 디버그: 단계별 실행 시간/메모리 패널
+    st.toggle("Debug timings", key="debug_timings", help="Show per-stage timing and memory for this rerun.")
 
-    # 복호화된 CSV 파일 읽기
-    df = pd.read_csv(decrypted_file)
 
+# Streamlit 애플리케이션
+# 데이터 프로세싱: 역 데이터와 CSV 데이터를 각각 처리
+noise_processor = NoiseDataProcessor(df, station_processor)  # 소음 데이터 처리
 
-# 데이터 준비 클래스 정의
-class StationDataProcessor:
-    def __init__(self, data):
-        """
-        역 데이터를 처리하는 클래스입니다.
-        """
-        self.data_frame = pd.DataFrame(data)
-        self.codes = self.data_frame['code'].values
-        self.stations = self.data_frame['station'].values
-        self.station_distances = self.data_frame['station distance'].values
 
-        self.station_pairs = []  # 역 쌍 리스트
-        self.station_btw_distance = []  # 역 거리 리스트
-        self.create_station_pairs()
+if live_mode:
+    from live_feed import LIVE_REFRESH_SECONDS, LiveSession, open_source
 
-    def create_station_pairs(self):
+    @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+    def live_panel(source_spec):
         """
-        역 쌍을 생성합니다.
+        실시간 패널만 주기적으로 다시 그립니다. (전체 스크립트는 재실행하지 않음)
+        새로 들어온 샘플만 링 버퍼와 구간별 누적 통계에 반영합니다.
         """
-        for i in range(len(self.codes) - 1):
-            if pd.isna(self.codes[i]) or pd.isna(self.codes[i + 1]) or pd.isna(self.station_distances[i]) or pd.isna(self.station_distances[i + 1]):
-                continue
-            pair = f"{self.codes[i]} - {self.codes[i + 1]}"
-            distance_pair = (self.station_distances[i], self.station_distances[i + 1])
-            self.station_pairs.append(pair)
-            self.station_btw_distance.append(distance_pair)
+        import plotly.graph_objects as go
+
+        from downsampling import scatter_class
+
+        session = st.session_state.get("live_session")
+        if session is None or st.session_state.get("live_session_source") != (source_spec, station_layout):
+            if session is not None:
+                session.close()  # 이전 소스의 소켓 연결을 닫고 바꿈
+            session = LiveSession(open_source(source_spec), station_processor.station_btw_distance)
+            st.session_state["live_session"] = session
+            st.session_state["live_session_source"] = (source_spec, station_layout)
+        session.poll()
+
+        live_min_speed = st.session_state.get("speed_input", 50)
+        live_intervals_df = noise_processor.to_intervals_frame(session.segments.query(live_min_speed))
+        segment = session.current_segment()
+
+        metric_cols = st.columns(4)
+        metric_cols[0].metric("Samples received", f"{session.buffer.total:,}", delta=session.last_batch_rows or None)
+        if segment is None:
+            metric_cols[1].metric("Current station pair", "—")
+        else:
+            current = live_intervals_df.iloc[segment]
+            metric_cols[1].metric("Current station pair", current['Station Pair'])
+            metric_cols[2].metric("Average (dBA)", f"{current['Average Noise (dBA)']:.1f}")
+            metric_cols[3].metric("Maximum (dBA)", f"{current['Maximum Noise (dBA)']:.1f}")
+
+        if len(session.buffer) == 0:
+            st.info(f"Waiting for samples from {source_spec} ...")
+            return
+
+        # 링 버퍼에 남아 있는 최근 구간만 그립니다.
+        recent = session.buffer.view()
+        recent_trace = DistanceTrace(recent['distance'], dB=recent['dB'], speed=recent['speed'])
+        live_fig = go.Figure()
+        for name, title, axis in (('dB', 'Noise Level (dB)', 'y1'), ('speed', 'Speed (km/h)', 'y2')):
+            x, y = recent_trace.downsample(name)
+            live_fig.add_trace(scatter_class(len(x))(x=x, y=y, mode='lines', name=title, yaxis=axis))
+        live_fig.update_layout(
+            title="Live: Recent Noise Levels and Speed",
+            xaxis=dict(title="Distance (m)"),
+            yaxis=dict(title="Noise Level (dB)", side="left"),
+            yaxis2=dict(title="Speed (km/h)", overlaying="y", side="right"),
+            height=350,
+            uirevision="live"  # 갱신 중에도 확대/축소 상태 유지
+        )
+        st.plotly_chart(live_fig, use_container_width=True)
+
+        bar_colors = ['#ff7f0e' if i == segment else '#4682b4' for i in range(len(live_intervals_df))]
+        live_bar = go.Figure(go.Bar(
+            x=live_intervals_df['Station Pair'],
+            y=live_intervals_df['Average Noise (dBA)'],
+            marker_color=bar_colors,
+            name='Average Noise (dBA)'
+        ))
+        live_bar.update_layout(
+            title=f"Live: Average Noise at Speed Above {live_min_speed} km/h",
+            xaxis_title="Station",
+            yaxis_title="Noise Level (dBA)",
+            height=300,
+            uirevision="live"
+        )
+        st.plotly_chart(live_bar, use_container_width=True)
+
+    with st.expander('Live Feed', expanded=True):
+        live_panel(live_source)
+elif "live_session" in st.session_state:
+    st.session_state.pop("live_session").close()
+    st.session_state.pop("live_session_source", None)
+
+
+speed_index = layout_dataset["speed_index"]
+distance_trace = run_dataset["distance_trace"]
+aggregation_cube = layout_dataset["aggregation_cube"]
+
+# 그래프 캐시: 실행 데이터(내용 해시)와 입력값이 같으면 만들어 둔 그래프를 재사용합니다. (세션 간 공유)
+# st.plotly_chart 는 매번 그래프를 JSON 으로 직렬화하지만, 배열이 float32 타입 배열이라 base64 복사 수준으로 가볍습니다.
+FIGURE_CACHE_ENTRIES = 256
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_bar_figure(content_hash, station_layout, min_speed, _station_intervals_df):
+    from figures import bar_figure
+    return bar_figure(_station_intervals_df, min_speed)
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_compare_figure(comparison_key, min_speed, labels, _comparison_df):
+    from figures import compare_figure
+    return compare_figure(_comparison_df, labels, min_speed)
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_line_figure(content_hash, distance_window, hotspot_key, _distance_trace, _highlight_spans):
+    """
+    보이는 거리 범위만 피크를 유지하며 다운샘플링한 라인 차트 (소음 집중 구간 음영 포함)
+    """
+    from figures import line_figure
+    noise_x, noise_y = _distance_trace.downsample('dB', *distance_window)
+    speed_x, speed_y = _distance_trace.downsample('speed', *distance_window)
+    return line_figure(noise_x, noise_y, speed_x, speed_y, highlight_spans=_highlight_spans)
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_hotspots(run_key, hotspot_options, _traces, _station_processor):
+    """
+    실행 데이터(들)와 탐지 조건이 같으면 찾아 둔 소음 집중 구간을 재사용합니다.
+    """
+    from hotspots import detect_run_hotspots
+    return detect_run_hotspots(_traces, _station_processor, **dict(hotspot_options))
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_heatmap_figure(content_hash, station_layout, metric_key, metric_label, distance_window, _aggregation_cube):
+    from figures import heatmap_figure
+    heat_x, heat_y, heat_z = _aggregation_cube.heatmap(metric_key, distance_window)
+    return heatmap_figure(heat_x, heat_y, heat_z, metric_label)
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_regression(run_key, _runs, _station_processor):
+    """
+    실행 데이터(들)의 역 구간별 속도-소음 회귀 통계량 (모든 실행/구간을 한 번에 누적)
+    _runs: {라벨: (거리, 속도, dB) 또는 스트리밍으로 누적한 SpeedRegression}
+    """
+    from speed_regression import SpeedRegression
+    station_btw_distance = _station_processor.station_btw_distance
+    if not any(isinstance(run, SpeedRegression) for run in _runs.values()):
+        return SpeedRegression.from_runs(_runs, station_btw_distance)
+    # 스트리밍한 실행(이미 누적한 통계량)이 섞여 있으면 실행별 통계량을 비교 순서대로 이어 붙임
+    combined = SpeedRegression.concat(
+        run if isinstance(run, SpeedRegression) else SpeedRegression.from_runs({label: run}, station_btw_distance)
+        for label, run in _runs.items()
+    )
+    combined.labels = list(_runs)
+    return combined
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cached_density_figure(runs_key, station_layout, distance_window, _traces, _station_processor):
+    """
+    보이는 거리 범위만 다시 래스터화한 밀도 이미지 (샘플 수와 무관하게 픽셀 수 크기)
+    """
+    from density_raster import rasterize, value_range
+    from figures import density_figure
+    dB_range = value_range(_traces, distance_window) or (0.0, 1.0)
+    counts, x_edges, y_edges = rasterize(_traces, distance_window, dB_range)
+    return density_figure(
+        counts, x_edges, y_edges, _station_processor.station_distances, _station_processor.codes, len(_traces)
+    )
 
 
-class NoiseDataProcessor:
-    def __init__(self, data, station_processor):
-        """
-        소음 데이터를 처리하는 클래스입니다.
-        """
-        self.data_frame = data  # CSV에서 읽은 데이터 프레임
-        self.station_processor = station_processor  # StationDataProcessor 인스턴스
-        self.station_pairs = station_processor.station_pairs
-        self.station_btw_distance = station_processor.station_btw_distance
+# 실행 데이터 비교용 데이터셋 (최소 속도와 무관하므로 fragment 밖에서 빌림)
+# 선택한 실행 데이터는 이미 빌린 데이터셋을 그대로 쓰고 나머지만 불러옵니다. (같은 실행을 두 번 올리지 않음)
+# 스트리밍 기준보다 큰 실행은 비교에서도 원본 행 없이 누적기(구간 통계, 라인 차트 요약, 회귀 통계량)만 씁니다.
+if compare_files:
+    from run_comparison import compare_runs, load_runs_parallel, run_label
 
-    def get_filtered_data(self, min_speed):
-        """
-        속도 기준으로 데이터를 필터링합니다.
-        """
-        filtered_data = self.data_frame[self.data_frame['speed'] >= min_speed]
-        return filtered_data
+    comparison_key = ("compare",) + tuple(file_sha256(name) for name in compare_files) + station_layout
+    reuse_selected = selected_csv_name in compare_files
+    selected_run = {
+        "df": df, "speed_index": speed_index, "trace": None if df is not None else distance_trace,
+        "regression": layout_dataset["regression"]
+    }
+    other_files = [name for name in compare_files if not (reuse_selected and name == selected_csv_name)]
 
-    def get_station_intervals(self, filtered_data):
+    def compared_levels(run):
         """
-        역 구간별 평균 소음과 최대 소음을 계산합니다.
+        비교 중인 실행의 (거리, dB) 배열 (스트리밍한 실행은 라인 차트 요약의 버킷별 최대값)
         """
-        station_intervals = []
-        for pair, (start_distance, end_distance) in zip(self.station_pairs, self.station_btw_distance):
-            main_line_between = filtered_data[(filtered_data['distance'] >= start_distance) & (filtered_data['distance'] <= end_distance)]
-            if not main_line_between.empty:
-                average_noise = main_line_between['dB'].mean()
-                maximum_noise = main_line_between['dB'].max()
-            else:
-                average_noise = 0
-                maximum_noise = 0
-            station_intervals.append({
-                'Station Pair': pair,
-                'Average Noise (dBA)': average_noise,
-                'Maximum Noise (dBA)': maximum_noise
-            })
-        return pd.DataFrame(station_intervals)
-
-# Streamlit 애플리케이션
-st.title("Noise Monitoring Dashboard")
-
-# 데이터 프로세싱: 역 데이터와 CSV 데이터를 각각 처리
-station_processor = StationDataProcessor(stationdata)  # 역 정보 처리
-noise_processor = NoiseDataProcessor(df, station_processor)  # 소음 데이터 처리
-
-# Dashboard Layout
-col1, col2 = st.columns([1, 3])  # 첫 번째 칼럼을 좁게 설정
+        if run["df"] is None:
+            from hotspots import trace_levels
+            return trace_levels(run["trace"])
+        return run["df"]['distance'].values, run["df"]['dB'].values
+
+    def load_comparison_runs():
+        other_runs = lease_dataset(
+            "compare", ("compare",) + tuple(file_sha256(name) for name in other_files) + station_layout,
+            lambda: load_runs_parallel(other_files, gpg_password, station_processor.station_btw_distance)
+        )
+        return {
+            name: selected_run if reuse_selected and name == selected_csv_name else other_runs[name]
+            for name in compare_files
+        }
 
-with col1:
-    # Minimum speed input field
-    min_speed = st.number_input("Minimum Speed (km/h):", min_value=0, max_value=100, value=50, key="speed_input", help="Set the minimum speed to filter data.")
+    with profiler.stage("compare_load", rows=len(other_files)):
+        comparison_runs = stage_graph.run(
+            "compare_load", load_comparison_runs, inputs=comparison_key, after=("load",)
+        )
+
+
+@st.fragment
+def speed_section():
+    """
+    최소 속도에 따라 바뀌는 부분(막대그래프, 소음 지표, 실행 비교)입니다.
+    최소 속도를 바꾸면 이 fragment 만 다시 실행되므로 로드/라인 차트/히트맵 단계는 실행되지 않습니다.
+    (filter -> aggregate -> bar_figure 순서로 필요한 단계만 다시 계산)
+    """
+    # fragment 만 재실행될 때는 전체 재실행의 profiler 가 이미 멈췄으므로 이번 패스용 profiler 를 따로 만듭니다.
+    fragment_only = script_finished
+    if fragment_only:
+        stage_graph.begin()
+        section_profiler = StageProfiler(track_memory=st.session_state.get("debug_timings", False), count_rerun=False)
+    else:
+        section_profiler = profiler
+
+    input_col, _ = st.columns([1, 3])  # 입력칸을 좁게 설정
+    with input_col:
+        # Minimum speed input field
+        min_speed = st.number_input("Minimum Speed (km/h):", min_value=0, max_value=100, value=50, key="speed_input", help="Set the minimum speed to filter data.")
+
+    # 속도 인덱스로 구간별 소음 분석 (데이터 재스캔 없음)
+    with section_profiler.stage("aggregate") as stage:
+        speed_stats = stage_graph.run(
+            "filter", lambda: speed_index.query(min_speed, levels=True), inputs=(min_speed,), after=("index",)
+        )
+        station_intervals_df = stage_graph.run(
+            "aggregate", lambda: noise_processor.to_intervals_frame(speed_stats), after=("filter",)
+        )
+        stage['rows'] = len(station_intervals_df)
 
-with col2:
+    # 그래프 생성
+    with section_profiler.stage("bar_chart_build"):
+        fig = stage_graph.run(
+            "bar_figure",
+            lambda: cached_bar_figure(content_hash, station_layout, min_speed, station_intervals_df),
+            after=("aggregate",)
+        )
+
+    with section_profiler.stage("bar_chart_render"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    # 통계적 소음 지표 (구간별 히스토그램 스케치에서 계산, 펼쳤을 때만 계산)
+    descriptors_section = st.expander(
+        'Noise Descriptors (Leq, L10, L50, L90)', expanded=False, key="descriptors_section", on_change="rerun"
+    )
+    if descriptors_section.open:
+        with descriptors_section, section_profiler.stage("descriptors"):
+            descriptors_df = stage_graph.run(
+                "descriptors", lambda: noise_processor.descriptors_frame(speed_stats), after=("filter",)
+            )
+            st.dataframe(descriptors_df.round(1), hide_index=True, use_container_width=True)
+
+    # 실행 데이터 비교 (같은 역 구간 기준)
+    if compare_files:
+        with section_profiler.stage("compare", rows=len(compare_files)):
+            comparison_df = stage_graph.run(
+                "compare",
+                lambda: compare_runs(
+                    {name: run["speed_index"] for name, run in comparison_runs.items()},
+                    station_processor.station_pairs, min_speed
+                ),
+                inputs=(min_speed,), after=("compare_load",)
+            )
+
+        compare_fig = cached_compare_figure(
+            comparison_key, min_speed, tuple(run_label(name) for name in compare_files), comparison_df
+        )
+        st.plotly_chart(compare_fig, use_container_width=True)
+
+        delta_columns = [column for column in comparison_df.columns if column.startswith('Δ')]
+        if delta_columns:
+            st.dataframe(comparison_df[['Station Pair'] + delta_columns].round(1), hide_index=True)
+
+    # 디버그: 이번에 실행/생략된 단계 (fragment 만 재실행된 경우 확인용)
+    if st.session_state.get("debug_timings", False):
+        graph_df = stage_graph.to_frame()
+        ran = graph_df.loc[graph_df['last'] == "ran", 'stage']
+        skipped = graph_df.loc[graph_df['last'] == "skipped", 'stage']
+        st.caption(f"Stages ran: {', '.join(ran) or '-'} · skipped: {', '.join(skipped) or '-'}")
+        if fragment_only:
+            # 아래 디버그 패널은 fragment 밖이라 갱신되지 않으므로 이번 패스의 기록은 여기에 보여 줍니다.
+            st.caption(f"Section rerun: {section_profiler.total_seconds * 1000:.1f} ms")
+            st.dataframe(section_profiler.to_frame().round(4), hide_index=True, use_container_width=True)
+    if fragment_only:
+        section_profiler.stop()
 
-    # 소음 데이터 필터링 및 구간별 소음 분석
-    filtered_data = noise_processor.get_filtered_data(min_speed)
-    station_intervals_df = noise_processor.get_station_intervals(filtered_data)
 
 # Dashboard Main Panel
 col = st.columns((2, 1), gap='medium')  # 순서를 바꿔서 1열이 막대그래프, 2열이 라인차트
 with col[0]:
-    # 그래프 생성
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=station_intervals_df['Station Pair'],
-        y=station_intervals_df['Maximum Noise (dBA)'],
-        name='Maximum Noise (dBA)',
-        marker_color='#1e90ff'
-    ))
-    fig.add_trace(go.Bar(
-        x=station_intervals_df['Station Pair'],
-        y=station_intervals_df['Average Noise (dBA)'],
-        name='Average Noise (dBA)',
-        marker_color='#4682b4'
-    ))
-    fig.update_layout(
-        title=f"Average and Maximum Noise Levels at Speed Above {min_speed} km/h",
-        xaxis_title="Station",
-        yaxis_title="Noise Level (dBA)",
-        barmode='overlay'
+    speed_section()
+
+       # 라인 차트 생성 (보이는 거리 범위만 피크를 유지하며 다운샘플링)
+    distance_min, distance_max = distance_trace.distance_range
+    distance_window = st.slider(
+        "Distance range (m):",
+        min_value=distance_min,
+        max_value=max(distance_max, distance_min + 1),
+        value=(distance_min, max(distance_max, distance_min + 1)),
+        key="distance_range",
+        help="Zoom into a distance range to see it at full resolution."
     )
-
-    st.plotly_chart(fig, use_container_width=True)
-
-       # 라인 차트 생성
-    line_fig = go.Figure()
-
-    # Plot Noise Level (dB)
-    line_fig.add_trace(go.Scatter(
-        x=df['distance'],
-        y=df['dB'],
-        mode='lines',
-        name='Noise Level (dB)',
-        yaxis="y1"
-    ))
-
-    # Plot Speed (km/h)
-    line_fig.add_trace(go.Scatter(
-        x=df['distance'],
-        y=df['speed'],
-        mode='lines',
-        name='Speed (km/h)',
-        yaxis="y2"
-    ))
-
-    # Update layout with dual y-axes
-    line_fig.update_layout(
-        title="Noise Levels and Speed Over Distance",
-        xaxis=dict(title="Distance (m)"),
-        yaxis=dict(title="Noise Level (dB)", side="left"),
-        yaxis2=dict(title="Speed (km/h)", overlaying="y", side="right"),
-        height=600
+    # 소음 집중 구간 (짧고 큰 소음: 레일 파상마모, 불량 이음매 등) - 펼쳤을 때만 탐지
+    highlight_spans = None
+    hotspot_key = None
+    hotspot_section = st.expander('Noise Hotspots', expanded=False, key="hotspot_section", on_change="rerun")
+    if hotspot_section.open:
+        from hotspots import BASELINE_LENGTH, EXCESS_DB, WINDOW_LENGTH, trace_levels
+        from run_comparison import run_label
+
+        with hotspot_section:
+            hotspot_cols = st.columns(3)
+            hotspot_excess = hotspot_cols[0].slider(
+                "Excess over local baseline (dB):", 3.0, 20.0, EXCESS_DB, 0.5, key="hotspot_excess"
+            )
+            hotspot_threshold = hotspot_cols[1].number_input(
+                "Absolute threshold (dBA, 0 = off):", min_value=0, max_value=150, value=0, key="hotspot_threshold"
+            )
+            hotspot_window = hotspot_cols[2].slider(
+                "Window (m):", 5, 200, int(WINDOW_LENGTH), 5, key="hotspot_window"
+            )
+            hotspot_options = (
+                ("excess", hotspot_excess),
+                ("threshold", hotspot_threshold or None),
+                ("window", float(hotspot_window))
+            )
+            with profiler.stage("hotspots") as stage:
+                hotspots_df = stage_graph.run(
+                    "hotspots",
+                    lambda: cached_hotspots(
+                        (content_hash, station_layout), hotspot_options,
+                        {run_label(selected_csv_name): trace_levels(distance_trace)}, station_processor
+                    ),
+                    inputs=(hotspot_options, station_layout), after=("load",)  # 역 구간 이름은 역 배치에 따라 다름
+                )
+                stage['rows'] = len(hotspots_df)
+            st.caption(f"{len(hotspots_df)} hotspots (rolling {hotspot_window} m Leq vs {BASELINE_LENGTH:.0f} m baseline)")
+            st.dataframe(hotspots_df.round(1), hide_index=True, use_container_width=True)
+            if st.toggle("Highlight on line chart", value=True, key="hotspot_highlight"):
+                hotspot_key = hotspot_options
+                highlight_spans = list(zip(hotspots_df['Start Distance (m)'], hotspots_df['End Distance (m)']))
+
+            # 비교 중인 실행 데이터 전체에서 한 번에 탐지
+            if compare_files:
+                with profiler.stage("hotspots_compare", rows=len(compare_files)):
+                    compare_hotspots_df = cached_hotspots(
+                        comparison_key, hotspot_options,
+                        {run_label(name): compared_levels(run) for name, run in comparison_runs.items()},
+                        station_processor
+                    )
+                st.markdown("**Hotspots across compared runs**")
+                st.dataframe(compare_hotspots_df.round(1), hide_index=True, use_container_width=True)
+
+    # 라인 차트는 펼쳤을 때만 다운샘플링/생성합니다.
+    line_chart_section = st.expander(
+        'Noise Levels and Speed Over Distance', expanded=False, key="line_chart_section", on_change="rerun"
     )
+    if line_chart_section.open:
+        with line_chart_section:
+            with profiler.stage("line_chart_build"):
+                line_fig = stage_graph.run(
+                    "line_figure",
+                    lambda: cached_line_figure(
+                        content_hash, tuple(distance_window), hotspot_key, distance_trace, highlight_spans
+                    ),
+                    inputs=(tuple(distance_window), hotspot_key), after=("load",)
+                )
+
+            with profiler.stage("line_chart_render"):
+                st.plotly_chart(line_fig, use_container_width=True)
+
+    # 거리 x 속도 히트맵 (미리 집계된 큐브에서 조회, 펼쳤을 때만 생성)
+    heatmap_section = st.expander('Distance × Speed Heatmap', expanded=False, key="heatmap_section", on_change="rerun")
+    if heatmap_section.open:
+        with heatmap_section:
+            heatmap_metric = st.radio(
+                "Metric:", ['Leq (dBA)', 'Maximum (dBA)', 'Samples'], horizontal=True, key="heatmap_metric"
+            )
+            metric_key = {'Leq (dBA)': 'leq', 'Maximum (dBA)': 'max', 'Samples': 'count'}[heatmap_metric]
+            with profiler.stage("heatmap"):
+                heatmap_fig = stage_graph.run(
+                    "heatmap_figure",
+                    lambda: cached_heatmap_figure(
+                        content_hash, station_layout, metric_key, heatmap_metric, tuple(distance_window),
+                        aggregation_cube
+                    ),
+                    inputs=(metric_key, tuple(distance_window)), after=("index",)
+                )
+                st.plotly_chart(heatmap_fig, use_container_width=True)
+
+    # 여러 실행 데이터의 밀도 이미지 (서버에서 래스터화, 거리 범위를 바꾸면 보이는 범위만 다시 계산)
+    density_section = st.expander(
+        'Noise Density Across Runs', expanded=False, key="density_section", on_change="rerun"
+    )
+    if density_section.open:
+        from hotspots import trace_levels
 
-    st.plotly_chart(line_fig, use_container_width=True)
+        with density_section:
+            if compare_files:
+                density_key, density_after = comparison_key, ("compare_load",)
+            else:
+                density_key, density_after = ("run", content_hash) + station_layout, ("load",)
+                st.caption("Turn on *Compare runs* in the sidebar to overlay several runs.")
+            with profiler.stage("density", rows=len(compare_files) or 1):
+                density_fig = stage_graph.run(
+                    "density_figure",
+                    lambda: cached_density_figure(
+                        density_key, station_layout, tuple(distance_window),
+                        # 수집 단계에서 거리 순으로 정렬된 컬럼을 그대로 씀 (빌린 데이터셋 안의 배열, 복사 없음)
+                        [compared_levels(run) for run in comparison_runs.values()]
+                        if compare_files else [trace_levels(distance_trace)],
+                        station_processor
+                    ),
+                    inputs=(density_key, tuple(distance_window)), after=density_after
+                )
+            st.plotly_chart(density_fig, use_container_width=True)
+
+    # 역 구간별 속도-소음 회귀 (펼쳤을 때만 계산, 비교 모드에서는 비교 중인 실행 전체를 한 번에)
+    regression_section = st.expander(
+        'Speed–Noise Regression', expanded=False, key="regression_section", on_change="rerun"
+    )
+    if regression_section.open:
+        from figures import regression_figure
+        from run_comparison import run_label
+        from speed_regression import MIN_FIT_SPEED
+
+        with regression_section:
+            if compare_files:
+                regression_key, regression_after = comparison_key, ("compare_load",)
+                # 스트리밍한 실행은 읽으면서 누적한 통계량을 그대로 씀
+                regression_runs = {
+                    run_label(name): run["regression"] if run["df"] is None
+                    else (run["df"]['distance'].values, run["df"]['speed'].values, run["df"]['dB'].values)
+                    for name, run in comparison_runs.items()
+                }
+            else:
+                regression_key, regression_after = ("run", content_hash) + station_layout, ("index",)
+                regression_runs = None if df is None else {
+                    run_label(selected_csv_name): (df['distance'].values, df['speed'].values, df['dB'].values)
+                }
+            with profiler.stage("regression"):
+                regression = stage_graph.run(
+                    "regression",
+                    lambda: layout_dataset["regression"] if regression_runs is None
+                    else cached_regression(regression_key, regression_runs, station_processor),
+                    inputs=regression_key, after=regression_after
+                )
+                regression_fit = regression.fit()
+            st.caption(
+                "Least-squares fit of dB = intercept + slope · log10(speed) per station pair "
+                f"(samples at {MIN_FIT_SPEED:.0f} km/h or faster)."
+            )
+            regression_df = regression.to_frame(station_processor.station_pairs, regression_fit)
+            if regression.n_runs > 1:
+                regression_df = pd.concat(
+                    [regression_df, regression.pooled().to_frame(station_processor.station_pairs)], ignore_index=True
+                )
+            st.dataframe(regression_df.round(2), hide_index=True, use_container_width=True)
+
+            regression_pair = st.selectbox(
+                "Station pair:", list(station_processor.station_pairs), key="regression_pair"
+            )
+            segment = list(station_processor.station_pairs).index(regression_pair)
+            band_speeds, band_levels = regression.band_means()
+            st.plotly_chart(regression_figure(
+                band_speeds, band_levels[:, segment], regression_fit["slope"][:, segment],
+                regression_fit["intercept"][:, segment], regression_fit["r2"][:, segment],
+                regression.labels, regression_pair
+            ), use_container_width=True)
+
+# 첫 화면을 다 그린 뒤, 선택하지 않은 실행 데이터를 같은 역 정보로 백그라운드에서 미리 불러옵니다.
+# (파일 해시 계산도 작업자에서 하므로 이번 재실행을 늦추지 않습니다)
+def prefetch_run(name):
+    def job():
+        run_hash = file_sha256(name)
+        run_streaming = should_stream(name)
+        # 단계마다 checkpoint: 보고 있는 실행을 불러오는 동안 멈추고, 취소되면 남은 단계를 건너뜀
+        job_profiler = StageProfiler(count_rerun=False, checkpoint=prefetcher.checkpoint)
+        run_key = run_dataset_key(run_hash, run_streaming, station_layout)
+
+        def run_loader():
+            return load_run_dataset(name, run_hash, run_streaming, station_processor, run_profiler=job_profiler)
+
+        prefetcher.warm(run_key, run_loader)
+        if run_streaming or run_key not in dataset_registry:
+            return
+        run_lease = dataset_registry.lease(run_key, run_loader)
+        try:
+            prefetcher.warm(
+                ("layout", run_hash) + station_layout,
+                lambda: build_layout_dataset(run_lease.value["df"], station_processor, run_profiler=job_profiler)
+            )
+        finally:
+            run_lease.release()
+    return job
+
+
+prefetcher.schedule(
+    {(name,) + station_layout: prefetch_run(name) for name in csv_file_paths if name != selected_csv_name},
+    group=st.session_state.setdefault("prefetch_group", object())
+)
 
 # About section
 with col[1]:
@@ -268,3 +785,61 @@ with col[1]:
         <p><strong>Benefit:</strong> Provides a visual representation of the relationship between noise and speed based on distance.</p>
         <p><strong>Decision-Making Connection:</strong> Helps identify whether noise increases at specific speeds or distances, allowing for adjustments to train speeds and the development of noise management strategies for each section.</p>
         """, unsafe_allow_html=True)
+
+    # 디버그: 단계별 실행 시간/메모리 (About 패널 옆)
+    if st.session_state.get("debug_timings", False):
+        with st.expander('Debug: Stage Timings', expanded=True):
+            timings_df = profiler.to_frame()
+            first_paint = profiler.mark_offset("first_paint")
+            st.caption(
+                f"Time to first paint: {first_paint * 1000:.1f} ms{' (cold start)' if profiler.cold_start else ''} · "
+                f"Rerun total: {profiler.total_seconds * 1000:.1f} ms"
+            )
+            st.dataframe(timings_df.round(4), hide_index=True, use_container_width=True)
+            st.markdown("**Stage graph** (runs / skips since this session started)")
+            st.dataframe(stage_graph.to_frame().round({"last_run_ms": 2}), hide_index=True, use_container_width=True)
+            st.download_button(
+                "Download timing log (JSON Lines)",
+                profiler.to_json_lines(
+                    run=selected_csv_name, content_hash=content_hash, min_speed=st.session_state.get("speed_input", 50)
+                ),
+                file_name="stage_timings.jsonl",
+                mime="application/json"
+            )
+
+    # 수집 단계에서 한 번 검증/정리한 결과 (규칙별로 지운 행 수)
+    quality_report = run_dataset.get("quality")
+    if quality_report is not None:
+        from data_validation import quality_frame
+
+        with st.expander('Data Quality', expanded=False):
+            st.caption(
+                f"{quality_report['clean_rows']:,} of {quality_report['rows']:,} samples kept · "
+                f"{quality_report['dropped_rows']:,} dropped at ingestion"
+            )
+            st.dataframe(
+                quality_frame(quality_report).round({"Share (%)": 3}), hide_index=True, use_container_width=True
+            )
+
+    # 세션 간 공유 데이터셋 저장소 현황 (컨테이너 메모리 산정용)
+    with st.expander('Dataset Cache', expanded=False):
+        cache_stats = dataset_registry.stats()
+        stat_cols = st.columns(3)
+        stat_cols[0].metric("Memory", f"{cache_stats['memory_mb']:,.0f} / {cache_stats['budget_mb']:,.0f} MB")
+        stat_cols[1].metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+        stat_cols[2].metric("Evictions", cache_stats['evictions'])
+        prefetch_stats = prefetcher.stats()
+        st.caption(
+            f"{cache_stats['entries']} datasets ({cache_stats['in_use']} in use), "
+            f"{cache_stats['hits']} hits / {cache_stats['misses']} misses · "
+            f"prefetch: {prefetch_stats['pending']} pending, {prefetch_stats['completed']} loaded, "
+            f"{prefetch_stats['cancelled']} cancelled"
+        )
+        st.dataframe(
+            dataset_registry.entries_frame().round({"memory_mb": 2, "load_seconds": 3}),
+            hide_index=True, use_container_width=True
+        )
+    profiler.stop()
+
+# 여기까지 실행된 뒤의 fragment 재실행은 부분 재실행입니다. (speed_section 참고)
+script_finished = True
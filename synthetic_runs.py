@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from noise_core import stationdata
+
+GENERATOR_CHUNK_ROWS = 1_000_000
+STATION_DISTANCES = np.asarray(stationdata["station distance"], dtype=np.float64)
+LINE_LENGTH = float(STATION_DISTANCES[-1] + 200)
+
+
+def _nearest_station_distance(distance):
+    """
+    각 지점에서 가장 가까운 역까지의 거리를 구합니다.
+    """
+    right = np.clip(np.searchsorted(STATION_DISTANCES, distance), 1, len(STATION_DISTANCES) - 1)
+    left = right - 1
+    return np.minimum(np.abs(distance - STATION_DISTANCES[left]), np.abs(distance - STATION_DISTANCES[right]))
+
+
+def synthetic_samples(distance, seed=0):
+    """
+    주어진 거리 지점에 대한 가상 dB / speed 값을 만듭니다.
+    역 부근에서는 감속/정차하고, 속도가 높을수록 소음이 커지며, 가끔 짧은 소음 피크가 있습니다.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(distance)
+    speed = np.clip(80 * np.tanh(_nearest_station_distance(distance) / 400.0) + rng.normal(0, 2, n_rows), 0, None)
+    noise = 55 + 0.25 * speed + rng.normal(0, 2.5, n_rows)
+    spikes = rng.random(n_rows) < 0.001
+    noise[spikes] += rng.uniform(5, 20, spikes.sum())
+    return noise, speed
+
+
+def synthetic_run(n_rows, seed=0, with_stations=False):
+    """
+    실제 측정 데이터와 같은 형식(distance, dB, speed)의 가상 실행 데이터를 만듭니다.
+    with_stations=True 이면 noslider.py 형식처럼 code / station distance 컬럼을 앞쪽 행에 채웁니다.
+    """
+    distance = np.linspace(0.0, LINE_LENGTH, n_rows)
+    noise, speed = synthetic_samples(distance, seed)
+    df = pd.DataFrame({
+        'distance': distance.round(2),
+        'dB': noise.round(1),
+        'speed': speed.round(1)
+    })
+    if with_stations:
+        _add_station_columns(df)
+    return df
+
+
+def _add_station_columns(df, first_chunk=True):
+    count = min(len(STATION_DISTANCES), len(df)) if first_chunk else 0
+    codes = np.full(len(df), None, dtype=object)
+    distances = np.full(len(df), np.nan)
+    codes[:count] = stationdata["code"][:count]
+    distances[:count] = STATION_DISTANCES[:count]
+    df['code'] = codes
+    df['station distance'] = distances
+
+
+def write_synthetic_csv(path, n_rows, seed=0, with_stations=False, chunk_rows=GENERATOR_CHUNK_ROWS):
+    """
+    가상 실행 데이터를 CSV 로 저장합니다. 아주 큰 행 수(10^8)도 청크 단위로 나누어 메모리 사용량을 제한합니다.
+    """
+    step = LINE_LENGTH / max(n_rows - 1, 1)
+    for chunk_index, start in enumerate(range(0, max(n_rows, 1), chunk_rows)):
+        rows = min(chunk_rows, n_rows - start)
+        distance = np.arange(start, start + rows) * step
+        noise, speed = synthetic_samples(distance, seed + chunk_index)
+        chunk = pd.DataFrame({
+            'distance': distance.round(2),
+            'dB': noise.round(1),
+            'speed': speed.round(1)
+        })
+        if with_stations:
+            _add_station_columns(chunk, first_chunk=chunk_index == 0)
+        chunk.to_csv(path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+    return path
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 최상위 모듈(segment_engine, noise_core 등)을 테스트에서 바로 import 할 수 있게 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
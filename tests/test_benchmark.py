@@ -0,0 +1,59 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import MIN_SLACK_SECONDS, benchmark_rows, compare_to_baseline
+from synthetic_runs import LINE_LENGTH, STATION_DISTANCES, synthetic_run, write_synthetic_csv
+
+
+def test_chunked_csv_matches_requested_rows(tmp_path):
+    path = tmp_path / "run.csv"
+    write_synthetic_csv(str(path), 2500, with_stations=True, chunk_rows=1000)
+    df = pd.read_csv(path)
+    assert len(df) == 2500
+    assert list(df.columns) == ['distance', 'dB', 'speed', 'code', 'station distance']
+    # 청크 경계와 무관하게 거리는 0 ~ 선로 끝까지 증가
+    assert df['distance'].iloc[0] == 0.0
+    assert df['distance'].iloc[-1] == pytest.approx(LINE_LENGTH, abs=0.01)
+    assert (np.diff(df['distance']) > 0).all()
+    # 역 컬럼은 첫 청크 앞쪽 행에만
+    assert df['station distance'].notna().sum() == len(STATION_DISTANCES)
+    np.testing.assert_array_equal(df['station distance'].dropna(), STATION_DISTANCES)
+
+
+def test_synthetic_run_slows_near_stations():
+    df = synthetic_run(20000)
+    near = np.min(np.abs(df['distance'].values[:, None] - STATION_DISTANCES[None, :]), axis=1) < 50
+    assert df['speed'][near].mean() < df['speed'][~near].mean() / 2
+    assert (df['speed'] >= 0).all()
+
+
+def test_compare_to_baseline_flags_slow_stages_and_large_figures():
+    baseline = {"results": {"1000": {"seconds": {"parse": 1.0, "decrypt": 0.001}, "figure_bytes": 100}}}
+    results = {
+        "1000": {"seconds": {"parse": 1.4, "decrypt": 0.001 * 3, "new_stage": 9.0}, "figure_bytes": 140},
+        "5000": {"seconds": {"parse": 99.0}, "figure_bytes": 1},  # 기준값 없음
+    }
+    assert compare_to_baseline(results, baseline, 1.5) == []  # 짧은 단계는 잡음 허용치 안
+
+    results["1000"]["seconds"]["parse"] = 1.5 + MIN_SLACK_SECONDS * 2
+    results["1000"]["figure_bytes"] = 151
+    assert compare_to_baseline(results, baseline, 1.5) == [
+        ("1000", "parse", 1.5 + MIN_SLACK_SECONDS * 2, 1.0),
+        ("1000", "figure_bytes", 151, 100),
+    ]
+
+
+def test_benchmark_rows_times_every_stage(tmp_path):
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg is not installed")
+    result = benchmark_rows(2000, str(tmp_path), 1)
+    assert set(result["seconds"]) == {
+        "decrypt", "parse", "get_filtered_data", "get_station_intervals", "build_speed_index",
+        "speed_index_query", "build_distance_trace", "figure_build", "figure_serialize"
+    }
+    assert all(seconds >= 0 for seconds in result["seconds"].values())
+    assert result["figure_bytes"] > 0
+    assert list(tmp_path.iterdir()) == []  # 임시 파일 정리
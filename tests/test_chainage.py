@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import chainage
+from chainage import TrackAlignment, add_chainage, calibrated_alignment, ensure_distance
+from station_registry import StationRegistry
+
+# 동쪽으로 1000 m, 북쪽으로 1000 m 가는 L 자 선형 (투영 좌표)
+CORNER_X = [500_000.0, 501_000.0, 501_000.0]
+CORNER_Y = [9_300_000.0, 9_300_000.0, 9_301_000.0]
+
+
+def station_network(coordinates):
+    stations = [
+        {"code": code, "station": code, "distance": distance, **coordinate}
+        for code, distance, coordinate in coordinates
+    ]
+    return StationRegistry({"default_line": "M", "lines": [{"id": "M", "name": "M", "stations": stations}]})
+
+
+@pytest.fixture
+def alignment():
+    return TrackAlignment(CORNER_X, CORNER_Y, start_chainage=100.0)
+
+
+def test_match_projects_onto_nearest_segment(alignment):
+    x = np.array([500_250.0, 501_010.0, 501_000.0, 500_500.0, np.nan])
+    y = np.array([9_300_003.0, 9_300_400.0, 9_300_000.0, 9_300_200.0, 9_300_000.0])
+    distance, offset = alignment.match(x, y)
+    np.testing.assert_allclose(distance[:3], [350.0, 1500.0, 1100.0])
+    np.testing.assert_allclose(offset[:4], [3.0, 10.0, 0.0, 200.0])
+    assert np.isnan(distance[3])  # MAX_OFFSET 보다 멀리
+    assert np.isnan(distance[4]) and np.isnan(offset[4])
+
+
+def test_match_million_points_vectorised(alignment):
+    rng = np.random.default_rng(0)
+    along = rng.uniform(0, 2000, 1_000_000)
+    side = rng.normal(0, 5, len(along))  # 선로 옆으로 벗어난 GPS 오차
+    x = np.where(along < 1000, CORNER_X[0] + along, CORNER_X[1] + side)
+    y = np.where(along < 1000, CORNER_Y[0] + side, CORNER_Y[0] + along - 1000)
+    distance, offset = alignment.match(x, y)
+    away = np.abs(along - 1000) > 20  # 모서리 근처는 어느 선분에 수직 투영하느냐에 따라 달라짐
+    np.testing.assert_allclose(distance[away], along[away] + 100.0, atol=1e-6)
+    np.testing.assert_allclose(offset[away], np.abs(side[away]), atol=1e-6)
+
+
+def test_calibrate_aligns_to_station_distances(alignment):
+    residuals = alignment.calibrate([500_000.0, 501_000.0, 501_000.0], [9_300_000.0, 9_300_000.0, 9_301_000.0],
+                                    [329.0, 1331.0, 2327.0])
+    assert alignment.start_chainage == pytest.approx(329.0)
+    np.testing.assert_allclose(residuals, [0.0, 2.0, -2.0], atol=1e-9)
+    assert alignment.anchored
+
+
+def test_calibrate_rejects_stations_off_the_alignment(alignment):
+    with pytest.raises(ValueError, match="disagrees"):
+        alignment.calibrate([500_000.0, 501_000.0, 501_000.0], [9_300_000.0, 9_300_000.0, 9_301_000.0],
+                            [0.0, 1000.0, 5000.0])
+
+
+def test_calibrated_alignment_uses_station_coordinates(tmp_path):
+    path = tmp_path / "alignment.csv"
+    pd.DataFrame({"Easting": CORNER_X, "Northing": CORNER_Y}).to_csv(path, index=False)
+    registry = station_network([
+        ("A", 500.0, {"Easting": 500_000.0, "Northing": 9_300_000.0}),
+        ("B", 2500.0, {"Easting": 501_000.0, "Northing": 9_301_000.0}),
+    ])
+    alignment = calibrated_alignment(str(path), registry)
+    assert alignment.start_chainage == pytest.approx(500.0)
+
+    with pytest.raises(ValueError, match="cannot tie"):
+        calibrated_alignment(str(path), station_network([("A", 500.0, {})]))
+
+
+def test_ensure_distance_from_lonlat(monkeypatch, alignment):
+    df = pd.DataFrame({"Easting": [500_250.0, 501_000.0], "Northing": [9_300_000.0, 9_300_500.0], "dB": [70.0, 71.0]})
+    monkeypatch.setattr(chainage, "load_default_alignment", lambda: alignment)
+    result = ensure_distance(df)
+    np.testing.assert_allclose(result['distance'], [350.0, 1600.0])
+    assert 'distance' not in df.columns
+    assert ensure_distance(result) is result
+
+    lon, lat = chainage.project_points([500_250.0], [9_300_000.0], alignment.crs, chainage.WGS84)
+    lonlat = add_chainage(pd.DataFrame({"lon": lon, "lat": lat}), alignment)
+    np.testing.assert_allclose(lonlat['distance'], [350.0], atol=1e-3)
+
+
+def test_add_chainage_without_coordinates_raises(alignment):
+    # x/y 같은 일반 이름은 좌표로 보지 않음
+    with pytest.raises(ValueError, match="coordinate"):
+        add_chainage(pd.DataFrame({"x": [1.0], "y": [2.0]}), alignment)
@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_cache import ALIGNMENT, PLAIN_SUFFIX, open_columnar, sweep_stale_plain_files, to_columnar_bytes
+
+
+def round_trip(tmp_path, df, attrs=None):
+    path = tmp_path / "run.ncol"
+    path.write_bytes(to_columnar_bytes(df, attrs=attrs))
+    return open_columnar(str(path))
+
+
+def test_round_trip_dtypes_categories_and_nan(tmp_path):
+    df = pd.DataFrame({
+        'distance': np.array([0.5, 1.5, np.nan, 3.25]),
+        'count': np.array([1, 2, 3, 4], dtype=np.int64),
+        'moving': [True, False, True, True],
+        'dB': pd.array([70.0, None, 72.5, 80.0], dtype="Float64"),
+        'code': ['LBB', None, 'FTW', 'LBB'],
+        'kind': pd.Categorical(['main', 'spur', 'main', None], categories=['spur', 'main']),
+    })
+    result = round_trip(tmp_path, df, attrs={"quality": {"rows": 4}})
+
+    assert list(result.columns) == list(df.columns)
+    for name in ('distance', 'count', 'moving', 'dB'):
+        assert result[name].dtype == np.float32
+    np.testing.assert_array_equal(result['distance'], np.array([0.5, 1.5, np.nan, 3.25], dtype=np.float32))
+    np.testing.assert_array_equal(result['count'], [1, 2, 3, 4])
+    np.testing.assert_array_equal(result['moving'], [1, 0, 1, 1])
+    np.testing.assert_array_equal(result['dB'], np.array([70.0, np.nan, 72.5, 80.0], dtype=np.float32))
+
+    # 문자열은 카테고리 코드로, 결측은 코드 -1 (NaN)
+    assert isinstance(result['code'].dtype, pd.CategoricalDtype)
+    assert result['code'].cat.categories.tolist() == ['FTW', 'LBB']
+    assert result['code'].cat.codes.tolist() == [1, -1, 0, 1]
+    assert result['code'].cat.codes.dtype == np.int8
+    assert result['code'].isna().tolist() == [False, True, False, False]
+    # 카테고리 순서는 그대로
+    assert result['kind'].cat.categories.tolist() == ['spur', 'main']
+    assert result['kind'].astype(object).tolist()[:3] == ['main', 'spur', 'main']
+    assert pd.isna(result['kind'].iloc[3])
+
+    assert result.attrs == {"quality": {"rows": 4}}
+
+
+def memmap_base(values):
+    while values is not None and not isinstance(values, np.memmap):
+        values = values.base
+    return values
+
+
+def test_columns_are_mapped_and_aligned(tmp_path):
+    df = pd.DataFrame({'a': np.arange(3.0), 'b': ['x', 'y', 'x'], 'c': np.arange(3.0)})
+    result = round_trip(tmp_path, df)
+    for name in ('a', 'c'):
+        values = result[name].to_numpy()
+        mapped = memmap_base(values)
+        assert mapped is not None  # 복사 없이 파일 페이지를 씀
+        assert mapped.offset % ALIGNMENT == 0
+
+
+def test_round_trip_empty_frame(tmp_path):
+    result = round_trip(tmp_path, pd.DataFrame({'distance': np.zeros(0), 'code': pd.Series([], dtype=object)}))
+    assert len(result) == 0
+    assert list(result.columns) == ['distance', 'code']
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.ncol"
+    path.write_bytes(b"distance,dB\n")
+    with pytest.raises(ValueError):
+        open_columnar(str(path))
+
+
+def test_sweep_removes_files_of_dead_processes_only(tmp_path):
+    own = tmp_path / f"abc.v2.p{os.getpid()}{PLAIN_SUFFIX}"
+    dead = tmp_path / f"abc.v2.p999999999{PLAIN_SUFFIX}"
+    legacy = tmp_path / f"abc.v2{PLAIN_SUFFIX}"
+    partial = tmp_path / ".tmp_abc"
+    for path in (own, dead, legacy, partial):
+        path.write_bytes(b"")
+    assert sweep_stale_plain_files(str(tmp_path)) == 3
+    assert sorted(os.listdir(tmp_path)) == [own.name]
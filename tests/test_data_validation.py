@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from data_validation import merge_reports, quality_frame, validate_run
+
+
+def clean_run(n_rows=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'distance': np.arange(n_rows, dtype=np.float64),
+        'speed': np.full(n_rows, 40.0),
+        'dB': rng.normal(70, 1.0, n_rows),
+    })
+
+
+def test_each_dropped_row_counted_under_one_rule():
+    df = clean_run()
+    df.loc[100, 'dB'] = 200.0  # 범위 밖 (글리치 후보로 다시 세지 않음)
+    df.loc[200, 'dB'] = 110.0  # 글리치 후보 (세기만 함)
+    df.loc[300, 'distance'] = np.nan
+    df.loc[300, 'dB'] = np.nan  # 결측 두 규칙에 걸려도 한 번
+    clean, report = validate_run(df)
+    assert report['dropped_rows'] == 2
+    assert sum(report['rules'].values()) == report['dropped_rows']
+    assert report['rules']['dB_out_of_range'] == 1
+    assert report['rules']['missing_distance'] == 1
+    assert report['dB_spikes'] == 1 and not report['spikes_dropped']
+    assert len(clean) == len(df) - 2
+    assert 110.0 in clean['dB'].values
+
+
+def test_spikes_are_kept_unless_requested():
+    df = clean_run()
+    df.loc[200, 'dB'] = 110.0
+    clean, report = validate_run(df, drop_spikes=True)
+    assert report['dB_spikes'] == 1 and report['spikes_dropped']
+    assert report['dropped_rows'] == 1 and len(clean) == len(df) - 1
+    frame = quality_frame(report).set_index('Rule')
+    assert frame.loc['dB_spike', 'Action'] == 'dropped'
+    assert quality_frame(validate_run(df)[1]).set_index('Rule').loc['dB_spike', 'Action'] == 'kept'
+
+
+def test_spike_neighbours_skip_dropped_rows():
+    df = clean_run()
+    # 지워지는 이웃 옆의 글리치 후보는 남은 앞뒤 샘플과 비교해 찾음
+    df.loc[500, 'dB'] = np.nan
+    df.loc[501, 'dB'] = 110.0
+    # 범위 밖 값 옆의 정상 샘플은 글리치 후보가 아님
+    df.loc[700, 'dB'] = 5.0
+    _, report = validate_run(df)
+    assert report['dB_spikes'] == 1
+    assert report['rules']['missing_dB'] == 1
+    assert report['rules']['dB_out_of_range'] == 1
+    assert report['dropped_rows'] == 2
+
+
+def test_merge_reports_adds_counts():
+    df = clean_run()
+    df.loc[10, 'dB'] = 110.0
+    df.loc[1500, 'speed'] = np.nan
+    _, first = validate_run(df.iloc[:1000], sort=False)
+    _, second = validate_run(df.iloc[1000:], sort=False)
+    merged = merge_reports(merge_reports(None, first), second)
+    _, whole = validate_run(df, sort=False)
+    assert merged == whole
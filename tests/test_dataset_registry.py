@@ -0,0 +1,96 @@
+import gc
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_registry import DatasetRegistry, estimate_nbytes
+
+MB = 1024 ** 2
+
+
+def dataset(megabytes):
+    return {"values": np.zeros(megabytes * MB // 8)}
+
+
+def test_lease_loads_once_and_counts_hits():
+    registry = DatasetRegistry(memory_budget_bytes=10 * MB)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return dataset(1)
+
+    first = registry.lease("a", loader)
+    second = registry.lease("a", loader)
+    assert first.value is second.value and len(calls) == 1
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"], stats["in_use"]) == (1, 1, 1)
+    assert stats["memory_mb"] == 1.0
+    assert registry.entries_frame().loc[0, "sessions"] == 2
+
+
+def test_concurrent_leases_share_one_load():
+    registry = DatasetRegistry()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return dataset(1)
+
+    leases = []
+    threads = [threading.Thread(target=lambda: leases.append(registry.lease("a", slow_loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+    assert len(calls) == 1 and len(leases) == 4
+    assert len({id(lease.value) for lease in leases}) == 1
+
+
+def test_leased_datasets_are_never_evicted():
+    registry = DatasetRegistry(memory_budget_bytes=2 * MB)
+    leases = [registry.lease(key, lambda: dataset(1)) for key in "abc"]
+    # 모두 사용 중이면 예산을 넘어도 그대로 둠
+    assert registry.stats()["entries"] == 3 and registry.stats()["evictions"] == 0
+    leases[1].release()
+    # 반납하면 예산에 맞을 때까지 내보냄
+    assert "b" not in registry and "a" in registry and "c" in registry
+    assert registry.stats()["evictions"] == 1
+
+
+def test_lru_eviction_under_budget():
+    registry = DatasetRegistry(memory_budget_bytes=3 * MB)
+    for key in "abc":
+        registry.lease(key, lambda: dataset(1)).release()
+    registry.lease("a", lambda: dataset(1)).release()  # a 를 최근에 봄 -> b 가 가장 오래됨
+    registry.lease("d", lambda: dataset(1)).release()
+    assert [key in registry for key in "abcd"] == [True, False, True, True]
+    assert registry.stats()["memory_mb"] <= 3.0
+
+    registry.lease("e", lambda: dataset(2)).release()
+    assert [key in registry for key in "acde"] == [False, False, True, True]
+    assert registry.stats()["evictions"] == 3
+
+
+def test_dropped_lease_releases_reference():
+    registry = DatasetRegistry(memory_budget_bytes=1 * MB)
+    lease = registry.lease("a", lambda: dataset(1))
+    lease.release()
+    lease.release()  # 두 번 반납해도 한 번만
+    lease = registry.lease("a", lambda: dataset(1))
+    assert registry.stats()["in_use"] == 1
+    del lease  # 세션 상태에서 사라짐
+    gc.collect()
+    assert registry.stats()["in_use"] == 0
+    registry.lease("b", lambda: dataset(1)).release()
+    assert "a" not in registry
+
+
+def test_estimate_nbytes_counts_shared_arrays_once():
+    values = np.zeros(1000)
+    frame = pd.DataFrame({"x": np.zeros(500)})
+    nested = {"a": values, "b": [values, (values,)], "frame": frame}
+    assert estimate_nbytes(nested) == values.nbytes + int(frame.memory_usage(index=True).sum())
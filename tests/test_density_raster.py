@@ -0,0 +1,46 @@
+import numpy as np
+
+from density_raster import rasterize, value_range
+
+
+def sorted_run(seed, n_rows=50000, length=5000.0):
+    rng = np.random.default_rng(seed)
+    distances = np.sort(rng.uniform(0, length, n_rows))
+    values = rng.normal(70, 8, n_rows)
+    values[rng.random(n_rows) < 0.01] = np.nan
+    return distances, values
+
+
+def histogram(traces, x_range, y_range, width, height):
+    x = np.concatenate([distances for distances, _ in traces])
+    y = np.concatenate([values for _, values in traces])
+    x_edges = np.linspace(x_range[0], x_range[1], width + 1)
+    y_edges = np.linspace(y_range[0], y_range[1], height + 1)
+    counts, _, _ = np.histogram2d(y, x, bins=[y_edges, x_edges])  # NaN 과 범위 밖 값은 빠짐
+    return counts.astype(np.int64)
+
+
+def test_counts_match_histogram2d():
+    traces = [sorted_run(seed) for seed in range(3)]
+    for x_range in ((0.0, 5000.0), (1234.5, 2345.5)):
+        y_range = value_range(traces, x_range)
+        counts, x_edges, y_edges = rasterize(traces, x_range, y_range, width=300, height=80)
+        assert counts.shape == (80, 300)
+        np.testing.assert_array_equal(counts, histogram(traces, x_range, y_range, 300, 80))
+        np.testing.assert_allclose(x_edges, np.linspace(*x_range, 301))
+        np.testing.assert_allclose(y_edges, np.linspace(*y_range, 81))
+
+
+def test_clipped_value_range_drops_samples_outside():
+    traces = [sorted_run(5)]
+    counts, _, _ = rasterize(traces, (0.0, 5000.0), (65.0, 75.0), width=100, height=20)
+    np.testing.assert_array_equal(counts, histogram(traces, (0.0, 5000.0), (65.0, 75.0), 100, 20))
+
+
+def test_value_range_of_visible_samples():
+    distances = np.arange(10.0)
+    values = np.array([1, 50, 2, 3, np.nan, 4, 5, 60, 6, 7], dtype=np.float64)
+    assert value_range([(distances, values)], (2.0, 6.0)) == (2.0, 5.0)
+    assert value_range([(distances, np.full(10, np.nan))], (0.0, 9.0)) is None
+    counts, _, _ = rasterize([], (0.0, 1.0), (0.0, 1.0), width=4, height=2)
+    assert counts.sum() == 0 and counts.shape == (2, 4)
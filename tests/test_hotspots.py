@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from hotspots import detect_hotspots
+
+DEFECT_START, DEFECT_END = 1500.0, 1540.0  # 40 m 길이, +15 dB
+
+
+def defect_run(spacing, seed=3):
+    rng = np.random.default_rng(seed)
+    distances = np.arange(0.0, 3000.0, spacing)
+    levels = rng.normal(70, 1.0, len(distances))
+    levels[(distances >= DEFECT_START) & (distances < DEFECT_END)] += 15
+    return distances, levels
+
+
+@pytest.mark.parametrize("spacing", [0.5, 1.0, 1.5, 2.0, 5.0, 8.0])
+def test_defect_found_at_any_sample_spacing(spacing):
+    distances, levels = defect_run(spacing)
+    hotspots = detect_hotspots(distances, levels)
+    assert len(hotspots) == 1
+    hotspot = hotspots.iloc[0]
+    assert DEFECT_START - 20 <= hotspot['Start Distance (m)'] <= DEFECT_START + spacing
+    assert DEFECT_END - spacing <= hotspot['End Distance (m)'] <= DEFECT_END + 20
+    assert DEFECT_START <= hotspot['Peak Distance (m)'] <= DEFECT_END
+    # 구간의 시작/끝은 샘플이 있는 칸
+    assert np.any(np.abs(distances - hotspot['Start Distance (m)']) < 1.0)
+
+
+def test_gap_wider_than_window_splits_spans():
+    distances, levels = defect_run(1.0)
+    dropout = (distances >= 1510) & (distances < 1535)  # 이동 창(20 m)보다 긴 결측
+    hotspots = detect_hotspots(distances[~dropout], levels[~dropout], min_length=1.0)
+    assert len(hotspots) == 2
+
+
+def test_quiet_run_has_no_hotspots():
+    rng = np.random.default_rng(0)
+    distances = np.arange(0.0, 3000.0, 3.0)
+    assert detect_hotspots(distances, rng.normal(70, 1.0, len(distances))).empty
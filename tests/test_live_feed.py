@@ -0,0 +1,121 @@
+import os
+import socket
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from live_feed import CsvTailSource, LiveSession, RingBuffer, SocketSource, open_source
+
+
+def frame(distances):
+    distances = np.asarray(distances, dtype=np.float64)
+    return pd.DataFrame({'distance': distances, 'dB': distances + 0.5, 'speed': np.full(len(distances), 40.0)})
+
+
+def test_ring_buffer_keeps_latest_in_order():
+    buffer = RingBuffer(5)
+    assert len(buffer) == 0 and len(buffer.view()['distance']) == 0
+    buffer.append(frame([1, 2, 3]))
+    np.testing.assert_array_equal(buffer.view()['distance'], [1, 2, 3])
+    buffer.append(frame([4, 5, 6, 7]))  # 한 바퀴 넘김
+    assert len(buffer) == 5 and buffer.total == 7
+    np.testing.assert_array_equal(buffer.view()['distance'], [3, 4, 5, 6, 7])
+    np.testing.assert_array_equal(buffer.view()['dB'], [3.5, 4.5, 5.5, 6.5, 7.5])
+    buffer.append(frame(np.arange(10, 22)))  # 버퍼보다 큰 묶음은 마지막 capacity 개만
+    assert buffer.total == 19
+    np.testing.assert_array_equal(buffer.view()['distance'], [17, 18, 19, 20, 21])
+    buffer.append(frame([]))
+    assert buffer.total == 19
+
+
+def test_csv_tail_reads_complete_lines_only(tmp_path):
+    path = tmp_path / "live.csv"
+    source = CsvTailSource(str(path))
+    assert len(source.poll()) == 0  # 아직 파일 없음
+    path.write_bytes(b"distance,dB,speed\n1,70,40\n2,71")
+    assert source.poll()['distance'].tolist() == [1]
+    with open(path, "ab") as f:
+        f.write(b",41\n3,72,42\n")
+    chunk = source.poll()
+    assert chunk['distance'].tolist() == [2, 3]
+    assert chunk['speed'].tolist() == [41, 42]
+    assert len(source.poll()) == 0
+
+
+def test_csv_tail_recovers_from_truncation_and_rotation(tmp_path):
+    path = tmp_path / "live.csv"
+    path.write_bytes(b"distance,dB,speed\n1,70,40\n2,71,41\n")
+    source = CsvTailSource(str(path))
+    assert len(source.poll()) == 2
+
+    # 잘림: 같은 파일이 더 짧아짐 (헤더의 컬럼 순서도 바뀔 수 있음)
+    path.write_bytes(b"speed,distance,dB\n50,9,80\n")
+    chunk = source.poll()
+    assert chunk['distance'].tolist() == [9] and chunk['speed'].tolist() == [50]
+
+    # 교체: 새 파일(다른 inode)이 같은 이름으로, 이전 위치보다 길게
+    rotated = tmp_path / "live.csv.new"
+    rotated.write_bytes(b"distance,dB,speed\n" + b"".join(b"%d,60,30\n" % i for i in range(10, 20)))
+    os.replace(rotated, path)
+    assert source.poll()['distance'].tolist() == list(range(10, 20))
+
+
+def poll_until(source, rows, timeout=5.0):
+    chunks = []
+    deadline = time.monotonic() + timeout
+    while sum(len(chunk) for chunk in chunks) < rows and time.monotonic() < deadline:
+        chunks.append(source.poll())
+        time.sleep(0.01)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def test_socket_source_parses_lines_and_resets_per_connection():
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    source = open_source(f"tcp://127.0.0.1:{port}")
+    assert isinstance(source, SocketSource)
+    try:
+        assert len(source.poll()) == 0  # 연결만 함
+        connection, _ = server.accept()
+        connection.sendall(b"distance,dB,speed\n1,70,40\n2,7")
+        assert poll_until(source, 1)['distance'].tolist() == [1]
+        connection.sendall(b"1,41\n")
+        assert poll_until(source, 1)['dB'].tolist() == [71]
+        connection.sendall(b"3,72")  # 끊긴 줄은 다음 연결로 넘어가지 않음
+        time.sleep(0.05)
+        source.poll()
+        connection.close()
+        deadline = time.monotonic() + 5.0
+        while source.connection is not None and time.monotonic() < deadline:  # 상대가 닫은 것을 확인
+            source.poll()
+        assert source.connection is None
+
+        assert len(source.poll()) == 0  # 다시 연결
+        connection, _ = server.accept()
+        connection.sendall(b"speed,distance,dB\n45,8,65\n")
+        chunk = poll_until(source, 1)
+        assert chunk['distance'].tolist() == [8] and chunk['speed'].tolist() == [45]
+        connection.close()
+    finally:
+        source.close()
+        server.close()
+
+
+def test_live_session_close_closes_socket():
+    server = socket.create_server(("127.0.0.1", 0))
+    try:
+        session = LiveSession(SocketSource("127.0.0.1", server.getsockname()[1]), [(0.0, 100.0)])
+        session.poll()
+        assert session.source.connection is not None
+        session.close()
+        assert session.source.connection is None
+    finally:
+        server.close()
+
+
+@pytest.mark.parametrize("spec", ["live.csv", "/tmp/feed.csv"])
+def test_open_source_paths(spec):
+    assert isinstance(open_source(spec), CsvTailSource)
+    assert not isinstance(open_source(spec), SocketSource)
@@ -0,0 +1,104 @@
+import functools
+import json
+import shutil
+from http import HTTPStatus
+
+import pytest
+
+import noise_api
+from columnar_cache import load_run_columnar
+from gpg_loader import run_gpg
+from noise_api import ApiError, NoiseApi
+from synthetic_runs import write_synthetic_csv
+
+PASSPHRASE = "test"
+
+
+@pytest.fixture
+def api(tmp_path):
+    # 경로/인자 검사는 데이터를 읽기 전에 끝나므로 내용은 아무 바이트나 됨
+    (tmp_path / "run_a.csv.gpg").write_bytes(b"not decrypted in these tests")
+    return NoiseApi(str(tmp_path), PASSPHRASE)
+
+
+@pytest.fixture
+def encrypted_api(tmp_path, monkeypatch):
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg is not installed")
+    monkeypatch.setattr(noise_api, "load_run_columnar",
+                        functools.partial(load_run_columnar, cache_dir=str(tmp_path / "cache")))
+    csv_path = tmp_path / "run_b.csv"
+    write_synthetic_csv(str(csv_path), 5000)
+    run_gpg(["--symmetric", "--cipher-algo", "AES256", "-o", str(csv_path) + ".gpg", str(csv_path)], PASSPHRASE)
+    csv_path.unlink()
+    return NoiseApi(str(tmp_path), PASSPHRASE)
+
+
+def status_of(api, path, params):
+    try:
+        return api.respond(path, params)[0]
+    except ApiError as exc:
+        return exc.status
+
+
+def test_routing(api):
+    status, _, body = api.respond("/runs", {})
+    assert status == HTTPStatus.OK
+    assert [entry["run"] for entry in json.loads(body)["runs"]] == ["run_a"]
+
+    status, _, body = api.respond("/stations", {"direction": "southbound"})
+    stations = json.loads(body)
+    assert stations["direction"] == "southbound"
+    assert stations["station_pairs"][0] == "BHI - DKA"
+
+    assert status_of(api, "/nothing", {}) == HTTPStatus.NOT_FOUND
+    assert status_of(api, "/runs/run_a/unknown", {}) == HTTPStatus.NOT_FOUND
+    assert status_of(api, "/runs/missing/segments", {}) == HTTPStatus.NOT_FOUND
+    assert status_of(api, "/stations", {"line": "XX"}) == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/runs/run_a/segments", {"min_speed": "nan"}),
+    ("/runs/run_a/segments", {"min_speed": "inf"}),
+    ("/runs/run_a/segments", {"min_speed": "-inf"}),
+    ("/runs/run_a/segments", {"min_speed": "12.5"}),
+    ("/runs/run_a/segments", {"min_speed": "fast"}),
+    ("/runs/run_a/segments", {"direction": "sideways"}),
+    ("/runs/run_a/trace", {"buckets": "inf"}),
+    ("/runs/run_a/trace", {"buckets": "nan"}),
+    ("/runs/run_a/trace", {"start": "-inf"}),
+    ("/runs/run_a/trace", {"column": "time"}),
+    ("/runs/run_a/hotspots", {"excess": "nan"}),
+    ("/runs/run_a/hotspots", {"window": "inf"}),
+])
+def test_bad_parameters_are_rejected_with_400(api, path, params):
+    assert status_of(api, path, params) == HTTPStatus.BAD_REQUEST
+
+
+def test_equivalent_paths_share_etag(api):
+    etags = {api.respond(path, {})[1] for path in ("/runs", "/runs/", "//runs", "/%72uns")}
+    assert len(etags) == 1
+    assert api.respond("/stations", {})[1] not in etags
+    assert len(api._responses) == 2
+
+
+def test_etag_not_modified(api):
+    status, etag, body = api.respond("/stations", {})
+    assert status == HTTPStatus.OK and body
+    assert api.respond("/stations", {}, if_none_match=etag) == (HTTPStatus.NOT_MODIFIED, etag, b"")
+    assert api.respond("/stations/", {}, if_none_match=f'"other", {etag}')[0] == HTTPStatus.NOT_MODIFIED
+    assert api.respond("/stations", {"direction": "southbound"}, if_none_match=etag)[0] == HTTPStatus.OK
+
+
+def test_segments_and_etag_follow_run_content(encrypted_api, tmp_path):
+    status, etag, body = encrypted_api.respond("/runs/run_b/segments", {"min_speed": "30"})
+    assert status == HTTPStatus.OK
+    result = json.loads(body)
+    assert result["min_speed"] == 30 and len(result["segments"]) == 12
+    assert encrypted_api.respond("/runs/run_b/segments", {"min_speed": "30"}, if_none_match=etag)[0] \
+        == HTTPStatus.NOT_MODIFIED
+
+    # 파일 내용이 바뀌면 ETag 도 바뀜
+    with open(tmp_path / "run_b.csv.gpg", "ab") as f:
+        f.write(b"\0")
+    assert encrypted_api.etag(("runs", "run_b", "segments"), {"min_speed": "30"}) != etag
@@ -0,0 +1,45 @@
+import shutil
+
+import pytest
+
+import noise_batch
+from gpg_loader import run_gpg
+from synthetic_runs import write_synthetic_csv
+
+PASSPHRASE = "test"
+
+
+@pytest.fixture
+def recordings(tmp_path, monkeypatch):
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg is not installed")
+    monkeypatch.setenv("GPG_PASSWORD", PASSPHRASE)
+    input_dir = tmp_path / "recordings"
+    input_dir.mkdir()
+    csv_path = input_dir / "run_a.csv"
+    write_synthetic_csv(str(csv_path), 5000)
+    run_gpg(["--symmetric", "--cipher-algo", "AES256", "-o", str(csv_path) + ".gpg", str(csv_path)], PASSPHRASE)
+    csv_path.unlink()
+    return input_dir
+
+
+def test_skip_existing_checks_requested_outputs(recordings, tmp_path, capsys):
+    output = tmp_path / "tables"
+    common = [str(recordings), "--output", str(output), "--workers", "1", "--skip-existing"]
+    assert noise_batch.main(common) == 0
+    assert (output / "run_a_segments.parquet").exists()
+    assert not (output / "run_a_hotspots.parquet").exists()
+
+    # 표는 있지만 이번에 요청한 소음 집중 구간 표가 없으므로 다시 처리
+    capsys.readouterr()
+    assert noise_batch.main(common + ["--hotspots"]) == 0
+    assert (output / "run_a_hotspots.parquet").exists()
+    assert "Processed 1/1" in capsys.readouterr().out
+
+    assert noise_batch.main(common + ["--hotspots"]) == 0
+    assert "No recordings to process." in capsys.readouterr().out
+
+    # 회귀 통계량도 같은 방식
+    assert noise_batch.main(common + ["--regression"]) == 0
+    assert (output / "run_a_regression.npz").exists()
+    assert "Processed 1/1" in capsys.readouterr().out
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from dataset_registry import DatasetRegistry
+from prefetch import Prefetcher
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class StagedJob:
+    """
+    decrypt -> parse -> index 단계 사이에서 checkpoint 를 부르는 미리 불러오기 작업 (decrypt 중간에 멈춰 둠)
+    """
+    def __init__(self, prefetcher, key):
+        self.prefetcher = prefetcher
+        self.key = key
+        self.stages = []
+        self.decrypting = threading.Event()
+        self.resume = threading.Event()
+
+    def load(self):
+        self.stages.append("decrypt")
+        self.decrypting.set()
+        self.resume.wait(5.0)
+        for stage in ("parse", "index"):
+            self.prefetcher.checkpoint()
+            self.stages.append(stage)
+        return "prefetched"
+
+    def __call__(self):
+        self.prefetcher.warm(self.key, self.load)
+
+
+def test_running_job_pauses_while_foreground_loads():
+    registry = DatasetRegistry()
+    prefetcher = Prefetcher(registry, max_workers=1)
+    job = StagedJob(prefetcher, "other")
+    prefetcher.schedule({"other": job})
+    assert job.decrypting.wait(5.0)
+
+    with prefetcher.foreground():
+        job.resume.set()
+        time.sleep(0.2)
+        assert job.stages == ["decrypt"]  # 다음 단계로 넘어가지 않고 기다림
+        registry.lease("visible", lambda: "visible").release()
+    wait_until(lambda: "other" in registry)
+    assert job.stages == ["decrypt", "parse", "index"]
+    assert prefetcher.stats()["completed"] == 1
+
+
+def test_cancelled_job_skips_remaining_stages():
+    registry = DatasetRegistry()
+    prefetcher = Prefetcher(registry, max_workers=1)
+    job = StagedJob(prefetcher, "other")
+    prefetcher.schedule({"other": job}, group="session")
+    assert job.decrypting.wait(5.0)
+
+    with prefetcher.foreground():
+        prefetcher.schedule({}, group="session")  # 역 정보가 바뀌어 이 작업은 필요 없음
+        job.resume.set()
+        wait_until(lambda: prefetcher.stats()["cancelled"] == 1)
+    assert job.stages == ["decrypt"]
+    assert "other" not in registry
+    assert prefetcher.stats()["pending"] == 0
+
+
+def test_foreground_waiting_on_running_prefetch_gets_its_result():
+    registry = DatasetRegistry()
+    prefetcher = Prefetcher(registry, max_workers=1)
+    job = StagedJob(prefetcher, "run")
+    prefetcher.schedule({"run": job})
+    assert job.decrypting.wait(5.0)
+
+    # 사용자가 미리 불러오는 중인 실행을 고름: 작업은 멈추지 않고 끝내고, foreground 는 그 결과를 씀
+    result = {}
+
+    def foreground_load():
+        with prefetcher.foreground():
+            lease = registry.lease("run", lambda: "loaded again")
+            result["value"] = lease.value
+            lease.release()
+
+    foreground = threading.Thread(target=foreground_load)
+    foreground.start()
+    wait_until(lambda: registry.waiting("run"))
+    job.resume.set()
+    foreground.join(5.0)
+    assert not foreground.is_alive()
+    assert result["value"] == "prefetched"
+    assert job.stages == ["decrypt", "parse", "index"]
+    assert registry.stats()["misses"] == 1
+
+
+def test_checkpoint_outside_jobs_does_nothing():
+    prefetcher = Prefetcher(DatasetRegistry())
+    with prefetcher.foreground():
+        prefetcher.checkpoint()
@@ -0,0 +1,56 @@
+import functools
+import shutil
+
+import numpy as np
+import pytest
+
+import run_comparison
+from columnar_cache import load_run_columnar
+from gpg_loader import run_gpg
+from noise_core import StationDataProcessor, stationdata
+from run_comparison import compare_runs, load_runs_parallel
+from synthetic_runs import write_synthetic_csv
+
+PASSPHRASE = "test"
+
+
+@pytest.fixture
+def runs(tmp_path, monkeypatch):
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg is not installed")
+    monkeypatch.setattr(run_comparison, "load_run_columnar",
+                        functools.partial(load_run_columnar, cache_dir=str(tmp_path / "cache")))
+    names = []
+    for seed, label in enumerate(("small", "large")):
+        csv_path = tmp_path / f"{label}.csv"
+        write_synthetic_csv(str(csv_path), 20000, seed=seed)
+        run_gpg(["--symmetric", "--cipher-algo", "AES256", "-o", str(csv_path) + ".gpg", str(csv_path)], PASSPHRASE)
+        csv_path.unlink()
+        names.append(str(csv_path) + ".gpg")
+    return names
+
+
+def test_oversized_runs_are_streamed(runs, monkeypatch):
+    station_processor = StationDataProcessor(stationdata)
+    in_memory = load_runs_parallel(runs, PASSPHRASE, station_processor.station_btw_distance)
+    assert all(run["df"] is not None and run["regression"] is None for run in in_memory.values())
+
+    # 'large' 만 스트리밍 기준을 넘는 것으로 보고 원본 행 없이 누적기만 만듦
+    monkeypatch.setattr(run_comparison, "should_stream", lambda name: "large" in name)
+    mixed = load_runs_parallel(runs, PASSPHRASE, station_processor.station_btw_distance)
+    assert list(mixed) == runs
+    small, large = (mixed[name] for name in runs)
+    assert small["df"] is not None and small["trace"] is None
+    assert large["df"] is None and large["regression"].n_runs == 1 and large["trace"] is not None
+
+    # 비교 결과는 전체를 올린 경우와 같음
+    for min_speed in (0, 50):
+        expected = compare_runs(
+            {name: run["speed_index"] for name, run in in_memory.items()}, station_processor.station_pairs, min_speed
+        )
+        result = compare_runs(
+            {name: run["speed_index"] for name, run in mixed.items()}, station_processor.station_pairs, min_speed
+        )
+        assert list(result.columns) == list(expected.columns)
+        for column in expected.columns[1:]:
+            np.testing.assert_allclose(result[column], expected[column], rtol=1e-5, equal_nan=True)
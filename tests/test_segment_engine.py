@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from noise_core import NoiseDataProcessor, StationDataProcessor, stationdata
+from segment_engine import locate_segments
+
+
+def baseline_station_intervals(filtered_data, station_processor):
+    """
+    벡터화 이전의 구간별 반복문 (비교 기준)
+    """
+    station_intervals = []
+    for pair, (start_distance, end_distance) in zip(station_processor.station_pairs,
+                                                    station_processor.station_btw_distance):
+        main_line_between = filtered_data[
+            (filtered_data['distance'] >= start_distance) & (filtered_data['distance'] <= end_distance)
+        ]
+        if not main_line_between.empty:
+            average_noise = main_line_between['dB'].mean()
+            maximum_noise = main_line_between['dB'].max()
+        else:
+            average_noise = 0
+            maximum_noise = 0
+        station_intervals.append({
+            'Station Pair': pair,
+            'Average Noise (dBA)': average_noise,
+            'Maximum Noise (dBA)': maximum_noise
+        })
+    return pd.DataFrame(station_intervals)
+
+
+def random_run(rng, station_processor, n_rows):
+    """
+    역 경계 위의 샘플, NaN dB, 샘플이 없는 구간을 포함한 임의 실행 데이터
+    """
+    distances = station_processor.station_distances.astype(np.float64)
+    first, last = distances.min(), distances.max()
+    # 세 번째 구간은 비워 둠
+    gap_start, gap_end = sorted(station_processor.station_btw_distance[2])
+    distance = rng.uniform(first - 200, last + 200, n_rows)
+    distance = distance[(distance < gap_start) | (distance > gap_end)]
+    boundaries = rng.choice(np.setdiff1d(distances, [gap_start, gap_end]), 50)
+    distance = np.concatenate((distance, boundaries))
+    distance = rng.permutation(distance)
+    level = rng.normal(75, 8, len(distance))
+    level[rng.random(len(distance)) < 0.05] = np.nan
+    speed = rng.uniform(0, 90, len(distance))
+    return pd.DataFrame({'distance': distance, 'speed': speed, 'dB': level})
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("direction", [None, "descending"])
+def test_station_intervals_match_baseline_loop(seed, direction):
+    rng = np.random.default_rng(seed)
+    station_processor = StationDataProcessor(stationdata, direction=direction)
+    df = random_run(rng, station_processor, 5000)
+    noise_processor = NoiseDataProcessor(df, station_processor)
+
+    expected = baseline_station_intervals(df, station_processor)
+    result = noise_processor.get_station_intervals(df)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+    # 빈 구간은 0, 경계 샘플이 있는 구간은 양쪽 모두에 포함
+    assert result['Average Noise (dBA)'].iloc[2] == 0
+
+
+def test_station_intervals_all_nan_segment():
+    station_processor = StationDataProcessor(stationdata)
+    start, end = station_processor.station_btw_distance[0]
+    df = pd.DataFrame({'distance': [start, (start + end) / 2], 'speed': [10.0, 10.0], 'dB': [np.nan, np.nan]})
+    result = NoiseDataProcessor(df, station_processor).get_station_intervals(df)
+    expected = baseline_station_intervals(df, station_processor)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert np.isnan(result['Average Noise (dBA)'].iloc[0])
+
+
+@pytest.mark.parametrize("direction", [None, "descending"])
+def test_locate_segments_follows_segment_statistics_membership(direction):
+    rng = np.random.default_rng(11)
+    station_processor = StationDataProcessor(stationdata, direction=direction)
+    df = random_run(rng, station_processor, 2000)
+    distances = df['distance'].values
+    segments = locate_segments(distances, station_processor.station_btw_distance)
+    for segment, (start, end) in enumerate(station_processor.station_btw_distance):
+        inside = (distances >= start) & (distances <= end)
+        # 구간에 배정된 샘플은 모두 그 구간의 통계에 들어가고, 구간에 드는 샘플은 그 구간 이하 번호로 배정됨
+        assert inside[segments == segment].all()
+        assert ((segments[inside] >= 0) & (segments[inside] <= segment)).all()
+    outside = segments == -1
+    starts, ends = np.asarray(station_processor.station_btw_distance).T
+    assert not ((distances[outside, None] >= starts) & (distances[outside, None] <= ends)).any()
+    assert locate_segments([np.nan], station_processor.station_btw_distance)[0] == -1
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from noise_core import StationDataProcessor, stationdata
+from segment_engine import SpeedThresholdIndex, segment_statistics
+from streaming_ingest import MAX_SPEED_BIN, SegmentSpeedAccumulator
+
+STAT_NAMES = ["count", "valid_count", "sum", "mean", "min", "max"]
+
+
+@pytest.fixture(scope="module")
+def run():
+    rng = np.random.default_rng(7)
+    station_processor = StationDataProcessor(stationdata)
+    n_rows = 20000
+    distances = station_processor.station_distances.astype(np.float64)
+    distance = rng.uniform(distances.min() - 100, distances.max() + 100, n_rows)
+    distance[:200] = rng.choice(distances, 200)  # 경계 위의 샘플
+    # 정수 속도 경계 위의 샘플과 최대 속도 칸보다 빠른 샘플 포함
+    speed = np.where(rng.random(n_rows) < 0.3, rng.integers(0, 110, n_rows), rng.uniform(0, 110, n_rows))
+    level = rng.normal(75, 8, n_rows)
+    level[rng.random(n_rows) < 0.05] = np.nan
+    df = pd.DataFrame({'distance': distance, 'speed': speed, 'dB': level})
+    return df, station_processor.station_btw_distance
+
+
+def filtered_statistics(df, station_btw_distance, min_speed):
+    filtered = df[df['speed'] >= min_speed]
+    return segment_statistics(filtered['distance'].values, filtered['dB'].values, station_btw_distance)
+
+
+def assert_same_stats(result, expected):
+    for name in STAT_NAMES:
+        np.testing.assert_allclose(result[name], expected[name], rtol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_speed_index_matches_filter_for_every_integer_speed(run):
+    df, station_btw_distance = run
+    index = SpeedThresholdIndex(df['distance'].values, df['speed'].values, df['dB'].values, station_btw_distance)
+    for min_speed in range(0, MAX_SPEED_BIN + 1):
+        assert_same_stats(index.query(min_speed), filtered_statistics(df, station_btw_distance, min_speed))
+
+
+def test_speed_index_is_exact_for_fractional_speed(run):
+    df, station_btw_distance = run
+    index = SpeedThresholdIndex(df['distance'].values, df['speed'].values, df['dB'].values, station_btw_distance)
+    for min_speed in (0.5, 49.5, 72.25):
+        assert_same_stats(index.query(min_speed), filtered_statistics(df, station_btw_distance, min_speed))
+
+
+def test_streaming_accumulator_matches_filter_for_every_integer_speed(run):
+    df, station_btw_distance = run
+    accumulator = SegmentSpeedAccumulator(station_btw_distance)
+    for chunk in np.array_split(np.arange(len(df)), 4):
+        part = df.iloc[chunk]
+        accumulator.update(part['distance'].values, part['speed'].values, part['dB'].values)
+    for min_speed in range(0, MAX_SPEED_BIN + 1):
+        assert_same_stats(accumulator.query(min_speed), filtered_statistics(df, station_btw_distance, min_speed))
+
+
+@pytest.mark.parametrize("min_speed", [49.5, -1, MAX_SPEED_BIN + 1])
+def test_streaming_accumulator_rejects_inexact_speed(run, min_speed):
+    _, station_btw_distance = run
+    with pytest.raises(ValueError):
+        SegmentSpeedAccumulator(station_btw_distance).query(min_speed)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from noise_core import StationDataProcessor, stationdata
+from speed_regression import MIN_FIT_SAMPLES, MIN_FIT_SPEED, SpeedRegression
+
+STATION_BTW_DISTANCE = StationDataProcessor(stationdata).station_btw_distance
+
+
+def random_run(seed, n_rows=40000):
+    rng = np.random.default_rng(seed)
+    end = STATION_BTW_DISTANCE[-1][1]
+    distances = rng.uniform(-100, end + 100, n_rows)  # 선로 밖 샘플도 섞음
+    speeds = rng.uniform(0, 90, n_rows)
+    values = 40 + (15 + seed) * np.log10(np.maximum(speeds, 1)) + rng.normal(0, 2, n_rows)
+    values[rng.random(n_rows) < 0.01] = np.nan
+    return distances, speeds, values
+
+
+def polyfit_cells(runs):
+    """
+    [실행, 구간] 칸마다 np.polyfit 으로 푼 (기울기, 절편)
+    """
+    slopes = np.full((len(runs), len(STATION_BTW_DISTANCE)), np.nan)
+    intercepts = np.full_like(slopes, np.nan)
+    for run, (distances, speeds, values) in enumerate(runs):
+        for segment, (start, end) in enumerate(STATION_BTW_DISTANCE):
+            member = (distances >= start) & (distances <= end) & (speeds >= MIN_FIT_SPEED) & np.isfinite(values)
+            slopes[run, segment], intercepts[run, segment] = np.polyfit(np.log10(speeds[member]), values[member], 1)
+    return slopes, intercepts
+
+
+def assert_matches_polyfit(regression, runs):
+    fit = regression.fit()
+    slopes, intercepts = polyfit_cells(runs)
+    np.testing.assert_allclose(fit["slope"], slopes, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(fit["intercept"], intercepts, rtol=1e-6, atol=1e-6)
+
+
+def test_batched_fit_matches_polyfit_per_run_and_segment():
+    runs = [random_run(seed) for seed in range(3)]
+    regression = SpeedRegression.from_runs(dict(zip("abc", runs)), STATION_BTW_DISTANCE)
+    assert regression.labels == list("abc")
+    assert_matches_polyfit(regression, runs)
+
+
+def test_merged_runs_match_polyfit_on_concatenated_data(tmp_path):
+    runs = [random_run(seed) for seed in range(3)]
+    # 배치 처리처럼: 첫 실행은 이전에 저장해 둔 통계량(--skip-existing 으로 건너뜀), 나머지는 이번에 처리
+    SpeedRegression.from_runs({"a": runs[0]}, STATION_BTW_DISTANCE).save(str(tmp_path / "a_regression.npz"))
+    skipped = SpeedRegression.load(str(tmp_path / "a_regression.npz"))
+    fresh = [SpeedRegression.from_runs({label: run}, STATION_BTW_DISTANCE) for label, run in zip("bc", runs[1:])]
+    combined = SpeedRegression.concat([skipped] + fresh)
+    assert combined.labels == list("abc")
+    assert_matches_polyfit(combined, runs)
+
+    # 전체 합산(pooled)은 모든 실행을 이어 붙인 데이터의 np.polyfit 과 같음
+    concatenated = tuple(np.concatenate([run[k] for run in runs]) for k in range(3))
+    assert_matches_polyfit(combined.pooled(), [concatenated])
+
+
+def test_chunked_updates_merge_to_the_same_statistics():
+    distances, speeds, values = random_run(7)
+    whole = SpeedRegression(STATION_BTW_DISTANCE)
+    whole.update(distances, speeds, values)
+    merged = SpeedRegression(STATION_BTW_DISTANCE)
+    for chunk in np.array_split(np.arange(len(distances)), 5):
+        part = SpeedRegression(STATION_BTW_DISTANCE)
+        part.update(distances[chunk], speeds[chunk], values[chunk])
+        merged.merge(part)
+    np.testing.assert_allclose(merged.sums, whole.sums)
+    np.testing.assert_array_equal(merged.band_count, whole.band_count)
+
+
+def test_sparse_cells_are_left_unfitted():
+    distances, speeds, values = random_run(1, n_rows=200)
+    fit = SpeedRegression.from_runs({"a": (distances, speeds, values)}, STATION_BTW_DISTANCE).fit()
+    sparse = fit["samples"] < MIN_FIT_SAMPLES
+    assert sparse.any()
+    assert np.isnan(fit["slope"][sparse]).all()
@@ -0,0 +1,47 @@
+from stage_graph import StageGraph
+
+
+def counting(results, name):
+    def compute():
+        results.append(name)
+        return len(results)
+    return compute
+
+
+def run_pass(graph, results, layout, options):
+    graph.begin()
+    graph.run("load", counting(results, "load"), inputs="run-a")
+    graph.run("index", counting(results, "index"), inputs=layout, after=("load",))
+    graph.run("hotspots", counting(results, "hotspots"), inputs=(options, layout), after=("load",))
+    return graph.run("aggregate", counting(results, "aggregate"), inputs=options, after=("index",))
+
+
+def test_unchanged_inputs_skip_every_stage():
+    graph, results = StageGraph(), []
+    first = run_pass(graph, results, ("NS", "up"), 1)
+    assert results == ["load", "index", "hotspots", "aggregate"]
+    results.clear()
+    assert run_pass(graph, results, ("NS", "up"), 1) == first
+    assert results == []
+    assert all(state["last"] == "skipped" for state in graph.stages.values())
+
+
+def test_upstream_version_change_reruns_dependents_only():
+    graph, results = StageGraph(), []
+    run_pass(graph, results, ("NS", "up"), 1)
+    results.clear()
+    # 역 배치가 바뀌면 index 와 그 뒤 단계, 역 배치를 입력으로 받는 단계만 다시 계산
+    run_pass(graph, results, ("NS", "down"), 1)
+    assert results == ["index", "hotspots", "aggregate"]
+    assert graph.stages["load"]["last"] == "skipped"
+    assert graph.stages["index"]["version"] == 2
+
+
+def test_input_change_does_not_rerun_upstream():
+    graph, results = StageGraph(), []
+    run_pass(graph, results, ("NS", "up"), 1)
+    results.clear()
+    run_pass(graph, results, ("NS", "up"), 2)
+    assert results == ["hotspots", "aggregate"]
+    frame = graph.to_frame()
+    assert frame.set_index("stage").loc["index", "skips"] == 1
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from noise_core import NoiseDataProcessor, StationDataProcessor
+from segment_engine import locate_segments
+from station_registry import SegmentIntervalIndex, StationRegistry
+
+# 본선 S1-S2-S3 와 S2 에서 갈라져 S2-S3 구간과 거리 범위가 겹치는 지선 S2-B1
+OVERLAPPING_NETWORK = {
+    "default_line": "M",
+    "lines": [
+        {"id": "M", "name": "Main", "kind": "main",
+         "directions": {"up": "ascending", "down": "descending"},
+         "stations": [
+             {"code": "S3", "station": "Station 3", "distance": 2000},
+             {"code": "S1", "station": "Station 1", "distance": 0},
+             {"code": "S2", "station": "Station 2", "distance": 1000},
+         ]},
+        {"id": "B", "name": "Branch", "kind": "spur", "parent": "M",
+         "stations": [
+             {"code": "S2", "station": "Station 2", "distance": 1000},
+             {"code": "B1", "station": "Branch 1", "distance": 1500},
+         ]},
+    ],
+}
+
+
+@pytest.fixture
+def registry():
+    return StationRegistry(OVERLAPPING_NETWORK)
+
+
+def test_spur_does_not_split_main_line_segments(registry):
+    processor = StationDataProcessor.from_registry(registry, "M", "up", include_spurs=True)
+    assert processor.station_pairs == ['S1 - S2', 'S2 - S3', 'S2 - B1']
+    assert processor.station_btw_distance == [(0, 1000), (1000, 2000), (1000, 1500)]
+    assert processor.segment_lines == ['M', 'M', 'B']
+
+    processor = StationDataProcessor.from_registry(registry, "M", "down", include_spurs=True)
+    assert processor.station_pairs == ['S3 - S2', 'S2 - S1', 'B1 - S2']
+    assert processor.segment_lines == ['M', 'M', 'B']
+
+
+@pytest.mark.parametrize("direction", ["up", "down"])
+def test_overlapping_range_resolves_to_main_line(registry, direction):
+    processor = StationDataProcessor.from_registry(registry, "M", direction, include_spurs=True)
+    distances = np.array([-5.0, 0.0, 500.0, 1000.0, 1200.0, 1500.0, 1800.0, 2000.0, 2500.0, np.nan])
+    located = processor.locate(distances)
+    labels = [processor.station_pairs[segment] if segment >= 0 else None for segment in located]
+    main_pairs = {'up': ('S1 - S2', 'S2 - S3'), 'down': ('S2 - S1', 'S3 - S2')}[direction]
+    first, second = main_pairs
+    # 경계(1000 m)는 번호가 작은 구간
+    boundary = processor.station_pairs[min(processor.station_pairs.index(first), processor.station_pairs.index(second))]
+    assert labels == [None, first, first, boundary, second, second, second, second, None, None]
+    # 집계 경로(segment_statistics)와 같은 규칙
+    np.testing.assert_array_equal(located, locate_segments(distances, processor.station_btw_distance))
+
+
+def test_overlapping_segments_aggregate_independently(registry):
+    processor = StationDataProcessor.from_registry(registry, "M", "up", include_spurs=True)
+    df = pd.DataFrame({'distance': [500.0, 1200.0, 1800.0], 'speed': [40.0] * 3, 'dB': [60.0, 70.0, 80.0]})
+    result = NoiseDataProcessor(df, processor).get_station_intervals(df)
+    assert result['Station Pair'].tolist() == ['S1 - S2', 'S2 - S3', 'S2 - B1']
+    assert result['Average Noise (dBA)'].tolist() == [60.0, 75.0, 70.0]
+
+
+def test_interval_index_boundary_takes_lowest_id():
+    index = SegmentIntervalIndex([1000, 0], [2000, 1000], ids=[3, 7])
+    np.testing.assert_array_equal(index.locate([0, 1000, 1500, 2000, 2001]), [7, 3, 3, 3, -1])